@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark response parsing: table-driven parse_many() vs the original
+per-token unicodedata parser.
+
+Parses stored responses from data/results/raw (or synthetic responses in
+the usual formats if there are none), checks that both parsers give
+identical answers, and reports throughput.
+
+Usage:
+    python3 scripts/benchmark_parser.py
+    python3 scripts/benchmark_parser.py --n-texts 500000
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import ALL_SYMBOLS
+from src.parsing import parse_many
+from src.result_io import iter_responses, result_files
+
+
+def reference_parse(response_text, expected_length=3):
+    """The original SequentialTransformationExperiment.parse_response()."""
+    import unicodedata
+    
+    text = response_text.strip()
+    text = text.replace("→", " ").replace("->", " ")
+    text = text.replace(",", " ")
+    tokens = text.split()
+    
+    def is_special_symbol(token):
+        if len(token) != 1:
+            return False
+        char = token[0]
+        codepoint = ord(char)
+        return (
+            (0x2A00 <= codepoint <= 0x2AFF) or
+            (0x2B00 <= codepoint <= 0x2BFF) or
+            (0x25A0 <= codepoint <= 0x25FF) or
+            unicodedata.category(char).startswith('S')
+        )
+    
+    special_symbols = [t for t in tokens if is_special_symbol(t)]
+    if len(special_symbols) >= expected_length:
+        return special_symbols[-expected_length:]
+    elif len(special_symbols) > 0:
+        return special_symbols[:expected_length]
+    else:
+        return [t for t in tokens if t][:expected_length]
+
+
+def stored_responses():
+    """(text, expected_length) pairs from saved results."""
+    pairs = []
+    for filepath in result_files():
+        try:
+            for response in iter_responses(filepath):
+                text = response.get('model_output_raw')
+                expected = response.get('expected_output')
+                if text is not None and expected:
+                    pairs.append((text, len(expected)))
+        except (OSError, ValueError):
+            continue
+    return pairs
+
+
+def synthetic_responses(n: int, seed: int = 0):
+    """(text, expected_length) pairs in the formats models actually use."""
+    rng = random.Random(seed)
+    pool = ALL_SYMBOLS + list("ABCDEFGHIJ") + ["😀", "𝔸", "→"]
+    formats = [
+        "{a}",
+        "{a}\n",
+        "The answer is: {a}",
+        "{x} → {a}",
+        "{c}",
+        "Looking at the pattern, the last symbol moves to the front.\n\n{a}",
+        "I cannot determine the rule.",
+        "{a}\n\nExplanation: {x} becomes {a}",
+    ]
+    pairs = []
+    for _ in range(n):
+        length = rng.choice([3, 3, 3, 4, 5])
+        answer = rng.sample(pool, length)
+        example = rng.sample(pool, length)
+        text = rng.choice(formats).format(
+            a=" ".join(answer), x=" ".join(example), c=", ".join(answer)
+        )
+        pairs.append((text, length))
+    return pairs
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Benchmark response parsing")
+    parser.add_argument(
+        '--n-texts',
+        type=int,
+        default=200000,
+        help='Number of responses to parse (default: 200000)'
+    )
+    args = parser.parse_args()
+    
+    pairs = stored_responses()
+    source = "stored"
+    if not pairs:
+        pairs = synthetic_responses(1000)
+        source = "synthetic"
+    pairs = (pairs * (args.n_texts // len(pairs) + 1))[:args.n_texts]
+    texts = [text for text, _ in pairs]
+    lengths = [length for _, length in pairs]
+    
+    print(f"Parsing {len(texts):,} {source} responses\n")
+    
+    start = time.perf_counter()
+    expected = [reference_parse(text, length) for text, length in pairs]
+    reference_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    parsed = parse_many(texts, lengths)
+    fast_seconds = time.perf_counter() - start
+    
+    mismatches = sum(1 for a, b in zip(expected, parsed) if a != b)
+    
+    print(f"{'Parser':<24} {'Seconds':>8} {'Responses/s':>14}")
+    print("-" * 48)
+    print(f"{'reference (per call)':<24} {reference_seconds:>8.2f} "
+          f"{len(texts) / reference_seconds:>14,.0f}")
+    print(f"{'parse_many (table)':<24} {fast_seconds:>8.2f} "
+          f"{len(texts) / fast_seconds:>14,.0f}")
+    print(f"\nSpeedup: {reference_seconds / fast_seconds:.1f}x")
+    
+    if mismatches:
+        print(f"✗ {mismatches} responses parsed differently")
+        sys.exit(1)
+    print("✓ Identical results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Check the dry-run forecast on a multi-cell grid, offline.
+
+Forecasts conditions x seeds for a replay model behind a rate limiter
+as tight as the Anthropic defaults, so the simulated buckets drain and
+refill many times, and checks that the forecast finishes and that its
+wall-clock time respects the RPM limit. No API keys or saved results
+are needed.
+
+Usage:
+    python3 scripts/check_forecast.py
+    python3 scripts/check_forecast.py --conditions 1 1b 1c --seeds 42 43 44
+"""
+
+import sys
+import argparse
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import RATE_LIMITS, RANDOM_SEED
+from src.experiments.scheduler import CONDITIONS, GridScheduler
+from src.experiments.simulator import RunHistory, forecast_grid, format_forecast
+from src.models.rate_limiter import RateLimiter
+from src.models.replay_model import ReplayModel
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Check the dry-run forecast offline")
+    parser.add_argument('--conditions', nargs='+', choices=list(CONDITIONS),
+                        default=['1', '1b', '1c'])
+    parser.add_argument('--seeds', nargs='+', type=int, default=[RANDOM_SEED, RANDOM_SEED + 1])
+    parser.add_argument('--timeout', type=float, default=60.0,
+                        help='Seconds the forecast may take (default: 60)')
+    args = parser.parse_args()
+    
+    limits = RATE_LIMITS['anthropic']
+    model = ReplayModel(
+        results_dir=Path("/nonexistent"),
+        rate_limiter=RateLimiter(
+            "check", limits['requests_per_minute'], limits['tokens_per_minute']
+        ),
+    )
+    scheduler = GridScheduler([model], conditions=args.conditions, seeds=args.seeds)
+    
+    forecasts = []
+    worker = threading.Thread(
+        target=lambda: forecasts.append(
+            forecast_grid(scheduler, history=RunHistory(), n_simulations=20)
+        ),
+        daemon=True,
+    )
+    worker.start()
+    worker.join(timeout=args.timeout)
+    if not forecasts:
+        print(f"\n✗ Forecast did not finish within {args.timeout:.0f}s")
+        sys.exit(1)
+    
+    forecast = forecasts[0]
+    print(format_forecast(forecast))
+    
+    # Requests beyond the first minute's burst wait for the RPM bucket
+    rpm = limits['requests_per_minute']
+    n_requests = sum(cell.n_requests for cell in forecast.cells)
+    minimum = max(0, n_requests - rpm) * 60.0 / rpm
+    if len(forecast.cells) < 2 or forecast.wall_clock(0) < minimum:
+        print(f"\n✗ Forecast of {len(forecast.cells)} cell(s) is below the "
+              f"RPM bound of {minimum:.0f}s")
+        sys.exit(1)
+    print(f"\n✓ Forecast of {len(forecast.cells)} cells ({n_requests} requests) "
+          f"finished and respects the RPM bound of {minimum:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
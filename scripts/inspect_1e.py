@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
-import json
+import sys
+from pathlib import Path
 
-# Load GPT-4 1e results
-with open('data/results/raw/exp1e_transfer_gpt-4-0125-preview_20251007_103212.json', 'r') as f:
-    gpt4 = json.load(f)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.result_io import iter_responses
+
+# Stream GPT-4 1e responses (any result format)
+gpt4_responses = iter_responses('data/results/raw/exp1e_transfer_gpt-4-0125-preview_20251007_103212.json')
 
 print("GPT-4 Condition 1e Analysis:")
 print("="*60)
@@ -11,7 +15,7 @@ print("="*60)
 control_correct = 0
 transfer_correct = 0
 
-for r in gpt4['responses']:
+for r in gpt4_responses:
     if r['correct']:
         # Try to determine if control or transfer
         expected = r['expected_output']
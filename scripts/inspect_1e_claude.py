@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
-import json
+import sys
+from pathlib import Path
 
-with open('data/results/raw/exp1e_transfer_claude-3-5-sonnet-20241022_20251007_103324.json', 'r') as f:
-    claude = json.load(f)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.result_io import iter_responses
+
+claude_responses = iter_responses('data/results/raw/exp1e_transfer_claude-3-5-sonnet-20241022_20251007_103324.json')
 
 print("Claude Condition 1e Analysis:")
 print("="*60)
@@ -10,7 +14,7 @@ print("="*60)
 control_correct = 0
 transfer_correct = 0
 
-for r in claude['responses']:
+for r in claude_responses:
     if r['correct']:
         expected = r['expected_output']
         input_seq = r['input']
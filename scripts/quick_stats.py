@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
-import json
+import sys
+from pathlib import Path
 from scipy import stats
 import numpy as np
 
-# Load GPT-4 results
-with open('data/results/raw/exp1_main_gpt-4-0125-preview_20251006_100608.json', 'r') as f:
-    data = json.load(f)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.result_io import read_header
+
+# Load GPT-4 results (summary line only; any result format)
+data = read_header('data/results/raw/exp1_main_gpt-4-0125-preview_20251006_100608.json')
 
 n_correct = data['n_correct']
 n_total = data['n_total']
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Rescore stored results offline with a different parser or scoring policy.
+
+Reads every result file in data/results/raw, re-parses model_output_raw
+(no API calls), and writes a scored table to data/results/processed/
+plus a JSON summary comparing original and rescored accuracy.
+
+Usage:
+    python3 scripts/rescore.py
+    python3 scripts/rescore.py --parser first_k --policy partial
+    python3 scripts/rescore.py --pattern "exp1b_*" --workers 4
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import RESULTS_DIR
+from src.analysis.rescoring import PARSERS, POLICIES, rescore_results, save_summary
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(
+        description="Rescore stored model outputs without API calls"
+    )
+    parser.add_argument(
+        '--parser',
+        choices=list(PARSERS),
+        default='last_k',
+        help='Keep the last or first k symbols of each response (default: last_k)'
+    )
+    parser.add_argument(
+        '--policy',
+        choices=list(POLICIES),
+        default='strict',
+        help='strict = exact match, partial = position-wise credit (default: strict)'
+    )
+    parser.add_argument(
+        '--results-dir',
+        type=Path,
+        default=RESULTS_DIR / "raw",
+        help='Directory of saved results (default: data/results/raw)'
+    )
+    parser.add_argument(
+        '--pattern',
+        default='*',
+        help='Only rescore files whose name matches this glob (default: all)'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=None,
+        help='Output CSV (default: data/results/processed/rescored_<parser>_<policy>.csv)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: CPU count)'
+    )
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    summary = rescore_results(
+        results_dir=args.results_dir,
+        parser=args.parser,
+        policy=args.policy,
+        output=args.output,
+        workers=args.workers,
+        pattern=args.pattern
+    )
+    elapsed = time.perf_counter() - start
+    
+    print(f"\nRescored {summary['n_rows']:,} items in {summary['n_files']} file(s) "
+          f"({args.parser}, {args.policy}) in {elapsed:.1f}s")
+    print(f"Items whose correctness changed: {summary['n_changed']:,}\n")
+    
+    print(f"{'File':<60} {'Original':>9} {'Rescored':>9}")
+    print("-" * 80)
+    for name, info in summary['files'].items():
+        original = info['original_accuracy']
+        original_str = f"{original:.1%}" if original is not None else "-"
+        print(f"{name:<60} {original_str:>9} {info['accuracy']:>9.1%}")
+    
+    for name, error in summary['skipped'].items():
+        print(f"⚠ Skipped {name}: {error}")
+    
+    summary_file = Path(summary['output']).with_suffix('.summary.json')
+    save_summary(summary, summary_file)
+    print(f"\n✓ Saved scored table to {summary['output']}")
+    print(f"✓ Saved summary to {summary_file}")
+
+
+if __name__ == "__main__":
+    main()
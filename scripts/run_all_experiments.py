@@ -5,12 +5,18 @@ Master script to run all experiments across all models.
 This script:
 1. Validates configuration
 2. Initializes all models
-3. Runs Experiment 1 (Sequential Transformation)
-4. Saves results
-5. Generates summary report
+3. Forecasts requests, tokens, cost and wall-clock time of the run
+   (--dry-run stops here)
+4. Runs Experiment 1 (Sequential Transformation), or any grid of
+   conditions x seeds, with all providers in parallel
+5. Saves results as each run completes
+6. Generates summary report
 
 Usage:
     python3 scripts/run_all_experiments.py
+    python3 scripts/run_all_experiments.py --conditions 1 1b 1c --seeds 42 43
+    python3 scripts/run_all_experiments.py --spec 1d_scaling_v2 my_condition.json
+    python3 scripts/run_all_experiments.py --conditions 1 1b --dry-run
 """
 
 import sys
@@ -21,11 +27,24 @@ from datetime import datetime
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import validate_config
-from src.models.gpt4_model import GPT4Model
-from src.models.claude_model import ClaudeModel
-from src.models.gemini_model import GeminiModel
-from src.experiments.experiment_1_sequential import run_experiment_1
+from src.config import (
+    validate_config,
+    RANDOM_SEED,
+    EARLY_STOP_STREAMING,
+    SPRT_EARLY_STOP,
+    BUDGET_MAX_COST_USD,
+    BUDGET_MAX_TOKENS,
+)
+from src.models.budget import Budget
+from src.models.registry import (
+    MODEL_REGISTRY,
+    create_model,
+    get_spec,
+    providers_for,
+    resolve_models,
+)
+from src.experiments.scheduler import CONDITIONS, GridScheduler, register_spec
+from src.experiments.simulator import forecast_grid, format_forecast
 
 
 def main():
@@ -36,19 +55,86 @@ def main():
     parser.add_argument(
         '--models',
         nargs='+',
-        choices=['gpt4', 'claude', 'gemini', 'all'],
+        choices=list(MODEL_REGISTRY) + ['all'],
         default=['all'],
-        help='Which models to test (default: all)'
+        help='Which models to test (default: all = gpt4 claude gemini)'
+    )
+    parser.add_argument(
+        '--conditions',
+        nargs='+',
+        choices=list(CONDITIONS),
+        default=None,
+        help='Experiment conditions to run (default: 1, unless --spec is given)'
+    )
+    parser.add_argument(
+        '--spec',
+        nargs='+',
+        default=[],
+        help='Conditions declared as spec files (JSON/YAML) or bundled spec '
+             'names from src/experiments/specs/'
+    )
+    parser.add_argument(
+        '--seeds',
+        nargs='+',
+        type=int,
+        default=[RANDOM_SEED],
+        help=f'Random seeds; each seed regenerates the stimuli, and with several '
+             f'seeds a pooled result is saved per condition and model (default: {RANDOM_SEED})'
     )
     parser.add_argument(
         '--control',
         action='store_true',
-        help='Include control condition with familiar symbols'
+        help='Include control condition with familiar symbols (not yet implemented)'
+    )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Submit each model\'s items as one provider batch job '
+             '(cheaper, but results may take hours)'
+    )
+    parser.add_argument(
+        '--pack-size',
+        type=int,
+        default=1,
+        help='Screening mode: pack this many test items into each request '
+             '(results are flagged as packed; default: 1)'
+    )
+    parser.add_argument(
+        '--early-stop',
+        action='store_true',
+        help='Stream responses and stop each one as soon as a complete '
+             'answer line has arrived'
+    )
+    parser.add_argument(
+        '--sprt',
+        action='store_true',
+        help='Stop sending a run\'s requests once a sequential test decides '
+             'between chance and reasoning-level accuracy'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume interrupted runs from their journals, sending only '
+             'requests that were not answered yet'
+    )
+    parser.add_argument(
+        '--max-cost',
+        type=float,
+        default=BUDGET_MAX_COST_USD,
+        help='Stop sending requests once this many USD would be spent '
+             '(shared by all models; default: BUDGET_MAX_COST_USD)'
+    )
+    parser.add_argument(
+        '--max-tokens',
+        type=int,
+        default=BUDGET_MAX_TOKENS,
+        help='Stop sending requests once this many tokens would be used '
+             '(shared by all models; default: BUDGET_MAX_TOKENS)'
     )
     parser.add_argument(
         '--dry-run',
         action='store_true',
-        help='Validate setup without making API calls'
+        help='Validate setup and forecast the run without making API calls'
     )
     
     args = parser.parse_args()
@@ -58,47 +144,43 @@ def main():
     print(" " * 10 + "Experimental Framework for LLM Reasoning")
     print("="*70 + "\n")
     
-    # Validate configuration
+    model_selection = resolve_models(args.models)
+    
+    # Compile spec conditions up front, so a bad spec fails before any setup
+    conditions = list(args.conditions or ([] if args.spec else ['1']))
+    try:
+        conditions += [register_spec(spec).name for spec in args.spec]
+    except (OSError, ValueError) as e:
+        print(f"✗ Spec error: {e}")
+        sys.exit(1)
+    
+    # Validate configuration (API keys only for the selected providers)
     print("Validating configuration...")
     try:
-        validate_config()
+        validate_config(providers=providers_for(model_selection))
         print("✓ Configuration valid\n")
     except ValueError as e:
         print(f"✗ Configuration error: {e}")
         print("\nPlease check your .env file and ensure all API keys are set.")
         sys.exit(1)
     
-    if args.dry_run:
-        print("✓ Dry run complete. Configuration is valid.")
-        print("Remove --dry-run flag to execute experiments.\n")
-        sys.exit(0)
-    
     # Initialize models
     print("Initializing models...")
     models_to_test = []
     
-    model_selection = args.models if 'all' not in args.models else ['gpt4', 'claude', 'gemini']
-    
-    if 'gpt4' in model_selection:
-        try:
-            models_to_test.append(GPT4Model())
-            print("✓ GPT-4 initialized")
-        except Exception as e:
-            print(f"✗ Failed to initialize GPT-4: {e}")
-    
-    if 'claude' in model_selection:
-        try:
-            models_to_test.append(ClaudeModel())
-            print("✓ Claude initialized")
-        except Exception as e:
-            print(f"✗ Failed to initialize Claude: {e}")
+    # One budget shared by all models of the run
+    budget = None
+    if args.max_cost is not None or args.max_tokens is not None:
+        budget = Budget(max_cost_usd=args.max_cost, max_tokens=args.max_tokens)
     
-    if 'gemini' in model_selection:
+    # Wrappers (and their SDKs) are imported only for selected models
+    for name in model_selection:
+        display_name = get_spec(name).display_name
         try:
-            models_to_test.append(GeminiModel())
-            print("✓ Gemini initialized")
+            models_to_test.append(create_model(name, budget=budget))
+            print(f"✓ {display_name} initialized")
         except Exception as e:
-            print(f"✗ Failed to initialize Gemini: {e}")
+            print(f"✗ Failed to initialize {display_name}: {e}")
     
     if not models_to_test:
         print("\n✗ No models successfully initialized. Exiting.")
@@ -123,15 +205,39 @@ def main():
     print("- Abstract reasoning: >80% accuracy")
     print("\n" + "="*70 + "\n")
     
+    # Providers run in parallel, each at its own rate limit
+    scheduler = GridScheduler(
+        models_to_test,
+        conditions=conditions,
+        seeds=args.seeds,
+        batch=args.batch,
+        pack_size=args.pack_size,
+        early_stop=args.early_stop or EARLY_STOP_STREAMING,
+        resume=args.resume,
+        sprt=args.sprt or SPRT_EARLY_STOP
+    )
+    
+    # Render every prompt and simulate the run before sending anything
+    print("Forecasting run (no API calls)...\n")
+    forecast = forecast_grid(scheduler)
+    print(format_forecast(forecast))
+    if budget is not None and budget.max_cost_usd is not None \
+            and forecast.max_cost_usd > budget.max_cost_usd:
+        print(f"⚠ Worst-case cost exceeds --max-cost ${budget.max_cost_usd:.2f}; "
+              f"the run may stop early with partial results")
+    print("\n" + "="*70 + "\n")
+    
+    if args.dry_run:
+        print("✓ Dry run complete. Configuration is valid.")
+        print("Remove --dry-run flag to execute experiments.\n")
+        sys.exit(0)
+    
     input("Press Enter to begin experiments (or Ctrl+C to cancel)...")
     
     start_time = datetime.now()
     
     try:
-        results = run_experiment_1(
-            models=models_to_test,
-            include_control=args.control
-        )
+        results = scheduler.run()
     except KeyboardInterrupt:
         print("\n\n✗ Experiments cancelled by user.")
         sys.exit(0)
@@ -151,11 +257,12 @@ def main():
     
     print(f"Total execution time: {duration/60:.1f} minutes\n")
     
-    print("Experiment 1 Results:")
+    print("Results:")
     print("-" * 50)
     for result in results:
         status = "✓" if result.accuracy >= 0.80 else "✗"
-        print(f"{status} {result.model_name:20s} {result.accuracy:6.1%} "
+        print(f"{status} {result.experiment_type:14s} seed {result.metadata['seed']:<6} "
+              f"{result.model_name:20s} {result.accuracy:6.1%} "
               f"({result.n_correct}/{result.n_total} correct)")
     
     print("\n" + "="*70)
@@ -169,17 +276,17 @@ def main():
     if high_performers:
         print("\nHigh accuracy (>80% - suggests abstract reasoning):")
         for r in high_performers:
-            print(f"  • {r.model_name}: {r.accuracy:.1%}")
+            print(f"  • {r.model_name} ({r.experiment_type}): {r.accuracy:.1%}")
     
     if medium_performers:
         print("\nMedium accuracy (40-80% - mixed/graded capacity):")
         for r in medium_performers:
-            print(f"  • {r.model_name}: {r.accuracy:.1%}")
+            print(f"  • {r.model_name} ({r.experiment_type}): {r.accuracy:.1%}")
     
     if low_performers:
         print("\nLow accuracy (<40% - suggests pattern matching):")
         for r in low_performers:
-            print(f"  • {r.model_name}: {r.accuracy:.1%}")
+            print(f"  • {r.model_name} ({r.experiment_type}): {r.accuracy:.1%}")
     
     print("\n" + "="*70)
     print("Next steps:")
@@ -199,6 +306,15 @@ def main():
         print(f"  Success rate: {stats['success_rate']:.1%}")
         print()
     
+    if budget is not None:
+        summary = budget.summary()
+        print(f"Budget: ${summary['spent_usd']:.2f} and "
+              f"{summary['spent_tokens']:,} tokens spent")
+        if summary['refused_requests']:
+            print(f"⚠ {summary['refused_requests']} request(s) refused: "
+                  f"budget exhausted, results are partial")
+        print()
+    
     print("="*70 + "\n")
 
 
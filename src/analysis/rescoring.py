@@ -0,0 +1,277 @@
+"""
+Offline rescoring of stored model outputs.
+
+Re-parses model_output_raw of every saved result in data/results/raw
+with a chosen parser and scoring policy, without any API calls, so
+scoring changes (strict vs partial credit, last-k vs first-k parsing)
+can be evaluated on existing runs.
+
+Within a file, predicted and expected sequences are packed into padded
+integer arrays (one codepoint per symbol) and compared position-wise
+with NumPy. Files are rescored in parallel worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import csv
+import json
+import os
+
+import numpy as np
+
+from src.config import RESULTS_DIR
+from src.parsing import parse_many
+from src.result_io import iter_responses, read_header, result_files
+
+# Parsers: which symbols to keep when a response has too many
+PARSERS = {
+    "last_k": "last",    # current behaviour (answer follows explanation)
+    "first_k": "first",
+}
+
+# Scoring policies
+POLICIES = ("strict", "partial")
+
+# Padding for positions past the end of a sequence (never equal)
+_PAD_PREDICTED = -1
+_PAD_EXPECTED = -2
+
+TABLE_COLUMNS = [
+    'file', 'model_name', 'experiment_type', 'seed', 'item_number',
+    'expected', 'predicted', 'n_matches', 'correct', 'score',
+    'original_correct', 'changed',
+]
+
+
+def pack_sequences(
+    sequences: Sequence[Sequence[str]],
+    width: int,
+    pad: int,
+    interned: Dict[str, int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack symbol sequences into a padded integer array.
+    
+    Single-character symbols become their codepoint. Longer tokens (the
+    fallback parse of a response without symbols) get negative IDs from
+    `interned`, shared between the arrays being compared, so equal
+    tokens still compare equal.
+    
+    Args:
+        sequences: Symbol sequences
+        width: Number of columns (at least the longest sequence)
+        pad: Value for positions past the end of a sequence
+        interned: Multi-character token IDs (updated in place)
+    
+    Returns:
+        (codes, lengths): int64 array of shape (len(sequences), width)
+        and int64 array of sequence lengths
+    """
+    codes = np.full((len(sequences), width), pad, dtype=np.int64)
+    lengths = np.fromiter((len(s) for s in sequences), dtype=np.int64, count=len(sequences))
+    for row, sequence in enumerate(sequences):
+        if not sequence:
+            continue
+        if all(len(token) == 1 for token in sequence):
+            codes[row, :len(sequence)] = np.frombuffer(
+                "".join(sequence).encode('utf-32-le'), dtype=np.uint32
+            )
+        else:
+            codes[row, :len(sequence)] = [
+                ord(token) if len(token) == 1
+                else interned.setdefault(token, -3 - len(interned))
+                for token in sequence
+            ]
+    return codes, lengths
+
+
+def score_arrays(
+    predicted: np.ndarray,
+    predicted_lengths: np.ndarray,
+    expected: np.ndarray,
+    expected_lengths: np.ndarray,
+    policy: str = "strict"
+) -> Dict[str, np.ndarray]:
+    """
+    Position-wise scoring of packed sequences.
+    
+    Matches the rules of SequentialTransformationExperiment.score_response():
+    strict requires an exact match; partial gives matches / length when
+    the lengths agree and 0 otherwise.
+    
+    Args:
+        predicted: Packed predictions, shape (n, width)
+        predicted_lengths: Prediction lengths, shape (n,)
+        expected: Packed expected outputs, shape (n, width)
+        expected_lengths: Expected lengths, shape (n,)
+        policy: "strict" or "partial"
+    
+    Returns:
+        Dictionary of arrays: n_matches, correct, score
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy}'. Available: {', '.join(POLICIES)}")
+    
+    n_matches = (predicted == expected).sum(axis=1)
+    same_length = predicted_lengths == expected_lengths
+    exact = same_length & (n_matches == expected_lengths)
+    
+    if policy == "strict":
+        score = exact.astype(np.float64)
+    else:
+        score = np.where(
+            same_length & (expected_lengths > 0),
+            n_matches / np.maximum(expected_lengths, 1),
+            np.where(exact, 1.0, 0.0)
+        )
+    return {'n_matches': n_matches, 'correct': exact, 'score': score}
+
+
+def rescore_file(filepath: Path, parser: str = "last_k", policy: str = "strict") -> List[Dict[str, Any]]:
+    """
+    Rescore one result file.
+    
+    Args:
+        filepath: Result file (any format supported by src/result_io.py)
+        parser: Parser name (see PARSERS)
+        policy: Scoring policy (see POLICIES)
+    
+    Returns:
+        One table row per response with a stored raw output
+    """
+    header = read_header(filepath)
+    responses = [
+        r for r in iter_responses(filepath)
+        if r.get('model_output_raw') is not None and r.get('expected_output') is not None
+    ]
+    if not responses:
+        return []
+    
+    expected = [r['expected_output'] for r in responses]
+    predicted = parse_many(
+        [r['model_output_raw'] for r in responses],
+        [len(e) for e in expected],
+        take=PARSERS[parser]
+    )
+    
+    width = max(1, max(len(s) for s in expected), max(len(s) for s in predicted))
+    interned: Dict[str, int] = {}
+    predicted_codes, predicted_lengths = pack_sequences(predicted, width, _PAD_PREDICTED, interned)
+    expected_codes, expected_lengths = pack_sequences(expected, width, _PAD_EXPECTED, interned)
+    scores = score_arrays(predicted_codes, predicted_lengths, expected_codes, expected_lengths, policy)
+    
+    rows = []
+    for i, response in enumerate(responses):
+        correct = bool(scores['correct'][i])
+        rows.append({
+            'file': Path(filepath).name,
+            'model_name': header.get('model_name'),
+            'experiment_type': header.get('experiment_type'),
+            'seed': (header.get('metadata') or {}).get('seed'),
+            'item_number': response.get('item_number', i + 1),
+            'expected': " ".join(expected[i]),
+            'predicted': " ".join(predicted[i]),
+            'n_matches': int(scores['n_matches'][i]),
+            'correct': correct,
+            'score': float(scores['score'][i]),
+            'original_correct': response.get('correct'),
+            'changed': response.get('correct') is not None and correct != response['correct'],
+        })
+    return rows
+
+
+def _rescore_file_job(args: Tuple[Path, str, str]) -> Tuple[Path, List[Dict[str, Any]], Optional[str]]:
+    filepath, parser, policy = args
+    try:
+        return filepath, rescore_file(filepath, parser, policy), None
+    except (OSError, ValueError, KeyError) as e:
+        return filepath, [], str(e)
+
+
+def rescore_results(
+    results_dir: Path = RESULTS_DIR / "raw",
+    parser: str = "last_k",
+    policy: str = "strict",
+    output: Optional[Path] = None,
+    workers: Optional[int] = None,
+    pattern: str = "*"
+) -> Dict[str, Any]:
+    """
+    Rescore every result file in a directory and write a scored table.
+    
+    Args:
+        results_dir: Directory of saved results
+        parser: Parser name (see PARSERS)
+        policy: Scoring policy (see POLICIES)
+        output: CSV path (default: data/results/processed/
+            rescored_<parser>_<policy>.csv)
+        workers: Worker processes (default: CPU count)
+        pattern: Glob for result file stems (e.g. "exp1b_*")
+    
+    Returns:
+        Summary with per-file accuracy (original and rescored), the
+        number of rows and changed items, files skipped, and the output path
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser '{parser}'. Available: {', '.join(PARSERS)}")
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy}'. Available: {', '.join(POLICIES)}")
+    
+    files = result_files(results_dir, pattern)
+    output = Path(output or RESULTS_DIR / "processed" / f"rescored_{parser}_{policy}.csv")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    
+    jobs = [(filepath, parser, policy) for filepath in files]
+    if workers == 1:
+        outcomes = map(_rescore_file_job, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        outcomes = executor.map(_rescore_file_job, jobs, chunksize=4)
+    
+    per_file = {}
+    skipped = {}
+    n_rows = 0
+    n_changed = 0
+    try:
+        with open(output, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS)
+            writer.writeheader()
+            for filepath, rows, error in outcomes:
+                if error is not None:
+                    skipped[filepath.name] = error
+                    continue
+                if not rows:
+                    continue
+                writer.writerows(rows)
+                n_rows += len(rows)
+                n_changed += sum(row['changed'] for row in rows)
+                original = [row['original_correct'] for row in rows if row['original_correct'] is not None]
+                per_file[filepath.name] = {
+                    'model_name': rows[0]['model_name'],
+                    'experiment_type': rows[0]['experiment_type'],
+                    'n_items': len(rows),
+                    'original_accuracy': sum(original) / len(original) if original else None,
+                    'accuracy': sum(row['correct'] for row in rows) / len(rows),
+                    'mean_score': sum(row['score'] for row in rows) / len(rows),
+                }
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    
+    return {
+        'parser': parser,
+        'policy': policy,
+        'n_files': len(per_file),
+        'n_rows': n_rows,
+        'n_changed': n_changed,
+        'files': per_file,
+        'skipped': skipped,
+        'output': str(output),
+    }
+
+
+def save_summary(summary: Dict[str, Any], filepath: Path):
+    """Save a rescoring summary next to its table."""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
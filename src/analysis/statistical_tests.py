@@ -0,0 +1,118 @@
+"""
+Statistical tests for experiment results.
+
+SequentialProbabilityRatioTest is Wald's sequential probability ratio
+test for a run's per-item correctness: after each scored item it updates
+the log-likelihood ratio of "accuracy at the reasoning threshold" (H1)
+against "accuracy at chance" (H0) and stops as soon as the ratio leaves
+the band set by the error rates,
+
+    log(beta / (1 - alpha)) < LLR < log((1 - beta) / alpha)
+
+Runs that are clearly at chance (e.g. 0/10 correct) or clearly above
+threshold are decided after a handful of items, so the remaining
+requests need not be sent.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+import math
+
+from src.config import ALPHA, SPRT_BETA
+
+# Decisions of the sequential test
+ACCEPT_H0 = "accept_h0"  # accuracy consistent with chance
+ACCEPT_H1 = "accept_h1"  # accuracy consistent with the reasoning threshold
+
+
+@dataclass
+class SequentialProbabilityRatioTest:
+    """
+    Wald's SPRT for a Bernoulli success rate, p0 (H0) vs p1 (H1).
+    
+    Attributes:
+        p0: Success rate under H0 (chance accuracy)
+        p1: Success rate under H1 (reasoning threshold); must exceed p0
+        alpha: Probability of accepting H1 when H0 is true
+        beta: Probability of accepting H0 when H1 is true
+        log_likelihood_ratio: Current log(L(p1) / L(p0))
+        n_observed: Items observed so far
+        n_successes: Correct items observed so far
+        decision: ACCEPT_H0, ACCEPT_H1, or None while undecided
+        stopped_at: Number of items observed when the decision was reached
+    """
+    p0: float
+    p1: float
+    alpha: float = ALPHA
+    beta: float = SPRT_BETA
+    log_likelihood_ratio: float = 0.0
+    n_observed: int = 0
+    n_successes: int = 0
+    decision: Optional[str] = None
+    stopped_at: Optional[int] = None
+    _success_step: float = field(init=False, repr=False)
+    _failure_step: float = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        if not 0 < self.p0 < self.p1 < 1:
+            raise ValueError(f"Need 0 < p0 < p1 < 1, got p0={self.p0}, p1={self.p1}")
+        if not (0 < self.alpha < 1 and 0 < self.beta < 1):
+            raise ValueError(f"Error rates must be in (0, 1), got alpha={self.alpha}, beta={self.beta}")
+        self._success_step = math.log(self.p1 / self.p0)
+        self._failure_step = math.log((1 - self.p1) / (1 - self.p0))
+    
+    @property
+    def lower_bound(self) -> float:
+        """Accept H0 at or below this log-likelihood ratio."""
+        return math.log(self.beta / (1 - self.alpha))
+    
+    @property
+    def upper_bound(self) -> float:
+        """Accept H1 at or above this log-likelihood ratio."""
+        return math.log((1 - self.beta) / self.alpha)
+    
+    @property
+    def decided(self) -> bool:
+        return self.decision is not None
+    
+    def update(self, success: bool) -> Optional[str]:
+        """
+        Add one scored item.
+        
+        Items observed after the decision are counted but do not change it.
+        
+        Args:
+            success: Whether the item was answered correctly
+        
+        Returns:
+            The decision (None while undecided)
+        """
+        self.n_observed += 1
+        self.n_successes += int(success)
+        if self.decided:
+            return self.decision
+        
+        self.log_likelihood_ratio += self._success_step if success else self._failure_step
+        if self.log_likelihood_ratio >= self.upper_bound:
+            self.decision = ACCEPT_H1
+        elif self.log_likelihood_ratio <= self.lower_bound:
+            self.decision = ACCEPT_H0
+        if self.decided:
+            self.stopped_at = self.n_observed
+        return self.decision
+    
+    def summary(self) -> Dict[str, Any]:
+        """Test parameters and outcome, for result metadata."""
+        return {
+            'p0': self.p0,
+            'p1': self.p1,
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'lower_bound': self.lower_bound,
+            'upper_bound': self.upper_bound,
+            'log_likelihood_ratio': self.log_likelihood_ratio,
+            'n_observed': self.n_observed,
+            'n_successes': self.n_successes,
+            'decision': self.decision,
+            'stopped_at': self.stopped_at,
+        }
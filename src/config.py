@@ -8,7 +8,7 @@ for minimal co-occurrence in pretraining data.
 
 import os
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -23,11 +23,13 @@ DATA_DIR = PROJECT_ROOT / "data"
 SYMBOLS_DIR = DATA_DIR / "symbols"
 EXPERIMENTS_DIR = DATA_DIR / "experiments"
 RESULTS_DIR = DATA_DIR / "results"
+CACHE_DIR = DATA_DIR / "cache"
+JOURNAL_DIR = DATA_DIR / "journal"
 OUTPUTS_DIR = PROJECT_ROOT / "outputs"
 
 # Ensure directories exist
 for directory in [SYMBOLS_DIR, EXPERIMENTS_DIR, RESULTS_DIR / "raw", 
-                  RESULTS_DIR / "processed", OUTPUTS_DIR / "figures", 
+                  RESULTS_DIR / "processed", CACHE_DIR, JOURNAL_DIR, OUTPUTS_DIR / "figures", 
                   OUTPUTS_DIR / "tables"]:
     directory.mkdir(parents=True, exist_ok=True)
 
@@ -40,16 +42,99 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+# Environment variable holding each provider's key (see validate_config)
+PROVIDER_API_KEYS: Dict[str, str] = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+    "google": "GOOGLE_API_KEY",
+}
+
 # Model names
 GPT4_MODEL = os.getenv("GPT4_MODEL", "gpt-4-0125-preview")
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-3-5-sonnet-20241022")
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
 
+# Pricing in USD per 1M tokens (see src/models/budget.py); models not
+# listed here are budgeted by tokens only. Optional: "cache_read" and
+# "cache_write" price prompt tokens read from / written to the provider's
+# prompt cache (default: "input"), and "batch" is the price multiplier
+# for requests sent through the batch API (default: 1.0)
+MODEL_PRICING: Dict[str, Dict[str, float]] = {
+    "gpt-4-0125-preview": {"input": 10.00, "output": 30.00, "batch": 0.5},
+    "claude-3-5-sonnet-20241022": {
+        "input": 3.00, "output": 15.00,
+        "cache_read": 0.30, "cache_write": 3.75, "batch": 0.5,
+    },
+    "gemini-2.0-flash-exp": {"input": 0.10, "output": 0.40, "cache_read": 0.025},
+}
+
+# Run budget caps (unset = unlimited); requests beyond a cap are not sent
+BUDGET_MAX_COST_USD = float(os.getenv("BUDGET_MAX_COST_USD")) if os.getenv("BUDGET_MAX_COST_USD") else None
+BUDGET_MAX_TOKENS = int(os.getenv("BUDGET_MAX_TOKENS")) if os.getenv("BUDGET_MAX_TOKENS") else None
+
 # API settings
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
-RATE_LIMIT_DELAY = float(os.getenv("RATE_LIMIT_DELAY", "1.0"))
+RATE_LIMIT_DELAY = float(os.getenv("RATE_LIMIT_DELAY", "1.0"))  # Base retry backoff (seconds)
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))  # Backoff ceiling (seconds)
+
+# Circuit breaker: pause all requests to a provider after repeated failures
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5"))  # consecutive failures
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "30"))  # seconds
 REQUEST_TIMEOUT = 60  # seconds
 
+# Per-provider quotas, shared by all model instances in the process
+# (requests per minute / tokens per minute; defaults are entry-tier limits)
+RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "openai": {
+        "requests_per_minute": int(os.getenv("OPENAI_RPM", "500")),
+        "tokens_per_minute": int(os.getenv("OPENAI_TPM", "10000")),
+    },
+    "anthropic": {
+        "requests_per_minute": int(os.getenv("ANTHROPIC_RPM", "50")),
+        "tokens_per_minute": int(os.getenv("ANTHROPIC_TPM", "40000")),
+    },
+    "google": {
+        "requests_per_minute": int(os.getenv("GOOGLE_RPM", "10")),
+        "tokens_per_minute": int(os.getenv("GOOGLE_TPM", "4000000")),
+    },
+}
+
+# Requests kept in flight per model by BaseModel.generate_many()
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "4"))
+
+# Hedged requests (async path): duplicate calls that outlive the model's
+# observed p95 latency, for at most HEDGE_MAX_RATE of calls
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "false").lower() == "true"
+HEDGE_MAX_RATE = float(os.getenv("HEDGE_MAX_RATE", "0.05"))
+HEDGE_MIN_SAMPLES = 20  # latency samples needed before hedging starts
+
+# Persistent cache of deterministic (temperature 0) responses. Off by
+# default so every run samples fresh; set RESPONSE_CACHE_ENABLED=true (or
+# pass use_cache=True) to replay cached responses, e.g. while developing
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_PATH = CACHE_DIR / "responses.sqlite"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "100000"))
+RESPONSE_CACHE_MAX_AGE_DAYS = float(os.getenv("RESPONSE_CACHE_MAX_AGE_DAYS", "90"))
+
+# Provider-side caching of the shared training-block prefix
+# (Anthropic cache_control, OpenAI automatic prefix caching, Gemini context caching)
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() == "true"
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = 32768  # Gemini rejects smaller cached contents
+GEMINI_CONTEXT_CACHE_TTL = 3600  # seconds
+
+# Stream responses and stop once a complete answer line has arrived
+EARLY_STOP_STREAMING = os.getenv("EARLY_STOP_STREAMING", "false").lower() == "true"
+
+# Provider batch APIs (run_model(..., batch=True))
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "30"))  # seconds
+BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", str(24 * 3600)))  # seconds
+
+# Per-item run journals: run_model appends each answered request, so an
+# interrupted run can be resumed (run_model(..., resume=True))
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+JOURNAL_FSYNC_EVERY = int(os.getenv("JOURNAL_FSYNC_EVERY", "8"))  # records per fsync
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "1.0"))  # seconds
+
 # ============================================================================
 # EXPERIMENTAL PARAMETERS
 # ============================================================================
@@ -110,6 +195,49 @@ GEOMETRIC_SHAPES: List[str] = [
 # Combined pool (168 unique symbols)
 ALL_SYMBOLS = MATHEMATICAL_OPERATORS + MISCELLANEOUS_SYMBOLS + GEOMETRIC_SHAPES
 
+# Generated pools: every symbol of the declared codepoint ranges whose
+# Unicode category is in "categories", minus the exclusions. Pools are
+# built by src/symbol_pools.py on first use and cached in
+# data/cache/symbol_pools/, so importing this module stays cheap.
+# "default" is ALL_SYMBOLS above.
+SYMBOL_POOL = os.getenv("SYMBOL_POOL", "default")
+
+# Unicode categories kept by default (math symbols, other symbols)
+SYMBOL_POOL_CATEGORIES = ("Sm", "So")
+
+# Never drawn: the prompt's arrow and Experiment 2's operators
+SYMBOL_POOL_EXCLUDE: List[str] = ["→", "⊗", "⊕", "⊙", "⊘"]
+
+_EXTENDED_RANGES = [
+    (0x2200, 0x22FF),  # Mathematical Operators
+    (0x25A0, 0x25FF),  # Geometric Shapes
+    (0x27C0, 0x27EF),  # Miscellaneous Mathematical Symbols-A
+    (0x2980, 0x29FF),  # Miscellaneous Mathematical Symbols-B
+    (0x2A00, 0x2AFF),  # Supplemental Mathematical Operators
+    (0x2B00, 0x2BFF),  # Miscellaneous Symbols and Arrows
+]
+
+SYMBOL_POOLS: Dict[str, Dict] = {
+    # ~1,000 symbols from the blocks of ALL_SYMBOLS and their neighbours
+    "extended": {
+        "ranges": _EXTENDED_RANGES,
+    },
+    # ~2,200 symbols, adding rarely used BMP and plane 1 blocks
+    "large": {
+        "ranges": _EXTENDED_RANGES + [
+            (0x2800, 0x28FF),    # Braille Patterns
+            (0x2E80, 0x2EFF),    # CJK Radicals Supplement
+            (0x2F00, 0x2FDF),    # Kangxi Radicals
+            (0x4DC0, 0x4DFF),    # Yijing Hexagram Symbols
+            (0x1D000, 0x1D0FF),  # Byzantine Musical Symbols
+            (0x1D300, 0x1D35F),  # Tai Xuan Jing Symbols
+            (0x1F700, 0x1F77F),  # Alchemical Symbols
+            (0x1F780, 0x1F7FF),  # Geometric Shapes Extended
+        ],
+        "exclude": ["\u2800"],  # blank Braille pattern
+    },
+}
+
 # ============================================================================
 # EXPERIMENT 1: SEQUENTIAL TRANSFORMATION
 # ============================================================================
@@ -187,6 +315,12 @@ EXP3_REASONING_THRESHOLD = 0.90
 # Significance level (α)
 ALPHA = 0.05
 
+# Sequential early stopping of test runs (run_model(..., sprt=True)):
+# Wald's SPRT of chance accuracy (H0) against the reasoning threshold (H1),
+# with type I error ALPHA and type II error SPRT_BETA
+SPRT_EARLY_STOP = os.getenv("SPRT_EARLY_STOP", "false").lower() == "true"
+SPRT_BETA = float(os.getenv("SPRT_BETA", str(ALPHA)))
+
 # Effect size thresholds (Cohen's d)
 SMALL_EFFECT = 0.2
 MEDIUM_EFFECT = 0.5
@@ -205,6 +339,12 @@ EXP1_PROMPT_TEMPLATE = """{training_examples}
 
 {test_input} →"""
 
+# Packed screening mode: K numbered test inputs after one training block
+# ({test_inputs} is one "N. A B C →" line per item)
+EXP1_PACKED_PROMPT_TEMPLATE = """{training_examples}
+
+{test_inputs}"""
+
 # Control condition: Same structure with familiar symbols (letters)
 EXP1_CONTROL_PROMPT_TEMPLATE = """{training_examples}
 
@@ -217,6 +357,12 @@ EXP1_CONTROL_PROMPT_TEMPLATE = """{training_examples}
 # Result file naming
 RESULT_FILENAME_TEMPLATE = "{experiment}_{model}_{timestamp}.json"
 
+# Result file format (see src/result_io.py): "ndjson" (header line + one
+# line per response) or "json" (indented ExperimentResult.to_dict() export)
+RESULT_FORMAT = os.getenv("RESULT_FORMAT", "ndjson")
+# Compression for NDJSON results: "gzip", "zstd" (needs zstandard) or unset
+RESULT_COMPRESSION = os.getenv("RESULT_COMPRESSION") or None
+
 # Logging configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -225,33 +371,40 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 # VALIDATION
 # ============================================================================
 
-def validate_config() -> bool:
+def validate_config(providers: Optional[Iterable[str]] = None) -> bool:
     """
     Validate configuration parameters.
     
+    Args:
+        providers: Provider keys whose API keys are required (default:
+            all of PROVIDER_API_KEYS); providers without keys (e.g.
+            "replay") are ignored
+    
     Returns:
         bool: True if configuration is valid, raises ValueError otherwise
     """
-    # Check API keys
-    if not OPENAI_API_KEY:
-        raise ValueError("OPENAI_API_KEY not set in .env file")
-    if not ANTHROPIC_API_KEY:
-        raise ValueError("ANTHROPIC_API_KEY not set in .env file")
-    if not GOOGLE_API_KEY:
-        raise ValueError("GOOGLE_API_KEY not set in .env file")
+    # Check API keys (only for the providers that will be used)
+    for provider in (PROVIDER_API_KEYS if providers is None else providers):
+        key_var = PROVIDER_API_KEYS.get(provider)
+        if key_var and not os.getenv(key_var):
+            raise ValueError(f"{key_var} not set in .env file")
     
     # Check symbol pool sizes
     # Need: training symbols + test symbols (disjoint sets)
+    from src.symbol_pools import get_symbol_pool
+    pool = get_symbol_pool(SYMBOL_POOL)
     symbols_needed = (TRAINING_SET_SIZE + TEST_SET_SIZE) * EXP1_SEQUENCE_LENGTH
-    if len(ALL_SYMBOLS) < symbols_needed:
+    if len(pool) < symbols_needed:
         raise ValueError(
             f"Insufficient symbols: Need at least "
-            f"{symbols_needed} unique symbols, have {len(ALL_SYMBOLS)}"
+            f"{symbols_needed} unique symbols, have {len(pool)}"
         )
     
     # Check statistical parameters
     if not 0 < ALPHA < 1:
         raise ValueError(f"Alpha must be between 0 and 1, got {ALPHA}")
+    if not 0 < SPRT_BETA < 1:
+        raise ValueError(f"SPRT beta must be between 0 and 1, got {SPRT_BETA}")
     
     return True
 
@@ -15,9 +15,11 @@ CRITICAL DESIGN PRINCIPLE:
 
 import json
 import random
+import re
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple, Dict, Any
-from dataclasses import dataclass, asdict
+from typing import List, Tuple, Dict, Any, Callable, Optional
+from dataclasses import dataclass, asdict, field, replace
 from datetime import datetime
 
 from src.config import (
@@ -25,12 +27,26 @@ from src.config import (
     TEST_SET_SIZE,
     EXP1_SEQUENCE_LENGTH,
     EXP1_PROMPT_TEMPLATE,
+    EXP1_PACKED_PROMPT_TEMPLATE,
+    EXP1_CHANCE_ACCURACY,
+    EXP1_REASONING_THRESHOLD,
+    EARLY_STOP_STREAMING,
+    JOURNAL_ENABLED,
+    SPRT_EARLY_STOP,
     RANDOM_SEED,
     EXPERIMENTS_DIR,
     RESULTS_DIR,
+    RESULT_FORMAT,
+    RESULT_COMPRESSION,
 )
+from src.result_io import result_path, result_stem, write_result
+from src.parsing import is_special_symbol, parse_answer
 from src.symbol_generator import SymbolGenerator
 from src.models.base_model import BaseModel, ModelResponse
+from src.models.stats import RequestStats
+from src.models.budget import format_estimate
+from src.experiments.journal import RunJournal, make_run_id
+from src.analysis.statistical_tests import SequentialProbabilityRatioTest
 
 
 @dataclass
@@ -58,6 +74,57 @@ class SequenceExample:
         return asdict(self)
 
 
+class CompiledPrompt:
+    """
+    A prompt template with its training block already rendered.
+    
+    Every prompt of a condition shares the same training block, so it is
+    formatted once here instead of once per test item. What remains is a
+    fixed head and tail around the per-item field, and each prompt is a
+    single concatenation.
+    """
+    
+    def __init__(
+        self,
+        template: str,
+        training_examples: List[SequenceExample],
+        field_name: str = "test_input"
+    ):
+        """
+        Render the parts of the template that do not depend on the item.
+        
+        Args:
+            template: Template with {training_examples} and one {<field_name>}
+            training_examples: Training examples shown in every prompt
+            field_name: Per-item template field
+        
+        Raises:
+            ValueError: If the template does not contain the field exactly once
+        """
+        placeholder = "{" + field_name + "}"
+        if template.count(placeholder) != 1:
+            raise ValueError(f"Template must contain {placeholder} exactly once")
+        
+        self.training_examples = training_examples
+        self.training_block = "\n".join(ex.to_string() for ex in training_examples)
+        head, tail = template.split(placeholder)
+        self.head = head.format(training_examples=self.training_block)
+        self.tail = tail.format(training_examples=self.training_block)
+    
+    def render_text(self, text: str) -> str:
+        """Prompt with an already formatted per-item field."""
+        return f"{self.head}{text}{self.tail}"
+    
+    def render(self, test_input: List[str]) -> str:
+        """Prompt for one test input sequence."""
+        return f"{self.head}{' '.join(test_input)}{self.tail}"
+    
+    def render_many(self, test_inputs: List[List[str]]) -> List[str]:
+        """Prompts for many test inputs, in order."""
+        head, tail = self.head, self.tail
+        return [f"{head}{' '.join(test_input)}{tail}" for test_input in test_inputs]
+
+
 @dataclass
 class ExperimentResult:
     """
@@ -72,6 +139,8 @@ class ExperimentResult:
         responses: List of individual test responses
         metadata: Additional information
         timestamp: When experiment was run
+        request_stats: Per-request latency/token samples for this run
+            (saved alongside the result, not inside it)
     """
     model_name: str
     experiment_type: str
@@ -81,16 +150,288 @@ class ExperimentResult:
     responses: List[Dict]
     metadata: Dict
     timestamp: str
+    request_stats: Optional[RequestStats] = field(default=None, repr=False, compare=False)
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization."""
-        return asdict(self)
+        data = asdict(replace(self, request_stats=None))
+        data.pop('request_stats')
+        return data
     
-    def save(self, filepath: Path):
-        """Save result to JSON file."""
+    def export_json(self, filepath: Path):
+        """Save result as one indented JSON document (to_dict() layout)."""
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+    
+    def save(
+        self,
+        filepath: Path,
+        format: str = RESULT_FORMAT,
+        compression: Optional[str] = RESULT_COMPRESSION
+    ) -> Path:
+        """
+        Save result (and request stats to <name>.stats.json).
+        
+        Args:
+            filepath: Target path; for NDJSON its suffix is replaced by
+                .ndjson / .ndjson.gz / .ndjson.zst
+            format: "ndjson" (streamable, see src/result_io.py) or "json"
+            compression: None, "gzip" or "zstd" (NDJSON only)
+        
+        Returns:
+            Path actually written
+        """
+        if format == "json":
+            filepath = Path(filepath)
+            self.export_json(filepath)
+        elif format == "ndjson":
+            filepath = result_path(filepath, compression)
+            header = {
+                'model_name': self.model_name,
+                'experiment_type': self.experiment_type,
+                'accuracy': self.accuracy,
+                'n_correct': self.n_correct,
+                'n_total': self.n_total,
+                'metadata': self.metadata,
+                'timestamp': self.timestamp,
+            }
+            write_result(header, self.responses, filepath)
+        else:
+            raise ValueError(f"Unknown result format '{format}' (use 'ndjson' or 'json')")
         print(f"✓ Saved result to {filepath}")
+        
+        if self.request_stats is not None:
+            stem = result_stem(filepath)
+            self.request_stats.save(stem.with_name(stem.name + '.stats.json'))
+        return filepath
+
+
+class PendingRun:
+    """
+    One model's run of an experiment, prepared but not yet sent.
+    
+    Renders the prompts, opens the run's journal (recovering journaled
+    responses on resume) and sets up the sequential early-stop test, then
+    collects responses as they arrive. run_model() sends a single
+    PendingRun; a replication sends the runs of all its seeds together
+    (see send_runs).
+    """
+    
+    def __init__(
+        self,
+        experiment: 'SequentialTransformationExperiment',
+        model: BaseModel,
+        training_examples: List[SequenceExample],
+        test_examples: List[SequenceExample],
+        experiment_type: str = "main",
+        batch: bool = False,
+        pack_size: int = 1,
+        early_stop: bool = EARLY_STOP_STREAMING,
+        journal: bool = JOURNAL_ENABLED,
+        resume: bool = False,
+        sprt: bool = SPRT_EARLY_STOP
+    ):
+        """
+        Prepare a run (arguments as for run_model()).
+        
+        Raises:
+            ValueError: If pack_size < 1
+        """
+        if pack_size < 1:
+            raise ValueError(f"pack_size must be >= 1, got {pack_size}")
+        self.experiment = experiment
+        self.model = model
+        self.training_examples = training_examples
+        self.test_examples = test_examples
+        self.experiment_type = experiment_type
+        self.pack_size = pack_size
+        self.packed = pack_size > 1
+        self.batch_requested = batch
+        self.batch = batch and model.supports_batch
+        self.early_stop = early_stop and not self.packed and not self.batch
+        sprt = sprt and not self.packed and not self.batch
+        
+        self.stats_mark = len(model.stats)
+        
+        self.prompts = experiment.build_prompts(training_examples, test_examples, pack_size)
+        # Room for K answers in one reply
+        self.generate_kwargs = {'max_tokens': model.max_tokens * pack_size} if self.packed else {}
+        
+        # Journal responses as they arrive, keyed by run ID and request index
+        self.run_id = None
+        self.journal = None
+        if journal or resume:
+            self.run_id = make_run_id(experiment_type, model.model_name, experiment.seed, self.prompts)
+            self.journal = RunJournal(self.run_id, resume=resume)
+        
+        self.responses: List[Optional[ModelResponse]] = [
+            self.journal.response(i) if self.journal is not None else None
+            for i in range(len(self.prompts))
+        ]
+        self.pending = [i for i, response in enumerate(self.responses) if response is None]
+        self.n_resumed = len(self.prompts) - len(self.pending)
+        
+        # Sequential test over items in order, fed as responses arrive
+        self.sprt_test = None
+        self._sprt_position = 0
+        if sprt:
+            self.sprt_test = SequentialProbabilityRatioTest(
+                p0=experiment.chance_accuracy, p1=EXP1_REASONING_THRESHOLD
+            )
+            self._advance_sprt()
+    
+    @property
+    def decided(self) -> bool:
+        """Whether the early-stop test has decided (no more requests needed)."""
+        return self.sprt_test is not None and self.sprt_test.decided
+    
+    def stop_condition(self, i: int) -> Callable[[str], bool]:
+        """Early-stop callback closing request i's stream once its answer line is complete."""
+        return partial(
+            self.experiment.is_answer_line,
+            expected_length=len(self.test_examples[i].output_sequence)
+        )
+    
+    def record(self, i: int, response: ModelResponse):
+        """Journal request i's response and feed it to the early-stop test."""
+        if self.journal is not None:
+            self.journal.record(i, self.prompts[i], response)
+        self.responses[i] = response
+        if self.sprt_test is not None:
+            self._advance_sprt()
+    
+    def _advance_sprt(self):
+        while (not self.sprt_test.decided and self._sprt_position < len(self.responses)
+               and self.responses[self._sprt_position] is not None):
+            response = self.responses[self._sprt_position]
+            expected = self.test_examples[self._sprt_position].output_sequence
+            self._sprt_position += 1
+            if response.metadata.get('budget_exceeded') or response.metadata.get('not_sent'):
+                continue
+            predicted = self.experiment.parse_response(response.text, expected_length=len(expected))
+            self.sprt_test.update(self.experiment.score_response(predicted, expected)['correct'])
+    
+    def close(self):
+        """Close the journal (everything answered so far is on disk)."""
+        if self.journal is not None:
+            self.journal.close()
+    
+    def score(self, request_stats: Optional[RequestStats] = None) -> ExperimentResult:
+        """
+        Score the collected responses.
+        
+        Args:
+            request_stats: Request samples to attach (default: the model's
+                requests since the run was prepared)
+        
+        Returns:
+            ExperimentResult object
+        """
+        if self.sprt_test is not None:
+            if self.sprt_test.decided:
+                print(f"SPRT decision: {self.sprt_test.decision} after "
+                      f"{self.sprt_test.stopped_at} item(s)\n")
+            else:
+                print("SPRT: no decision by the last item\n")
+        
+        return self.experiment.score_responses(
+            self.model,
+            self.training_examples,
+            self.test_examples,
+            self.prompts,
+            self.responses,
+            experiment_type=self.experiment_type,
+            pack_size=self.pack_size,
+            run_metadata={
+                'batch_mode': self.batch,
+                'early_stop': self.early_stop,
+                'run_id': self.run_id,
+                'n_resumed': self.n_resumed,
+                'sprt': self.sprt_test.summary() if self.sprt_test is not None else None,
+            },
+            request_stats=(request_stats if request_stats is not None
+                           else self.model.stats.since(self.stats_mark))
+        )
+
+
+def send_runs(
+    model: BaseModel,
+    runs: List[PendingRun],
+    should_stop: Optional[Callable[[], bool]] = None
+):
+    """
+    Send the pending requests of one or more prepared runs of a model.
+    
+    All requests go through a single generate_batch() or generate_many()
+    call, so with several runs (e.g. the seeds of a replication) the
+    model's concurrency is shared across them instead of each short run
+    ending on a tail of idle slots. Responses are journaled and fed to
+    each run's early-stop test as they arrive; a run whose test has
+    decided sends no further requests.
+    
+    Args:
+        model: Model to send to
+        runs: Runs prepared with the same options
+        should_stop: Checked before each request is sent; once it returns
+            True no further requests are sent (requests in flight still
+            complete and are journaled). Not checked by batch jobs.
+    """
+    pending = [(run, i) for run in runs for i in run.pending]
+    prompts = [run.prompts[i] for run, i in pending]
+    first = runs[0]
+    generate_kwargs: Dict[str, Any] = dict(first.generate_kwargs)
+    
+    # Check the plan against the run budget before sending anything
+    if model.budget is not None:
+        estimate = model.budget.estimate(
+            model.model_name, prompts,
+            generate_kwargs.get('max_tokens', model.max_tokens),
+            batch=first.batch
+        )
+        remaining = model.budget.remaining()
+        print(f"Budget estimate: {format_estimate(estimate)}")
+        if remaining['cost_usd'] is not None:
+            print(f"Budget remaining: ${remaining['cost_usd']:.2f}")
+        if remaining['tokens'] is not None:
+            print(f"Budget remaining: {remaining['tokens']:,} tokens")
+        print()
+    
+    # Get model responses for the pending requests (returned in request order)
+    try:
+        if not pending:
+            return
+        if first.batch:
+            print(f"Submitting {len(pending)} requests as one batch job...\n")
+            responses = model.generate_batch(prompts, **generate_kwargs)
+            for (run, i), response in zip(pending, responses):
+                run.record(i, response)
+            return
+        
+        if first.batch_requested:
+            print(f"⚠ {model.model_name} has no batch API; "
+                  f"sending requests concurrently instead")
+        print(f"Sending {len(pending)} requests "
+              f"(up to {model.max_concurrency} in flight)...\n")
+        if first.early_stop:
+            # Close each stream once its answer line is complete
+            generate_kwargs['stop_conditions'] = [run.stop_condition(i) for run, i in pending]
+        if should_stop is not None or any(run.sprt_test is not None for run in runs):
+            generate_kwargs['should_stop'] = lambda j: (
+                pending[j][0].decided or (should_stop is not None and should_stop())
+            )
+        
+        def on_result(j: int, response: ModelResponse):
+            run, i = pending[j]
+            run.record(i, response)
+        
+        responses = model.generate_many(prompts, on_result=on_result, **generate_kwargs)
+        # Requests left unsent after an early-stop decision never reach on_result
+        for (run, i), response in zip(pending, responses):
+            run.responses[i] = response
+    finally:
+        # Whatever was answered before a crash or Ctrl+C is on disk
+        for run in runs:
+            run.close()
 
 
 class SequentialTransformationExperiment:
@@ -105,6 +446,12 @@ class SequentialTransformationExperiment:
     - Analyzing results
     """
     
+    # Prompt layout used by create_prompt() (subclasses may override)
+    prompt_template = EXP1_PROMPT_TEMPLATE
+    
+    # Accuracy expected from guessing (H0 of the sequential early-stop test)
+    chance_accuracy = EXP1_CHANCE_ACCURACY
+    
     def __init__(self, seed: int = RANDOM_SEED):
         """
         Initialize experiment.
@@ -121,6 +468,26 @@ class SequentialTransformationExperiment:
         self.test_examples: List[SequenceExample] = []
         self.control_examples: List[SequenceExample] = []
         
+        # Compiled prompts by (template, field, training example identities)
+        self._compiled_prompts: Dict[Tuple, CompiledPrompt] = {}
+        
+    def examples_file(self, name: str) -> Path:
+        """
+        Path of this condition's saved examples.
+        
+        Non-default seeds get their own file, so replications never
+        overwrite each other's stimuli.
+        
+        Args:
+            name: Condition file name stem (e.g., "exp1b_minimal")
+        
+        Returns:
+            EXPERIMENTS_DIR / "<name>_examples.json" (or
+            "<name>_examples_seed<seed>.json")
+        """
+        seed_part = f"_seed{self.seed}" if self.seed != RANDOM_SEED else ""
+        return EXPERIMENTS_DIR / f"{name}_examples{seed_part}.json"
+    
     def rotate_left(self, sequence: List[str]) -> List[str]:
         """
         Apply rotate-left transformation: last element moves to first.
@@ -197,19 +564,141 @@ class SequentialTransformationExperiment:
         Returns:
             Formatted prompt string
         """
-        # Format training examples
-        training_str = "\n".join([ex.to_string() for ex in training_examples])
+        return self.compile_prompt(training_examples).render(test_input)
+    
+    def create_prompts(
+        self,
+        training_examples: List[SequenceExample],
+        test_inputs: List[List[str]]
+    ) -> List[str]:
+        """
+        Create the prompts for many test inputs at once.
+        
+        Equivalent to calling create_prompt() per input, but the training
+        block is rendered only once.
+        
+        Args:
+            training_examples: List of training examples
+            test_inputs: Test input sequences, in item order
+            
+        Returns:
+            Formatted prompt strings, in item order
+        """
+        return self.compile_prompt(training_examples).render_many(test_inputs)
+    
+    def compile_prompt(
+        self,
+        training_examples: List[SequenceExample],
+        template: Optional[str] = None,
+        field_name: str = "test_input"
+    ) -> CompiledPrompt:
+        """
+        Get the compiled prompt for a training set (compiled on first use).
         
-        # Format test input
-        test_str = " ".join(test_input)
+        Args:
+            training_examples: List of training examples
+            template: Prompt template (default: self.prompt_template)
+            field_name: Per-item template field
+            
+        Returns:
+            CompiledPrompt for the training set and template
+        """
+        template = template or self.prompt_template
+        # The compiled prompt holds the examples, so their ids stay unique
+        key = (template, field_name, tuple(id(ex) for ex in training_examples))
+        compiled = self._compiled_prompts.get(key)
+        if compiled is None:
+            compiled = CompiledPrompt(template, training_examples, field_name)
+            self._compiled_prompts[key] = compiled
+        return compiled
+    
+    def create_packed_prompt(
+        self,
+        training_examples: List[SequenceExample],
+        test_inputs: List[List[str]]
+    ) -> str:
+        """
+        Create one prompt holding several numbered test inputs.
+        
+        Used by packed screening runs (run_model(..., pack_size=K)). The
+        training block is identical to create_prompt(); test inputs follow
+        as "1. A B C →", "2. D E F →", ... lines.
+        
+        Args:
+            training_examples: List of training examples
+            test_inputs: Test input sequences, in item order
+            
+        Returns:
+            Formatted prompt string
+        """
+        inputs_str = "\n".join(
+            f"{i}. {' '.join(test_input)} →"
+            for i, test_input in enumerate(test_inputs, start=1)
+        )
         
-        # Use template
-        prompt = EXP1_PROMPT_TEMPLATE.format(
-            training_examples=training_str,
-            test_input=test_str
+        compiled = self.compile_prompt(
+            training_examples, EXP1_PACKED_PROMPT_TEMPLATE, field_name="test_inputs"
         )
+        return compiled.render_text(inputs_str)
+    
+    def build_prompts(
+        self,
+        training_examples: List[SequenceExample],
+        test_examples: List[SequenceExample],
+        pack_size: int = 1
+    ) -> List[str]:
+        """
+        Create the prompts run_model() sends, in request order.
         
-        return prompt
+        Args:
+            training_examples: List of training examples
+            test_examples: Test examples, in item order
+            pack_size: Test items per prompt (> 1 for packed prompts)
+            
+        Returns:
+            One prompt per item, or one per pack of pack_size items
+        """
+        if pack_size <= 1:
+            return self.create_prompts(
+                training_examples, [ex.input_sequence for ex in test_examples]
+            )
+        return [
+            self.create_packed_prompt(
+                training_examples,
+                [ex.input_sequence for ex in test_examples[start:start + pack_size]]
+            )
+            for start in range(0, len(test_examples), pack_size)
+        ]
+    
+    def split_packed_response(self, response_text: str, n_items: int) -> List[str]:
+        """
+        Split a reply to a packed prompt into per-item answer texts.
+        
+        Lines starting with "N." / "N)" / "N:" begin answer N; following
+        unnumbered lines are appended to it. Answers the model skipped
+        come back as empty strings.
+        
+        Args:
+            response_text: Raw text from model
+            n_items: Number of items in the packed prompt
+            
+        Returns:
+            List of n_items answer texts, in item order
+        """
+        answers = [""] * n_items
+        current = None
+        
+        for line in response_text.splitlines():
+            match = re.match(r"^\s*(\d+)\s*[.):]\s*(.*)$", line)
+            if match:
+                number = int(match.group(1))
+                current = number - 1 if 1 <= number <= n_items else None
+                if current is not None:
+                    answers[current] = match.group(2)
+            elif current is not None and line.strip():
+                answers[current] += "\n" + line
+        
+        return answers
     
     def parse_response(self, response_text: str, expected_length: int = 3) -> List[str]:
         """
@@ -230,46 +719,35 @@ class SequentialTransformationExperiment:
         Returns:
             List of parsed symbols (may be empty if parsing fails)
         """
-        import unicodedata
-        
-        # Remove common formatting
-        text = response_text.strip()
-        text = text.replace("→", " ").replace("->", " ")
-        text = text.replace(",", " ")
+        # Symbol lookup uses a precomputed table (see src/parsing.py)
+        return parse_answer(response_text, expected_length)
+    
+    def is_answer_line(self, line: str, expected_length: int = 3) -> bool:
+        """
+        Check whether one output line is a complete bare answer.
         
-        # Split on whitespace
-        tokens = text.split()
+        Incremental counterpart of parse_response() used to stop streamed
+        responses early: a line counts only if, after the same cleanup,
+        it consists of exactly expected_length single-character symbols
+        (or letters, for the control condition). Echoed examples
+        ("A B C → C A B") and prose lines never match, so early stopping
+        only cuts off text after the answer.
         
-        # Try to find a sequence of expected_length special symbols
-        # Special symbols are in our Unicode ranges (not ASCII letters)
-        def is_special_symbol(token):
-            """Check if token is a Unicode symbol (not regular letter/word)"""
-            if len(token) != 1:
-                return False
-            char = token[0]
-            # Check if it's in our designated ranges or geometric shapes
-            codepoint = ord(char)
-            return (
-                (0x2A00 <= codepoint <= 0x2AFF) or  # Math operators
-                (0x2B00 <= codepoint <= 0x2BFF) or  # Misc symbols  
-                (0x25A0 <= codepoint <= 0x25FF) or  # Geometric shapes
-                unicodedata.category(char).startswith('S')  # Any symbol
-            )
+        Args:
+            line: One complete line of model output
+            expected_length: Expected number of symbols
+            
+        Returns:
+            True if the line is a complete answer
+        """
+        text = line.strip().replace(",", " ")
+        if "→" in text or "->" in text:
+            return False
         
-        # Find all special symbols
-        special_symbols = [t for t in tokens if is_special_symbol(t)]
-        
-        # If we found the expected number, take the last sequence
-        # (handles cases where symbols appear after explanation)
-        if len(special_symbols) >= expected_length:
-            # Take LAST expected_length symbols (handles explanations before answer)
-            return special_symbols[-expected_length:]
-        elif len(special_symbols) > 0:
-            # Return whatever symbols we found
-            return special_symbols[:expected_length]
-        else:
-            # Fallback: just take first N tokens (original behavior)
-            return [t for t in tokens if t][:expected_length]
+        tokens = text.split()
+        return len(tokens) == expected_length and all(
+            is_special_symbol(t) or (len(t) == 1 and t.isalnum()) for t in tokens
+        )
     
     def score_response(
         self,
@@ -315,7 +793,14 @@ class SequentialTransformationExperiment:
         model: BaseModel,
         training_examples: List[SequenceExample],
         test_examples: List[SequenceExample],
-        experiment_type: str = "main"
+        experiment_type: str = "main",
+        batch: bool = False,
+        pack_size: int = 1,
+        early_stop: bool = EARLY_STOP_STREAMING,
+        journal: bool = JOURNAL_ENABLED,
+        resume: bool = False,
+        sprt: bool = SPRT_EARLY_STOP,
+        should_stop: Optional[Callable[[], bool]] = None
     ) -> ExperimentResult:
         """
         Run experiment on a single model.
@@ -325,30 +810,154 @@ class SequentialTransformationExperiment:
             training_examples: Training examples
             test_examples: Test examples
             experiment_type: 'main' or 'control'
+            batch: Submit all items as one provider batch job (falls back
+                to concurrent requests if the provider has no batch API)
+            pack_size: Test items per request. Values > 1 enable packed
+                screening mode (numbered answers split back per item);
+                packed results are flagged in metadata and should not be
+                pooled with unpacked runs.
+            early_stop: Stream responses and close each stream as soon as
+                a complete answer line arrives (unpacked, non-batch runs)
+            journal: Append each answered request to the run's journal
+                (data/journal/<run_id>.jsonl) as it arrives
+            resume: Continue an interrupted run: reuse the journaled
+                responses and send only the missing requests
+            sprt: Score items as they arrive and stop sending requests
+                once a sequential probability ratio test decides between
+                chance accuracy and EXP1_REASONING_THRESHOLD (unpacked,
+                non-batch runs). Requests already in flight are still
+                scored; the decision is in metadata['sprt'].
+            should_stop: Checked before each request is sent; once it
+                returns True the rest are not sent (e.g. on shutdown; the
+                run can then be resumed from its journal)
             
         Returns:
             ExperimentResult object
         """
+        run = self.prepare_run(
+            model,
+            training_examples,
+            test_examples,
+            experiment_type,
+            batch=batch,
+            pack_size=pack_size,
+            early_stop=early_stop,
+            journal=journal,
+            resume=resume,
+            sprt=sprt
+        )
+        
         print(f"\n{'='*60}")
         print(f"Running Experiment 1 on {model.model_name}")
         print(f"Type: {experiment_type}")
+        if run.packed:
+            print(f"Packed: {pack_size} items per request")
+        if model.use_cache and model.response_cache is not None:
+            print("Response cache: on (cached temperature-0 responses are reused)")
         print(f"{'='*60}\n")
+        if resume:
+            print(f"Resuming run {run.run_id}: {run.n_resumed}/{len(run.prompts)} "
+                  f"requests already answered\n")
+        
+        send_runs(model, [run], should_stop=should_stop)
+        return run.score()
+    
+    def prepare_run(
+        self,
+        model: BaseModel,
+        training_examples: List[SequenceExample],
+        test_examples: List[SequenceExample],
+        experiment_type: str = "main",
+        **options
+    ) -> PendingRun:
+        """
+        Prepare a run without sending it (see PendingRun and send_runs).
+        
+        Args:
+            model: Model instance to test
+            training_examples: Training examples
+            test_examples: Test examples
+            experiment_type: Experiment type recorded in the result
+            **options: Run options of run_model() (batch, pack_size,
+                early_stop, journal, resume, sprt)
         
+        Returns:
+            PendingRun holding the prompts, journal and early-stop state
+        """
+        return PendingRun(
+            self, model, training_examples, test_examples, experiment_type, **options
+        )
+    
+    def score_responses(
+        self,
+        model: BaseModel,
+        training_examples: List[SequenceExample],
+        test_examples: List[SequenceExample],
+        prompts: List[str],
+        model_responses: List[ModelResponse],
+        experiment_type: str = "main",
+        pack_size: int = 1,
+        run_metadata: Optional[Dict[str, Any]] = None,
+        request_stats: Optional[RequestStats] = None
+    ) -> ExperimentResult:
+        """
+        Parse and score a run's responses.
+        
+        Args:
+            model: Model that answered
+            training_examples: Training examples
+            test_examples: Test examples
+            prompts: Prompts sent, in request order
+            model_responses: One response per prompt
+            experiment_type: Experiment type recorded in the result
+            pack_size: Test items per request (as passed to run_model)
+            run_metadata: Extra metadata describing how the run was sent
+                (batch mode, journal run ID, ...)
+            request_stats: Request samples to attach to the result
+        
+        Returns:
+            ExperimentResult object
+        """
+        packed = pack_size > 1
         responses = []
         n_correct = 0
         
-        for i, test_example in enumerate(test_examples):
-            print(f"Test item {i+1}/{len(test_examples)}...")
-            
-            # Create prompt
-            prompt = self.create_prompt(training_examples, test_example.input_sequence)
+        # Expand to one (prompt, answer text, response) entry per test item
+        if packed:
+            packs = [
+                test_examples[start:start + pack_size]
+                for start in range(0, len(test_examples), pack_size)
+            ]
+            item_outputs = []
+            for pack, prompt, model_response in zip(packs, prompts, model_responses):
+                answers = self.split_packed_response(model_response.text, len(pack))
+                for answer in answers:
+                    item_outputs.append((prompt, answer, model_response))
+        else:
+            item_outputs = [
+                (prompt, model_response.text, model_response)
+                for prompt, model_response in zip(prompts, model_responses)
+            ]
+        
+        n_skipped = 0
+        n_not_sent = 0
+        for i, (test_example, (prompt, output_text, model_response)) in enumerate(
+            zip(test_examples, item_outputs)
+        ):
+            # Items refused by the budget were never sent; leave them out
+            if model_response.metadata.get('budget_exceeded'):
+                n_skipped += 1
+                continue
+            # Items left unsent after an early-stop decision
+            if model_response.metadata.get('not_sent'):
+                n_not_sent += 1
+                continue
             
-            # Get model response
-            model_response = model.generate(prompt)
+            print(f"Test item {i+1}/{len(test_examples)}...")
             
             # Parse response
             predicted = self.parse_response(
-                model_response.text,
+                output_text,
                 expected_length=len(test_example.output_sequence)
             )
             
@@ -367,12 +976,16 @@ class SequentialTransformationExperiment:
                 'item_number': i + 1,
                 'input': test_example.input_sequence,
                 'expected_output': test_example.output_sequence,
-                'model_output_raw': model_response.text,
+                'prompt': prompt,
+                'model_output_raw': output_text,
                 'model_output_parsed': predicted,
                 'correct': score_info['correct'],
                 'score': score_info['score'],
                 'model_metadata': model_response.metadata,
             }
+            if packed:
+                response_data['pack_position'] = i % pack_size + 1
+                response_data['packed_output_raw'] = model_response.text
             responses.append(response_data)
             
             # Progress indicator
@@ -380,14 +993,19 @@ class SequentialTransformationExperiment:
             print(f"  {status} Expected: {test_example.output_sequence}")
             print(f"    Predicted: {predicted}\n")
         
-        # Calculate overall accuracy
-        accuracy = n_correct / len(test_examples)
+        # Calculate overall accuracy (over the items actually answered)
+        n_total = len(test_examples) - n_skipped - n_not_sent
+        accuracy = n_correct / n_total if n_total > 0 else 0.0
         
         print(f"\n{'='*60}")
         print(f"RESULTS: {model.model_name}")
         print(f"{'='*60}")
-        print(f"Correct: {n_correct}/{len(test_examples)}")
+        print(f"Correct: {n_correct}/{n_total}")
         print(f"Accuracy: {accuracy:.1%}")
+        if n_skipped:
+            print(f"⚠ Budget exhausted: {n_skipped} item(s) not sent (partial result)")
+        if n_not_sent:
+            print(f"Stopped early: {n_not_sent} item(s) not sent")
         print(f"{'='*60}\n")
         
         # Create result object
@@ -396,16 +1014,27 @@ class SequentialTransformationExperiment:
             experiment_type=experiment_type,
             accuracy=accuracy,
             n_correct=n_correct,
-            n_total=len(test_examples),
+            n_total=n_total,
             responses=responses,
             metadata={
                 'n_training_examples': len(training_examples),
                 'sequence_length': EXP1_SEQUENCE_LENGTH,
                 'transformation': 'rotate_left',
                 'seed': self.seed,
+                'symbol_pool': self.generator.pool_name,
                 'model_stats': model.get_stats(),
+                **(run_metadata or {}),
+                'packed': packed,
+                'pack_size': pack_size,
+                'n_requests': len(prompts),
+                'n_planned': len(test_examples),
+                'budget_exhausted': n_skipped > 0,
+                'n_skipped_budget': n_skipped,
+                'n_not_sent': n_not_sent,
+                'budget': model.budget.summary() if model.budget is not None else None,
             },
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            request_stats=request_stats
         )
         
         return result
@@ -485,7 +1114,7 @@ class SequentialTransformationExperiment:
             }
         }
         
-        examples_file = EXPERIMENTS_DIR / "exp1_examples.json"
+        examples_file = self.examples_file("exp1")
         with open(examples_file, 'w', encoding='utf-8') as f:
             json.dump(examples_data, f, ensure_ascii=False, indent=2)
         
@@ -500,13 +1129,22 @@ class SequentialTransformationExperiment:
         print("="*60 + "\n")
 
 
-def run_experiment_1(models: List[BaseModel], include_control: bool = True):
+def run_experiment_1(
+    models: List[BaseModel],
+    include_control: bool = True,
+    batch: bool = False,
+    pack_size: int = 1,
+    early_stop: bool = EARLY_STOP_STREAMING
+):
     """
     Run Experiment 1 on all provided models.
     
     Args:
         models: List of model instances to test
         include_control: Whether to run control condition
+        batch: Submit each model's items as one provider batch job
+        pack_size: Test items per request (> 1 for packed screening runs)
+        early_stop: Stop streamed responses once the answer line is complete
     """
     # Initialize experiment
     exp = SequentialTransformationExperiment(seed=RANDOM_SEED)
@@ -518,12 +1156,19 @@ def run_experiment_1(models: List[BaseModel], include_control: bool = True):
     results = []
     
     for model in models:
+        if model.budget is not None and model.budget.exhausted:
+            print(f"⚠ Budget exhausted; skipping {model.model_name}")
+            continue
+        
         # Main experimental condition
         result = exp.run_model(
             model=model,
             training_examples=exp.training_examples,
             test_examples=exp.test_examples,
-            experiment_type="main"
+            experiment_type="main",
+            batch=batch,
+            pack_size=pack_size,
+            early_stop=early_stop
         )
         
         # Save result
@@ -541,10 +1186,11 @@ def run_experiment_1(models: List[BaseModel], include_control: bool = True):
 
 
 if __name__ == "__main__":
-    # Example usage
-    from src.models.gpt4_model import GPT4Model
-    from src.models.claude_model import ClaudeModel
-    from src.models.gemini_model import GeminiModel
+    # Example usage (optionally pass model names, e.g. "claude gemini")
+    import sys
+    from src.models.registry import create_model, resolve_models
+    
+    model_names = resolve_models(sys.argv[1:] or ["all"])
     
     print("="*60)
     print("EXPERIMENT 1: SEQUENTIAL TRANSFORMATION")
@@ -552,12 +1198,8 @@ if __name__ == "__main__":
     print("\nThis will test whether models can induce the 'rotate left'")
     print("transformation rule from examples using novel symbols.\n")
     
-    # Initialize models
-    models = [
-        GPT4Model(),
-        ClaudeModel(),
-        GeminiModel(),
-    ]
+    # Initialize models (each SDK is imported only if selected)
+    models = [create_model(name) for name in model_names]
     
     # Run experiment
     results = run_experiment_1(models, include_control=False)
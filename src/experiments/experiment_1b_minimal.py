@@ -11,14 +11,12 @@ Hypothesis: If accuracy maintained (~80-100%), suggests robust abstraction.
 import json
 import random
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from src.config import (
     RANDOM_SEED,
     EXP1_SEQUENCE_LENGTH,
-    EXPERIMENTS_DIR,
-    RESULTS_DIR,
 )
 from src.symbol_generator import SymbolGenerator
 from src.experiments.experiment_1_sequential import (
@@ -27,6 +25,7 @@ from src.experiments.experiment_1_sequential import (
     ExperimentResult
 )
 from src.models.base_model import BaseModel
+from src.experiments.replication import run_replication
 
 
 class MinimalTrainingExperiment(SequentialTransformationExperiment):
@@ -87,7 +86,7 @@ class MinimalTrainingExperiment(SequentialTransformationExperiment):
             }
         }
         
-        examples_file = EXPERIMENTS_DIR / "exp1b_minimal_examples.json"
+        examples_file = self.examples_file("exp1b_minimal")
         with open(examples_file, 'w', encoding='utf-8') as f:
             json.dump(examples_data, f, ensure_ascii=False, indent=2)
         
@@ -101,36 +100,33 @@ class MinimalTrainingExperiment(SequentialTransformationExperiment):
         print("="*60 + "\n")
 
 
-def run_experiment_1b(models: List[BaseModel], n_training: int = 3):
+def run_experiment_1b(
+    models: List[BaseModel],
+    n_training: int = 3,
+    seeds: Optional[List[int]] = None,
+    **run_kwargs
+):
     """
     Run Experiment 1b on provided models.
     
     Args:
         models: List of model instances to test
         n_training: Number of training examples (default: 3)
+        seeds: Stimulus seeds (default: [RANDOM_SEED]). With several
+            seeds, results are saved per seed and pooled, and the pooled
+            result is returned for each model.
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
     """
-    # Initialize experiment
-    exp = MinimalTrainingExperiment(seed=RANDOM_SEED)
-    
-    # Setup with minimal training
-    exp.setup_experiment(n_training=n_training, n_test=20)
-    
-    # Run on each model
-    results = []
-    
-    for model in models:
-        result = exp.run_model(
-            model=model,
-            training_examples=exp.training_examples,
-            test_examples=exp.test_examples,
-            experiment_type="1b_minimal"
-        )
-        
-        # Save result
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = RESULTS_DIR / "raw" / f"exp1b_minimal_{model.model_name}_{timestamp}.json"
-        result.save(result_file)
-        results.append(result)
+    results = run_replication(
+        MinimalTrainingExperiment,
+        models,
+        experiment_type="1b_minimal",
+        result_prefix="exp1b_minimal",
+        seeds=seeds or [RANDOM_SEED],
+        setup_kwargs={'n_training': n_training, 'n_test': 20},
+        **run_kwargs
+    )
     
     # Print comparison to Version 1
     print("\n" + "="*70)
@@ -157,8 +153,10 @@ def run_experiment_1b(models: List[BaseModel], n_training: int = 3):
 
 
 if __name__ == "__main__":
-    from src.models.gpt4_model import GPT4Model
-    from src.models.claude_model import ClaudeModel
+    import sys
+    from src.models.registry import create_model, resolve_models
+    
+    model_names = resolve_models(sys.argv[1:] or ["gpt4", "claude"])
     
     print("="*70)
     print("EXPERIMENT 1B: MINIMAL TRAINING (3 EXAMPLES)")
@@ -167,11 +165,8 @@ if __name__ == "__main__":
     print("Version 1 used 20 training examples → 100% accuracy")
     print("This version uses 3 training examples → ??% accuracy\n")
     
-    # Initialize models
-    models = [
-        GPT4Model(),
-        ClaudeModel(),
-    ]
+    # Initialize models (each SDK is imported only if selected)
+    models = [create_model(name) for name in model_names]
     
     # Run experiment
     results = run_experiment_1b(models, n_training=3)
@@ -12,21 +12,28 @@ Can models identify and apply correct rule to novel symbols?
 
 import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
-from src.config import RANDOM_SEED, EXP1_SEQUENCE_LENGTH, EXPERIMENTS_DIR, RESULTS_DIR
+from src.config import RANDOM_SEED, EXP1_SEQUENCE_LENGTH
 from src.symbol_generator import SymbolGenerator
 from src.experiments.experiment_1_sequential import (
     SequenceExample, SequentialTransformationExperiment, ExperimentResult
 )
 from src.models.base_model import BaseModel
+from src.experiments.replication import run_replication
 from src.transformations import rotate_left_by_n, reverse
 
 
 class AmbiguityExperiment(SequentialTransformationExperiment):
     """Test rule identification with ambiguous transformations."""
     
+    # Marked examples, then the test input (rendered by create_prompt())
+    prompt_template = "{training_examples}\n\n{test_input} →"
+    
+    # Picking one of the two rules at random
+    chance_accuracy = 0.5
+    
     def __init__(self, seed: int = RANDOM_SEED):
         super().__init__(seed)
         self.markers = {
@@ -63,16 +70,6 @@ class AmbiguityExperiment(SequentialTransformationExperiment):
         
         return examples
     
-    def create_prompt(
-        self,
-        training_examples: List[SequenceExample],
-        test_input: List[str]
-    ) -> str:
-        """Create prompt with marked examples."""
-        training_str = "\n".join([ex.to_string() for ex in training_examples])
-        test_str = " ".join(test_input)
-        return f"{training_str}\n\n{test_str} →"
-    
     def setup_experiment(self, n_per_rule: int = 3, n_test_per_rule: int = 10):
         """Generate ambiguous training and test sets."""
         print("\n" + "="*60)
@@ -112,11 +109,12 @@ class AmbiguityExperiment(SequentialTransformationExperiment):
                 'experiment': '1c_ambiguity',
                 'rules': {marker: name for marker, (name, _) in self.markers.items()},
                 'n_per_rule': n_per_rule,
+                'seed': self.seed,
                 'generated_at': datetime.now().isoformat(),
             }
         }
         
-        examples_file = EXPERIMENTS_DIR / "exp1c_ambiguity_examples.json"
+        examples_file = self.examples_file("exp1c_ambiguity")
         with open(examples_file, 'w', encoding='utf-8') as f:
             json.dump(examples_data, f, ensure_ascii=False, indent=2)
         
@@ -127,31 +125,34 @@ class AmbiguityExperiment(SequentialTransformationExperiment):
         print("="*60 + "\n")
 
 
-def run_experiment_1c(models: List[BaseModel]):
-    """Run Experiment 1c."""
-    exp = AmbiguityExperiment(seed=RANDOM_SEED)
-    exp.setup_experiment(n_per_rule=3, n_test_per_rule=10)
+def run_experiment_1c(models: List[BaseModel], seeds: Optional[List[int]] = None, **run_kwargs):
+    """
+    Run Experiment 1c.
     
-    results = []
-    for model in models:
-        result = exp.run_model(
-            model=model,
-            training_examples=exp.training_examples,
-            test_examples=exp.test_examples,
-            experiment_type="1c_ambiguity"
-        )
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = RESULTS_DIR / "raw" / f"exp1c_ambiguity_{model.model_name}_{timestamp}.json"
-        result.save(result_file)
-        results.append(result)
-    
-    return results
+    Args:
+        models: List of model instances to test
+        seeds: Stimulus seeds (default: [RANDOM_SEED]). With several
+            seeds, results are saved per seed and pooled, and the pooled
+            result is returned for each model.
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
+    """
+    return run_replication(
+        AmbiguityExperiment,
+        models,
+        experiment_type="1c_ambiguity",
+        result_prefix="exp1c_ambiguity",
+        seeds=seeds or [RANDOM_SEED],
+        setup_kwargs={'n_per_rule': 3, 'n_test_per_rule': 10},
+        **run_kwargs
+    )
 
 
 if __name__ == "__main__":
-    from src.models.gpt4_model import GPT4Model
-    from src.models.claude_model import ClaudeModel
+    import sys
+    from src.models.registry import create_model, resolve_models
+    
+    model_names = resolve_models(sys.argv[1:] or ["gpt4", "claude"])
     
     print("="*70)
     print("EXPERIMENT 1C: TRANSFORMATION AMBIGUITY")
@@ -159,7 +160,7 @@ if __name__ == "__main__":
     print("\nCan models identify which rule (rotate vs reverse) applies?")
     print("Chance level: 50% (random rule selection)\n")
     
-    models = [GPT4Model(), ClaudeModel()]
+    models = [create_model(name) for name in model_names]
     results = run_experiment_1c(models)
     
     print("\n" + "="*70)
@@ -7,15 +7,16 @@ Can models generalize the rotation rule to longer sequences?
 
 import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
-from src.config import RANDOM_SEED, EXPERIMENTS_DIR, RESULTS_DIR
+from src.config import RANDOM_SEED
 from src.symbol_generator import SymbolGenerator
 from src.experiments.experiment_1_sequential import (
     SequenceExample, SequentialTransformationExperiment, ExperimentResult
 )
 from src.models.base_model import BaseModel
+from src.experiments.replication import run_replication
 from src.transformations import rotate_left_by_n
 
 
@@ -54,12 +55,6 @@ class ScalingExperiment(SequentialTransformationExperiment):
         print("SETTING UP EXPERIMENT 1D: SCALING")
         print("="*60 + "\n")
         
-        # Training: 3 examples of length 3
-        training_symbols_needed = 3 * 3  # 9 symbols
-        
-        # Test: 6 length-3, 7 length-4, 7 length-5
-        test_symbols_needed = (6*3) + (7*4) + (7*5)  # 18+28+35 = 81
-        
         # Generate symbols
         training_symbol_set, test_symbol_set = self.generator.generate_experiment1_symbols(
             n_training=3,
@@ -69,9 +64,7 @@ class ScalingExperiment(SequentialTransformationExperiment):
         
         # Get enough test symbols (need 81 total)
         # We'll need to generate more
-        additional_symbols = [s for s in self.generator.available_symbols 
-                            if s not in training_symbol_set.symbols 
-                            and s not in test_symbol_set.symbols][:21]
+        additional_symbols = self.generator.take_symbols(21)
         test_symbols = test_symbol_set.symbols + additional_symbols
         
         # Generate training (length 3 only)
@@ -98,11 +91,12 @@ class ScalingExperiment(SequentialTransformationExperiment):
                 'experiment': '1d_scaling',
                 'training_length': 3,
                 'test_lengths': [3, 4, 5],
+                'seed': self.seed,
                 'generated_at': datetime.now().isoformat(),
             }
         }
         
-        examples_file = EXPERIMENTS_DIR / "exp1d_scaling_examples.json"
+        examples_file = self.examples_file("exp1d_scaling")
         with open(examples_file, 'w', encoding='utf-8') as f:
             json.dump(examples_data, f, ensure_ascii=False, indent=2)
         
@@ -113,31 +107,33 @@ class ScalingExperiment(SequentialTransformationExperiment):
         print("="*60 + "\n")
 
 
-def run_experiment_1d(models: List[BaseModel]):
-    """Run Experiment 1d."""
-    exp = ScalingExperiment(seed=RANDOM_SEED)
-    exp.setup_experiment()
-    
-    results = []
-    for model in models:
-        result = exp.run_model(
-            model=model,
-            training_examples=exp.training_examples,
-            test_examples=exp.test_examples,
-            experiment_type="1d_scaling"
-        )
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = RESULTS_DIR / "raw" / f"exp1d_scaling_{model.model_name}_{timestamp}.json"
-        result.save(result_file)
-        results.append(result)
+def run_experiment_1d(models: List[BaseModel], seeds: Optional[List[int]] = None, **run_kwargs):
+    """
+    Run Experiment 1d.
     
-    return results
+    Args:
+        models: List of model instances to test
+        seeds: Stimulus seeds (default: [RANDOM_SEED]). With several
+            seeds, results are saved per seed and pooled, and the pooled
+            result is returned for each model.
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
+    """
+    return run_replication(
+        ScalingExperiment,
+        models,
+        experiment_type="1d_scaling",
+        result_prefix="exp1d_scaling",
+        seeds=seeds or [RANDOM_SEED],
+        **run_kwargs
+    )
 
 
 if __name__ == "__main__":
-    from src.models.gpt4_model import GPT4Model
-    from src.models.claude_model import ClaudeModel
+    import sys
+    from src.models.registry import create_model, resolve_models
+    
+    model_names = resolve_models(sys.argv[1:] or ["gpt4", "claude"])
     
     print("="*70)
     print("EXPERIMENT 1D: COMPLEXITY SCALING")
@@ -145,7 +141,7 @@ if __name__ == "__main__":
     print("\nTrain on 3-symbol, test on 3,4,5-symbol sequences.")
     print("Can the rule generalize to longer sequences?\n")
     
-    models = [GPT4Model(), ClaudeModel()]
+    models = [create_model(name) for name in model_names]
     results = run_experiment_1d(models)
     
     print("\n" + "="*70)
@@ -7,15 +7,16 @@ Tests analogical transfer capability.
 
 import json
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pathlib import Path
 
-from src.config import RANDOM_SEED, EXP1_SEQUENCE_LENGTH, EXPERIMENTS_DIR, RESULTS_DIR
+from src.config import RANDOM_SEED, EXP1_SEQUENCE_LENGTH
 from src.symbol_generator import SymbolGenerator
 from src.experiments.experiment_1_sequential import (
     SequenceExample, SequentialTransformationExperiment, ExperimentResult
 )
 from src.models.base_model import BaseModel
+from src.experiments.replication import run_replication
 from src.transformations import rotate_left_by_n
 
 
@@ -94,7 +95,7 @@ class TransferExperiment(SequentialTransformationExperiment):
         # Combine and shuffle
         import random
         self.test_examples = control_examples + transfer_examples
-        random.Random(RANDOM_SEED).shuffle(self.test_examples)
+        random.Random(self.seed).shuffle(self.test_examples)
         
         # Tag which are control vs transfer
         for i, ex in enumerate(self.test_examples):
@@ -112,11 +113,12 @@ class TransferExperiment(SequentialTransformationExperiment):
                 'training_rule': 'rotate_by_1',
                 'control_rule': 'rotate_by_1',
                 'transfer_rule': 'rotate_by_2',
+                'seed': self.seed,
                 'generated_at': datetime.now().isoformat(),
             }
         }
         
-        examples_file = EXPERIMENTS_DIR / "exp1e_transfer_examples.json"
+        examples_file = self.examples_file("exp1e_transfer")
         with open(examples_file, 'w', encoding='utf-8') as f:
             json.dump(examples_data, f, ensure_ascii=False, indent=2)
         
@@ -127,20 +129,29 @@ class TransferExperiment(SequentialTransformationExperiment):
         print("="*60 + "\n")
 
 
-def run_experiment_1e(models: List[BaseModel]):
-    """Run Experiment 1e."""
-    exp = TransferExperiment(seed=RANDOM_SEED)
-    exp.setup_experiment()
+def run_experiment_1e(models: List[BaseModel], seeds: Optional[List[int]] = None, **run_kwargs):
+    """
+    Run Experiment 1e.
     
-    results = []
-    for model in models:
-        result = exp.run_model(
-            model=model,
-            training_examples=exp.training_examples,
-            test_examples=exp.test_examples,
-            experiment_type="1e_transfer"
-        )
-        
+    Args:
+        models: List of model instances to test
+        seeds: Stimulus seeds (default: [RANDOM_SEED]). With several
+            seeds, results are saved per seed and pooled, and the pooled
+            result is returned for each model.
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
+    """
+    seeds = seeds or [RANDOM_SEED]
+    results = run_replication(
+        TransferExperiment,
+        models,
+        experiment_type="1e_transfer",
+        result_prefix="exp1e_transfer",
+        seeds=seeds,
+        **run_kwargs
+    )
+    
+    for result in results:
         # Analyze control vs transfer separately
         control_correct = sum(1 for r in result.responses 
                             if r.get('correct') and 
@@ -150,20 +161,17 @@ def run_experiment_1e(models: List[BaseModel]):
                              result.responses[result.responses.index(r)].get('metadata', {}).get('test_type') == 'transfer')
         
         print(f"\n{result.model_name} breakdown:")
-        print(f"  Control (rotate-by-1): {control_correct}/10")
-        print(f"  Transfer (rotate-by-2): {transfer_correct}/10")
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        result_file = RESULTS_DIR / "raw" / f"exp1e_transfer_{model.model_name}_{timestamp}.json"
-        result.save(result_file)
-        results.append(result)
+        print(f"  Control (rotate-by-1): {control_correct}/{10 * len(seeds)}")
+        print(f"  Transfer (rotate-by-2): {transfer_correct}/{10 * len(seeds)}")
     
     return results
 
 
 if __name__ == "__main__":
-    from src.models.gpt4_model import GPT4Model
-    from src.models.claude_model import ClaudeModel
+    import sys
+    from src.models.registry import create_model, resolve_models
+    
+    model_names = resolve_models(sys.argv[1:] or ["gpt4", "claude"])
     
     print("="*70)
     print("EXPERIMENT 1E: RULE TRANSFER")
@@ -171,7 +179,7 @@ if __name__ == "__main__":
     print("\nTrain on rotate-by-1, test on rotate-by-1 vs rotate-by-2.")
     print("Tests analogical transfer capability.\n")
     
-    models = [GPT4Model(), ClaudeModel()]
+    models = [create_model(name) for name in model_names]
     results = run_experiment_1e(models)
     
     print("\n" + "="*70)
@@ -0,0 +1,504 @@
+"""
+Declarative experiment conditions.
+
+Conditions 1, 1b, 1c, 1d and 1e are hand-written subclasses of
+SequentialTransformationExperiment, each with its own setup_experiment()
+and its own symbol arithmetic. A spec describes a condition as data
+instead (JSON, or YAML if PyYAML is installed):
+
+    {
+      "name": "1d_scaling_v2",
+      "training": [{"count": 3, "length": 3, "rule": "rotate_left_by_n",
+                    "rule_args": {"n": 1}}],
+      "test": [{"count": 7, "length": 3, ...}, {"count": 7, "length": 4, ...}],
+      "shuffle_test": false
+    }
+
+Each group of items declares a count, a sequence length, a rule (see
+RULES) with its arguments, an optional transformation label, an optional
+marker symbol appended to the input (as in 1c), and optional tags stored
+in each example's metadata (as 1e's test_type). A spec that needs more
+symbols than ALL_SYMBOLS holds can name a generated "symbol_pool" (see
+src/symbol_pools.py).
+
+compile_spec() turns a spec into an ExperimentPlan: the training and
+test symbol budgets and every item's slice of its split's symbol pool,
+computed once and independent of the seed. ExperimentPlan.generate()
+then draws the two disjoint pools for a seed and builds the examples.
+SpecExperiment runs a spec like any other condition, so new conditions
+and large grids need no new Python.
+
+Bundled specs for the existing conditions are in src/experiments/specs/.
+Specs 1_main, 1b_minimal and 1e_transfer reproduce the hand-written
+stimuli exactly. 1c_ambiguity_v2 keeps its markers out of the symbol
+pool, and 1d_scaling_v2 draws only the 79 symbols it uses, so their
+stimuli differ from conditions 1c and 1d. They are named as variants
+(and so get their own experiment_type and result files) so they are
+never pooled with results from the hand-written classes.
+"""
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import json
+import random
+
+from src.config import EXP1_CHANCE_ACCURACY, EXP1_PROMPT_TEMPLATE, RANDOM_SEED
+from src.experiments.experiment_1_sequential import (
+    ExperimentResult,
+    SequenceExample,
+    SequentialTransformationExperiment,
+)
+from src.symbol_generator import SymbolGenerator
+from src.symbol_pools import get_symbol_pool
+from src.transformations import reverse, rotate_left_by_n
+
+# Bundled spec files
+SPECS_DIR = Path(__file__).parent / "specs"
+
+SPEC_SUFFIXES = (".json", ".yaml", ".yml")
+
+
+def rotate_last_to_front(sequence: List[str]) -> List[str]:
+    """SequentialTransformationExperiment.rotate_left(): [A, B, C] → [C, A, B]."""
+    return rotate_left_by_n(sequence, -1)
+
+
+# Transformation rules available to specs
+RULES: Dict[str, Callable[..., List[str]]] = {
+    "rotate_left": rotate_last_to_front,    # Experiments 1 and 1b
+    "rotate_left_by_n": rotate_left_by_n,   # 1c, 1d, 1e (first element moves to the end)
+    "reverse": reverse,
+}
+
+
+@dataclass(frozen=True)
+class ItemGroup:
+    """
+    A group of items generated alike.
+    
+    Attributes:
+        count: Number of items
+        length: Symbols per input sequence (marker not included)
+        rule: Transformation rule (key of RULES)
+        rule_args: Keyword arguments for the rule (e.g. {"n": 2})
+        transformation: Label stored in each example (default: rule)
+        marker: Symbol appended to every input (e.g. "★")
+        tags: Stored as each example's metadata (e.g. {"test_type": "control"})
+    """
+    count: int
+    length: int
+    rule: str = "rotate_left"
+    rule_args: Dict[str, Any] = field(default_factory=dict)
+    transformation: Optional[str] = None
+    marker: Optional[str] = None
+    tags: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def label(self) -> str:
+        return self.transformation or self.rule
+    
+    @property
+    def n_symbols(self) -> int:
+        return self.count * self.length
+
+
+@dataclass
+class ExperimentSpec:
+    """
+    Declarative description of an experiment condition.
+    
+    Attributes:
+        name: Spec name (e.g., "1d_scaling_v2")
+        training: Training item groups, in prompt order
+        test: Test item groups, in item order (before shuffling)
+        description: Free text
+        experiment_type: experiment_type of results (default: name)
+        result_prefix: Result file prefix (default: "exp<name>")
+        chance_accuracy: Accuracy expected from guessing
+        prompt_template: Prompt layout (default: EXP1_PROMPT_TEMPLATE)
+        shuffle_test: Shuffle test items with random.Random(seed)
+        symbol_pool: Symbol pool to draw from (see src/symbol_pools.py;
+            default: SYMBOL_POOL)
+    """
+    name: str
+    training: List[ItemGroup]
+    test: List[ItemGroup]
+    description: str = ""
+    experiment_type: Optional[str] = None
+    result_prefix: Optional[str] = None
+    chance_accuracy: float = EXP1_CHANCE_ACCURACY
+    prompt_template: str = EXP1_PROMPT_TEMPLATE
+    shuffle_test: bool = False
+    symbol_pool: Optional[str] = None
+    
+    def __post_init__(self):
+        if self.experiment_type is None:
+            self.experiment_type = self.name
+        if self.result_prefix is None:
+            self.result_prefix = f"exp{self.name}"
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExperimentSpec':
+        """
+        Build a spec from parsed JSON/YAML.
+        
+        Args:
+            data: Spec dictionary
+        
+        Returns:
+            ExperimentSpec
+        
+        Raises:
+            ValueError: If fields are missing or unknown
+        """
+        name = data.get('name', '<unnamed>')
+        known = set(cls.__dataclass_fields__)
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Spec '{name}': unknown fields {sorted(unknown)}")
+        for required in ('name', 'training', 'test'):
+            if required not in data:
+                raise ValueError(f"Spec '{name}': missing field '{required}'")
+        
+        group_fields = set(ItemGroup.__dataclass_fields__)
+        
+        def groups(split: str) -> List[ItemGroup]:
+            result = []
+            for i, group in enumerate(data[split]):
+                unknown = set(group) - group_fields
+                if unknown:
+                    raise ValueError(
+                        f"Spec '{name}': {split} group {i} has unknown fields {sorted(unknown)}"
+                    )
+                try:
+                    result.append(ItemGroup(**group))
+                except TypeError as e:
+                    raise ValueError(f"Spec '{name}': {split} group {i}: {e}") from None
+            return result
+        
+        return cls(**{**data, 'training': groups('training'), 'test': groups('test')})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
+def _load_yaml(path: Path) -> Dict[str, Any]:
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            f"YAML specs need the PyYAML package (pip install pyyaml); "
+            f"or write {path.name} as JSON"
+        ) from None
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def find_spec(spec: Union[str, Path]) -> Path:
+    """
+    Path of a spec file.
+    
+    Args:
+        spec: File path, or the name of a bundled spec (e.g. "1d_scaling_v2")
+    
+    Returns:
+        Existing spec file path
+    
+    Raises:
+        FileNotFoundError: If no such spec exists
+    """
+    path = Path(spec)
+    if path.suffix in SPEC_SUFFIXES and path.exists():
+        return path
+    for suffix in SPEC_SUFFIXES:
+        candidate = SPECS_DIR / f"{spec}{suffix}"
+        if candidate.exists():
+            return candidate
+    available = sorted(p.stem for p in SPECS_DIR.glob("*") if p.suffix in SPEC_SUFFIXES)
+    raise FileNotFoundError(
+        f"No spec '{spec}'. Bundled specs: {', '.join(available)}"
+    )
+
+
+def load_spec(spec: Union[str, Path]) -> ExperimentSpec:
+    """
+    Load a spec from a JSON or YAML file.
+    
+    Args:
+        spec: File path, or the name of a bundled spec
+    
+    Returns:
+        ExperimentSpec
+    """
+    path = find_spec(spec)
+    if path.suffix == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = _load_yaml(path)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not contain a spec object")
+    return ExperimentSpec.from_dict(data)
+
+
+@dataclass(frozen=True)
+class PlannedItem:
+    """
+    One item of a plan.
+    
+    Attributes:
+        group: Index of the item's group within its split
+        offset: First symbol of the item in its split's pool
+        length: Number of symbols
+        rule: Transformation rule (key of RULES)
+        rule_args: Keyword arguments for the rule
+        transformation: Label stored in the example
+        marker: Symbol appended to the input, if any
+        tags: Example metadata, if any
+    """
+    group: int
+    offset: int
+    length: int
+    rule: str
+    rule_args: Dict[str, Any]
+    transformation: str
+    marker: Optional[str]
+    tags: Dict[str, Any]
+    
+    def build(self, pool: List[str]) -> SequenceExample:
+        """Build the item's example from its split's symbol pool."""
+        input_seq = pool[self.offset:self.offset + self.length]
+        example = SequenceExample(
+            input_sequence=input_seq + [self.marker] if self.marker else input_seq,
+            output_sequence=RULES[self.rule](input_seq, **self.rule_args),
+            transformation=self.transformation
+        )
+        if self.tags:
+            example.metadata = dict(self.tags)
+        return example
+
+
+@dataclass
+class ExperimentPlan:
+    """
+    A compiled spec: symbol budgets and item layout, for any seed.
+    
+    Attributes:
+        spec: The compiled spec
+        training_items: Training items, in prompt order
+        test_items: Test items, in item order (before shuffling)
+        training_symbols: Symbols drawn for the training pool
+        test_symbols: Symbols drawn for the test pool
+        excluded_symbols: Symbols kept out of both pools (markers)
+    """
+    spec: ExperimentSpec
+    training_items: List[PlannedItem]
+    test_items: List[PlannedItem]
+    training_symbols: int
+    test_symbols: int
+    excluded_symbols: List[str]
+    
+    def generate(
+        self,
+        generator: SymbolGenerator,
+        seed: int = RANDOM_SEED
+    ) -> Tuple[List[SequenceExample], List[SequenceExample]]:
+        """
+        Draw the symbol pools and build the examples.
+        
+        Both pools are drawn in one get_disjoint_sets() call, as
+        generate_experiment1_symbols() does, so training and test never
+        share a symbol.
+        
+        Args:
+            generator: Symbol generator (seeded)
+            seed: Seed for shuffling the test items
+        
+        Returns:
+            (training_examples, test_examples)
+        """
+        training_pool, test_pool = generator.get_disjoint_sets(
+            n_sets=2,
+            symbols_per_set=max(self.training_symbols, self.test_symbols),
+            exclude=self.excluded_symbols
+        )
+        
+        training_examples = [item.build(training_pool) for item in self.training_items]
+        test_examples = [item.build(test_pool) for item in self.test_items]
+        if self.spec.shuffle_test:
+            random.Random(seed).shuffle(test_examples)
+        return training_examples, test_examples
+    
+    def summary(self) -> Dict[str, Any]:
+        """Budgets and item counts per group, for printing and metadata."""
+        def groups(spec_groups: List[ItemGroup]) -> List[Dict[str, Any]]:
+            return [
+                {'count': g.count, 'length': g.length, 'transformation': g.label,
+                 'n_symbols': g.n_symbols, 'marker': g.marker, 'tags': g.tags}
+                for g in spec_groups
+            ]
+        
+        return {
+            'spec': self.spec.name,
+            'n_training': len(self.training_items),
+            'n_test': len(self.test_items),
+            'training_symbols': self.training_symbols,
+            'test_symbols': self.test_symbols,
+            'excluded_symbols': self.excluded_symbols,
+            'training_groups': groups(self.spec.training),
+            'test_groups': groups(self.spec.test),
+        }
+
+
+def _plan_split(spec: ExperimentSpec, split: str) -> Tuple[List[PlannedItem], int]:
+    items = []
+    offset = 0
+    for index, group in enumerate(getattr(spec, split)):
+        where = f"Spec '{spec.name}': {split} group {index}"
+        if group.count < 1 or group.length < 1:
+            raise ValueError(f"{where}: count and length must be >= 1")
+        if group.rule not in RULES:
+            raise ValueError(
+                f"{where}: unknown rule '{group.rule}'. Available: {', '.join(RULES)}"
+            )
+        try:
+            RULES[group.rule](list(range(group.length)), **group.rule_args)
+        except TypeError as e:
+            raise ValueError(f"{where}: bad rule_args {group.rule_args}: {e}") from None
+        if group.marker is not None and len(group.marker) != 1:
+            raise ValueError(f"{where}: marker must be a single symbol, got '{group.marker}'")
+        
+        for _ in range(group.count):
+            items.append(PlannedItem(
+                group=index,
+                offset=offset,
+                length=group.length,
+                rule=group.rule,
+                rule_args=dict(group.rule_args),
+                transformation=group.label,
+                marker=group.marker,
+                tags=dict(group.tags),
+            ))
+            offset += group.length
+    return items, offset
+
+
+def compile_spec(
+    spec: Union[ExperimentSpec, str, Path],
+    available_symbols: Optional[int] = None
+) -> ExperimentPlan:
+    """
+    Compile a spec into an execution plan.
+    
+    Args:
+        spec: ExperimentSpec, spec file path, or bundled spec name
+        available_symbols: Size of the symbol pool to check the budgets
+            against (default: size of the spec's symbol pool)
+    
+    Returns:
+        ExperimentPlan
+    
+    Raises:
+        ValueError: If the spec is invalid or needs more symbols than exist
+    """
+    if not isinstance(spec, ExperimentSpec):
+        spec = load_spec(spec)
+    if not spec.training or not spec.test:
+        raise ValueError(f"Spec '{spec.name}': needs training and test groups")
+    if not 0 < spec.chance_accuracy < 1:
+        raise ValueError(f"Spec '{spec.name}': chance_accuracy must be in (0, 1)")
+    
+    training_items, training_symbols = _plan_split(spec, 'training')
+    test_items, test_symbols = _plan_split(spec, 'test')
+    excluded = sorted({g.marker for g in spec.training + spec.test if g.marker})
+    
+    if available_symbols is None:
+        available_symbols = len(set(get_symbol_pool(spec.symbol_pool)) - set(excluded))
+    needed = 2 * max(training_symbols, test_symbols)
+    if needed > available_symbols:
+        raise ValueError(
+            f"Spec '{spec.name}': needs {needed} symbols "
+            f"(two disjoint pools of {max(training_symbols, test_symbols)}), "
+            f"only {available_symbols} available"
+        )
+    
+    return ExperimentPlan(
+        spec=spec,
+        training_items=training_items,
+        test_items=test_items,
+        training_symbols=training_symbols,
+        test_symbols=test_symbols,
+        excluded_symbols=excluded,
+    )
+
+
+class SpecExperiment(SequentialTransformationExperiment):
+    """
+    An experiment condition defined by a spec.
+    
+    Usage:
+        exp = SpecExperiment(seed=42)
+        exp.setup_experiment(spec="1d_scaling_v2")
+    """
+    
+    def __init__(self, seed: int = RANDOM_SEED):
+        super().__init__(seed)
+        self.spec: Optional[ExperimentSpec] = None
+        self.plan: Optional[ExperimentPlan] = None
+    
+    def setup_experiment(self, spec: Union[ExperimentSpec, str, Path] = "1_main"):
+        """
+        Compile a spec and generate its examples.
+        
+        Args:
+            spec: ExperimentSpec, spec file path, or bundled spec name
+        """
+        self.plan = compile_spec(spec)
+        self.spec = self.plan.spec
+        self.prompt_template = self.spec.prompt_template
+        self.chance_accuracy = self.spec.chance_accuracy
+        if self.spec.symbol_pool and self.spec.symbol_pool != self.generator.pool_name:
+            self.generator = SymbolGenerator(seed=self.seed, pool=self.spec.symbol_pool)
+        
+        print("\n" + "="*60)
+        print(f"SETTING UP SPEC: {self.spec.name}")
+        print("="*60 + "\n")
+        print(f"Symbol budget: {self.plan.training_symbols} training, "
+              f"{self.plan.test_symbols} test (pool '{self.generator.pool_name}', "
+              f"{len(self.generator.available_symbols)} symbols)")
+        
+        self.training_examples, self.test_examples = self.plan.generate(self.generator, self.seed)
+        
+        examples_data = {
+            'training': [ex.to_dict() for ex in self.training_examples],
+            'test': [ex.to_dict() for ex in self.test_examples],
+            'test_metadata': [getattr(ex, 'metadata', None) for ex in self.test_examples],
+            'metadata': {
+                'experiment': self.spec.name,
+                'spec': self.spec.to_dict(),
+                'plan': self.plan.summary(),
+                'seed': self.seed,
+            }
+        }
+        
+        examples_file = self.examples_file(f"{self.spec.result_prefix}_spec")
+        with open(examples_file, 'w', encoding='utf-8') as f:
+            json.dump(examples_data, f, ensure_ascii=False, indent=2)
+        
+        print(f"✓ Saved to {examples_file}")
+        print("\n" + "="*60)
+        print(f"Training: {len(self.training_examples)}")
+        print(f"Test: {len(self.test_examples)}")
+        print("="*60 + "\n")
+    
+    def score_responses(self, *args, **kwargs) -> ExperimentResult:
+        """Score as usual and record the spec in the result metadata."""
+        result = super().score_responses(*args, **kwargs)
+        if self.spec is not None:
+            result.metadata['spec'] = self.spec.name
+            result.metadata['transformation'] = sorted({
+                g.label for g in self.spec.training + self.spec.test
+            })
+        return result
@@ -0,0 +1,208 @@
+"""
+Append-only per-request journal for experiment runs.
+
+run_model() used to hold every response in memory until the final
+ExperimentResult.save(), so a crash, Ctrl+C or an exhausted retry loop
+near the end of a run lost every paid response before it. RunJournal
+appends one JSON line per answered request as soon as it arrives,
+keyed by run ID and item number. Each line is flushed to the OS as it
+is written, so a killed process loses nothing; only the fsyncs (which
+guard against power loss) are batched, every JOURNAL_FSYNC_EVERY records
+or JOURNAL_FSYNC_INTERVAL seconds, so journaling does not cost a disk
+sync per request.
+
+A run is resumed by reading the journal back (RunJournal.load), sending
+only the items it is missing, and scoring journaled and fresh responses
+together. Starting a run afresh never truncates an earlier journal of it:
+the old file is kept as <run_id>.jsonl.1 (then .2, ...).
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from src.config import JOURNAL_DIR, JOURNAL_FSYNC_EVERY, JOURNAL_FSYNC_INTERVAL
+from src.models.base_model import ModelResponse
+
+logger = logging.getLogger(__name__)
+
+
+def make_run_id(experiment_type: str, model_name: str, seed: int, prompts: List[str]) -> str:
+    """
+    Stable ID of a run: same condition, model, seed and prompts, same ID.
+    
+    Hashing the prompts means a journal is never resumed into a run whose
+    stimuli (or prompt template, or pack size) have changed.
+    
+    Args:
+        experiment_type: Experiment type (e.g., "main", "1b_minimal")
+        model_name: Model identifier
+        seed: Random seed of the stimuli
+        prompts: Rendered prompts, in request order
+    
+    Returns:
+        Run ID usable as a file name
+    """
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.encode('utf-8'))
+        digest.update(b'\0')
+    safe_model = model_name.replace('/', '_')
+    return f"{experiment_type}_{safe_model}_seed{seed}_{digest.hexdigest()[:12]}"
+
+
+class RunJournal:
+    """
+    Append-only JSONL journal of one run's responses.
+    
+    Each line holds run_id, item (request index), prompt, and the
+    response's model name, text and metadata. Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        run_id: str,
+        journal_dir: Path = JOURNAL_DIR,
+        resume: bool = False,
+        fsync_every: int = JOURNAL_FSYNC_EVERY,
+        fsync_interval: float = JOURNAL_FSYNC_INTERVAL,
+    ):
+        """
+        Open (or start) a run's journal.
+        
+        Args:
+            run_id: Run ID (see make_run_id)
+            journal_dir: Directory holding journal files
+            resume: Keep existing entries (otherwise the journal is
+                restarted, and an existing one is rotated aside)
+            fsync_every: Records written between fsyncs
+            fsync_interval: Maximum seconds between fsyncs
+        """
+        self.run_id = run_id
+        self.path = Path(journal_dir) / f"{run_id}.jsonl"
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        
+        if not resume:
+            self._rotate()
+        self.entries: Dict[int, Dict[str, Any]] = self.load(self.path) if resume else {}
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _rotate(self):
+        """Move a non-empty journal of an earlier run aside instead of truncating it."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        
+        n = 1
+        while self.path.with_name(f"{self.path.name}.{n}").exists():
+            n += 1
+        rotated = self.path.with_name(f"{self.path.name}.{n}")
+        self.path.rename(rotated)
+        logger.warning(
+            f"⚠ Run {self.run_id} already has a journal; moved it to {rotated.name} "
+            f"and started a new one (use --resume to continue a run instead)"
+        )
+    
+    @staticmethod
+    def load(path: Path) -> Dict[int, Dict[str, Any]]:
+        """
+        Read a journal back.
+        
+        A truncated last line (crash mid-write) is ignored. If an item was
+        journaled twice, the later entry wins.
+        
+        Args:
+            path: Journal file
+        
+        Returns:
+            Mapping of item number to journal entry
+        """
+        entries = {}
+        if not Path(path).exists():
+            return entries
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"⚠ Skipping unreadable line {line_number} of {path}")
+                    continue
+                entries[entry['item']] = entry
+        return entries
+    
+    def record(self, item: int, prompt: str, response: ModelResponse):
+        """
+        Append one response.
+        
+        Only successful responses are journaled; failed and refused
+        requests are simply sent again on resume.
+        
+        Args:
+            item: Request index within the run
+            prompt: Prompt that was sent
+            response: Model response
+        """
+        if not response.success:
+            return
+        
+        entry = {
+            'run_id': self.run_id,
+            'item': item,
+            'prompt': prompt,
+            'text': response.text,
+            'model_name': response.model_name,
+            'metadata': response.metadata,
+        }
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        
+        with self._lock:
+            self.entries[item] = entry
+            self._file.write(line + '\n')
+            self._unsynced += 1
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            else:
+                self._file.flush()
+    
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def response(self, item: int) -> Optional[ModelResponse]:
+        """Journaled response for an item, or None if it was never answered."""
+        entry = self.entries.get(item)
+        if entry is None:
+            return None
+        return ModelResponse(
+            text=entry['text'],
+            model_name=entry['model_name'],
+            metadata={**entry['metadata'], 'from_journal': True},
+        )
+    
+    def close(self):
+        """Flush and sync outstanding records, then close the file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._sync()
+            self._file.close()
+    
+    def __enter__(self) -> 'RunJournal':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,330 @@
+"""
+Multi-seed replication of an experiment condition.
+
+A condition run with one seed says nothing about how much its accuracy
+depends on the particular symbols drawn. Replicating it over several
+seeds used to mean re-running the whole condition once per seed: stimuli
+generated one seed at a time, then each seed's requests sent as a
+separate run. Here stimuli for every seed are generated up front in a
+process pool, and for each model the requests of all seeds go through a
+single send_runs() call, so the provider's concurrency is shared across
+seeds instead of each seed's short run ending on a tail of idle slots.
+
+Each seed is prepared, journaled and scored like a single-seed run
+(same run options, run IDs and result layout, via PendingRun) and saved
+with its seed in the file name; with more than one seed a pooled result
+over all seeds is saved as well.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+import os
+import statistics
+
+from src.config import RANDOM_SEED, RESULTS_DIR
+from src.experiments.experiment_1_sequential import (
+    ExperimentResult,
+    SequentialTransformationExperiment,
+    send_runs,
+)
+from src.models.base_model import BaseModel
+from src.models.stats import RequestStats
+
+
+def result_filename(result_prefix: str, model_name: str, seed: int, timestamp: str) -> str:
+    """
+    Result file name of one model on one seed.
+    
+    Non-default seeds are added to the name so results of different
+    seeds never overwrite each other.
+    
+    Args:
+        result_prefix: Condition prefix (e.g., "exp1b_minimal")
+        model_name: Model identifier
+        seed: Stimulus seed
+        timestamp: Run timestamp
+    
+    Returns:
+        File name such as "exp1b_minimal_gpt-4_seed7_20251006_100608.json"
+    """
+    seed_part = f"_seed{seed}" if seed != RANDOM_SEED else ""
+    return f"{result_prefix}_{model_name}{seed_part}_{timestamp}.json"
+
+
+def pooled_filename(result_prefix: str, model_name: str, timestamp: str) -> str:
+    """File name of a model's result pooled over seeds."""
+    return f"{result_prefix}_{model_name}_pooled_{timestamp}.json"
+
+
+def generate_stimuli(
+    experiment_class: Type[SequentialTransformationExperiment],
+    seed: int,
+    setup_kwargs: Optional[Dict[str, Any]] = None
+) -> SequentialTransformationExperiment:
+    """
+    Generate (and save) one seed's stimuli.
+    
+    Runs in a worker process, so it only takes and returns picklable
+    values.
+    
+    Args:
+        experiment_class: Experiment class of the condition
+        seed: Stimulus seed
+        setup_kwargs: Keyword arguments for setup_experiment()
+    
+    Returns:
+        The set-up experiment (with everything setup_experiment() set,
+        e.g. a spec's prompt template)
+    """
+    exp = experiment_class(seed=seed)
+    exp.setup_experiment(**(setup_kwargs or {}))
+    return exp
+
+
+def setup_seeds(
+    experiment_class: Type[SequentialTransformationExperiment],
+    seeds: List[int],
+    setup_kwargs: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None
+) -> Dict[int, SequentialTransformationExperiment]:
+    """
+    Set up one experiment per seed, generating stimuli in parallel.
+    
+    Args:
+        experiment_class: Experiment class of the condition
+        seeds: Stimulus seeds
+        setup_kwargs: Keyword arguments for setup_experiment()
+        workers: Worker processes (default: CPU count; 1 generates in
+            this process)
+    
+    Returns:
+        Mapping of seed to its set-up experiment, in seed order given
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(seeds)))
+    job = partial(generate_stimuli, experiment_class, setup_kwargs=setup_kwargs)
+    
+    if workers == 1:
+        return dict(zip(seeds, map(job, seeds)))
+    
+    print(f"Generating stimuli for {len(seeds)} seeds "
+          f"({workers} worker processes)...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(seeds, executor.map(job, seeds)))
+
+
+def run_model_seeds(
+    model: BaseModel,
+    experiments: Dict[int, SequentialTransformationExperiment],
+    experiment_type: str = "main",
+    **run_kwargs
+) -> Dict[int, ExperimentResult]:
+    """
+    Run one model on every seed's stimuli through one concurrent runner.
+    
+    Each seed is prepared as its own run (prompts, journal, early-stop
+    test), and the pending requests of all seeds are sent together, so
+    every run option of run_model() applies.
+    
+    Args:
+        model: Model instance to test
+        experiments: Set-up experiments by seed (see setup_seeds)
+        experiment_type: Experiment type (e.g., "1b_minimal")
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
+    
+    Returns:
+        Mapping of seed to that seed's ExperimentResult. With several
+        seeds, requests are interleaved, so each seed's request stats are
+        rebuilt from its responses' metadata.
+    """
+    seeds = list(experiments)
+    
+    print(f"\n{'='*60}")
+    print(f"Running Experiment 1 on {model.model_name}")
+    print(f"Type: {experiment_type}")
+    print(f"Seeds: {', '.join(str(seed) for seed in seeds)}")
+    print(f"{'='*60}\n")
+    
+    runs = {
+        seed: exp.prepare_run(
+            model, exp.training_examples, exp.test_examples, experiment_type, **run_kwargs
+        )
+        for seed, exp in experiments.items()
+    }
+    if run_kwargs.get('resume'):
+        n_resumed = sum(run.n_resumed for run in runs.values())
+        n_requests = sum(len(run.prompts) for run in runs.values())
+        print(f"Resuming: {n_resumed}/{n_requests} requests already answered\n")
+    
+    send_runs(model, list(runs.values()))
+    
+    results = {}
+    for seed, run in runs.items():
+        print(f"Seed {seed}:")
+        request_stats = None
+        if len(runs) > 1:
+            request_stats = RequestStats.from_metadata(
+                response.metadata for response in run.responses if response is not None
+            )
+        result = run.score(request_stats=request_stats)
+        result.metadata['replication_seeds'] = seeds
+        results[seed] = result
+    return results
+
+
+def pool_results(results: Dict[int, ExperimentResult]) -> ExperimentResult:
+    """
+    Pool per-seed results of one model into one result.
+    
+    Responses are concatenated in seed order, each tagged with its seed.
+    Accuracy is over all pooled items; the per-seed accuracies and their
+    mean and standard deviation are kept in metadata.
+    
+    Args:
+        results: Per-seed results of the same model and condition
+    
+    Returns:
+        Pooled ExperimentResult (metadata['pooled'] is True)
+    """
+    seeds = list(results)
+    first = results[seeds[0]]
+    
+    responses = [
+        {**response, 'seed': seed}
+        for seed, result in results.items()
+        for response in result.responses
+    ]
+    n_correct = sum(result.n_correct for result in results.values())
+    n_total = sum(result.n_total for result in results.values())
+    accuracies = [result.accuracy for result in results.values()]
+    
+    return ExperimentResult(
+        model_name=first.model_name,
+        experiment_type=first.experiment_type,
+        accuracy=n_correct / n_total if n_total > 0 else 0.0,
+        n_correct=n_correct,
+        n_total=n_total,
+        responses=responses,
+        metadata={
+            'pooled': True,
+            'seeds': seeds,
+            'n_seeds': len(seeds),
+            'per_seed': {
+                str(seed): {
+                    'accuracy': result.accuracy,
+                    'n_correct': result.n_correct,
+                    'n_total': result.n_total,
+                    'run_id': result.metadata.get('run_id'),
+                }
+                for seed, result in results.items()
+            },
+            'accuracy_mean': statistics.mean(accuracies),
+            'accuracy_sd': statistics.stdev(accuracies) if len(accuracies) > 1 else 0.0,
+            'n_training_examples': first.metadata.get('n_training_examples'),
+            'sequence_length': first.metadata.get('sequence_length'),
+            'transformation': first.metadata.get('transformation'),
+            'model_stats': first.metadata.get('model_stats'),
+            'n_requests': sum(r.metadata.get('n_requests', 0) for r in results.values()),
+            'n_planned': sum(r.metadata.get('n_planned', 0) for r in results.values()),
+            'budget_exhausted': any(r.metadata.get('budget_exhausted') for r in results.values()),
+            'n_skipped_budget': sum(r.metadata.get('n_skipped_budget', 0) for r in results.values()),
+            'n_not_sent': sum(r.metadata.get('n_not_sent', 0) for r in results.values()),
+            'budget': results[seeds[-1]].metadata.get('budget'),
+        },
+        timestamp=datetime.now().isoformat()
+    )
+
+
+def save_pooled(
+    results: Dict[int, ExperimentResult],
+    filepath: Path,
+    request_stats: Optional[RequestStats] = None
+) -> ExperimentResult:
+    """
+    Pool a model's per-seed results, report and save the pooled result.
+    
+    Args:
+        results: Per-seed results of the same model and condition
+        filepath: Target path of the pooled result
+        request_stats: Request samples of all seeds (default: the
+            per-seed results' stats combined)
+    
+    Returns:
+        The pooled ExperimentResult
+    """
+    pooled = pool_results(results)
+    if request_stats is None:
+        request_stats = RequestStats.combine(
+            result.request_stats for result in results.values()
+            if result.request_stats is not None
+        )
+    pooled.request_stats = request_stats
+    print(f"\n{pooled.model_name} over {len(results)} seeds: "
+          f"{pooled.accuracy:.1%} pooled "
+          f"(mean {pooled.metadata['accuracy_mean']:.1%}, "
+          f"SD {pooled.metadata['accuracy_sd']:.1%})")
+    pooled.save(filepath)
+    return pooled
+
+
+def run_replication(
+    experiment_class: Type[SequentialTransformationExperiment],
+    models: List[BaseModel],
+    experiment_type: str,
+    result_prefix: str,
+    seeds: Optional[List[int]] = None,
+    setup_kwargs: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    **run_kwargs
+) -> List[ExperimentResult]:
+    """
+    Run a condition on every model over several seeds and save the results.
+    
+    Args:
+        experiment_class: Experiment class of the condition
+        models: Model instances to test
+        experiment_type: Experiment type (e.g., "1b_minimal")
+        result_prefix: Result file prefix (e.g., "exp1b_minimal")
+        seeds: Stimulus seeds (default: [RANDOM_SEED])
+        setup_kwargs: Keyword arguments for setup_experiment()
+        workers: Stimulus generation processes (default: CPU count)
+        **run_kwargs: Extra arguments for run_model() (e.g. batch,
+            pack_size, early_stop, resume, sprt)
+    
+    Returns:
+        One result per model: the seed's result for a single seed,
+        otherwise the pooled result
+    """
+    seeds = list(dict.fromkeys(seeds or [RANDOM_SEED]))
+    experiments = setup_seeds(experiment_class, seeds, setup_kwargs, workers)
+    
+    results = []
+    for model in models:
+        if model.budget is not None and model.budget.exhausted:
+            print(f"⚠ Budget exhausted; skipping {model.model_name}")
+            continue
+        
+        stats_mark = len(model.stats)
+        seed_results = run_model_seeds(model, experiments, experiment_type, **run_kwargs)
+        
+        # Each seed's result carries its own request stats (saved alongside)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for seed, result in seed_results.items():
+            result.save(RESULTS_DIR / "raw" / result_filename(
+                result_prefix, model.model_name, seed, timestamp
+            ))
+        
+        if len(seeds) == 1:
+            results.append(seed_results[seeds[0]])
+            continue
+        
+        results.append(save_pooled(
+            seed_results,
+            RESULTS_DIR / "raw" / pooled_filename(result_prefix, model.model_name, timestamp),
+            request_stats=model.stats.since(stats_mark)
+        ))
+    
+    return results
@@ -0,0 +1,422 @@
+"""
+Cross-provider scheduler for experiment grids.
+
+The run_experiment_1* functions test one model after another, so while
+GPT-4 answers, the Claude and Gemini quotas sit idle. GridScheduler takes
+a grid of (condition x model x seed) cells and gives every provider its
+own work queue and worker thread. Providers run side by side, each at
+its own rate limit (limiters and circuit breakers are already
+per-provider), and each ExperimentResult is saved as soon as its cell
+completes. Wall time approaches that of the slowest provider instead of
+the sum over providers.
+
+Stimuli for every seed of a condition are generated up front in a
+process pool (setup_seeds), and once a model has finished every seed of
+a condition, its pooled result is saved as run_replication() does.
+
+Within a cell, run_model() still keeps up to max_concurrency requests in
+flight for that model.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+import logging
+import queue
+import threading
+import time
+
+from src.config import RANDOM_SEED, RESULTS_DIR
+from src.experiments.experiment_1_sequential import (
+    ExperimentResult,
+    SequentialTransformationExperiment,
+)
+from src.experiments.experiment_1b_minimal import MinimalTrainingExperiment
+from src.experiments.experiment_1c_ambiguity import AmbiguityExperiment
+from src.experiments.experiment_1d_scaling import ScalingExperiment
+from src.experiments.experiment_1e_transfer import TransferExperiment
+from src.experiments.experiment_spec import ExperimentSpec, SpecExperiment, compile_spec
+from src.experiments.replication import (
+    pooled_filename,
+    result_filename,
+    save_pooled,
+    setup_seeds,
+)
+from src.models.base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Condition:
+    """
+    An experiment condition that can be scheduled.
+    
+    Attributes:
+        name: Short name (e.g., "1b")
+        experiment_class: Experiment class to instantiate per seed
+        experiment_type: experiment_type passed to run_model()
+        result_prefix: Result file prefix (matches run_experiment_1*)
+        setup_kwargs: Arguments for setup_experiment()
+    """
+    name: str
+    experiment_class: Type[SequentialTransformationExperiment]
+    experiment_type: str
+    result_prefix: str
+    setup_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+CONDITIONS: Dict[str, Condition] = {
+    condition.name: condition for condition in [
+        Condition("1", SequentialTransformationExperiment, "main", "exp1_main"),
+        Condition("1b", MinimalTrainingExperiment, "1b_minimal", "exp1b_minimal",
+                  {'n_training': 3, 'n_test': 20}),
+        Condition("1c", AmbiguityExperiment, "1c_ambiguity", "exp1c_ambiguity",
+                  {'n_per_rule': 3, 'n_test_per_rule': 10}),
+        Condition("1d", ScalingExperiment, "1d_scaling", "exp1d_scaling"),
+        Condition("1e", TransferExperiment, "1e_transfer", "exp1e_transfer"),
+    ]
+}
+
+
+def register_spec(spec: Union[ExperimentSpec, str, Path]) -> Condition:
+    """
+    Make a spec schedulable as a condition named after the spec.
+    
+    The spec is compiled here, so an invalid spec fails before anything
+    is generated or sent.
+    
+    Args:
+        spec: ExperimentSpec, spec file path, or bundled spec name
+    
+    Returns:
+        The registered Condition (also added to CONDITIONS)
+    """
+    plan = compile_spec(spec)
+    condition = Condition(
+        plan.spec.name,
+        SpecExperiment,
+        plan.spec.experiment_type,
+        plan.spec.result_prefix,
+        {'spec': plan.spec}
+    )
+    CONDITIONS[condition.name] = condition
+    return condition
+
+
+@dataclass(frozen=True)
+class GridCell:
+    """One (condition, model, seed) run."""
+    condition: str
+    model_name: str
+    seed: int
+    
+    def result_filename(self, timestamp: str) -> str:
+        """
+        Result file name, as run_experiment_1* would write it.
+        
+        Non-default seeds are added to the name so cells of different
+        seeds never overwrite each other.
+        """
+        return result_filename(
+            CONDITIONS[self.condition].result_prefix, self.model_name, self.seed, timestamp
+        )
+    
+    def __str__(self) -> str:
+        return f"exp{self.condition} / {self.model_name} / seed {self.seed}"
+
+
+class GridScheduler:
+    """
+    Runs a grid of experiment cells with one worker per provider.
+    
+    Usage:
+        scheduler = GridScheduler(models, conditions=["1", "1b"], seeds=[42, 43])
+        results = scheduler.run()
+    """
+    
+    def __init__(
+        self,
+        models: List[BaseModel],
+        conditions: Sequence[str] = ("1",),
+        seeds: Sequence[int] = (RANDOM_SEED,),
+        results_dir: Path = RESULTS_DIR / "raw",
+        workers: Optional[int] = None,
+        **run_kwargs
+    ):
+        """
+        Initialize scheduler.
+        
+        Args:
+            models: Model instances (one worker per distinct provider)
+            conditions: Condition names (see CONDITIONS)
+            seeds: Random seeds; each seed regenerates the stimuli
+            results_dir: Directory for result files
+            workers: Stimulus generation processes (default: CPU count)
+            **run_kwargs: Extra arguments for run_model() (e.g. batch,
+                pack_size, early_stop)
+        
+        Raises:
+            ValueError: On unknown conditions or duplicate model names
+        """
+        for name in conditions:
+            if name not in CONDITIONS:
+                raise ValueError(
+                    f"Unknown condition '{name}'. Available: {', '.join(CONDITIONS)}"
+                )
+        
+        self.models: Dict[str, BaseModel] = {}
+        for model in models:
+            if model.model_name in self.models:
+                raise ValueError(f"Model {model.model_name} given twice")
+            self.models[model.model_name] = model
+        
+        self.conditions = list(conditions)
+        self.seeds = list(dict.fromkeys(seeds))
+        self.results_dir = Path(results_dir)
+        self.workers = workers
+        self.run_kwargs = run_kwargs
+        
+        self.results: Dict[GridCell, ExperimentResult] = {}
+        self.pooled: Dict[Tuple[str, str], ExperimentResult] = {}
+        self.failures: Dict[GridCell, str] = {}
+        self.skipped: List[GridCell] = []
+        self.interrupted: List[GridCell] = []
+        self._experiments: Dict[Tuple[str, int], SequentialTransformationExperiment] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def cells(self) -> List[GridCell]:
+        """All cells of the grid, in condition, seed, model order."""
+        return [
+            GridCell(condition, model_name, seed)
+            for condition in self.conditions
+            for seed in self.seeds
+            for model_name in self.models
+        ]
+    
+    def queues(self) -> Dict[str, List[GridCell]]:
+        """Cells grouped by the provider that serves them."""
+        by_provider: Dict[str, List[GridCell]] = {}
+        for cell in self.cells():
+            provider = self.models[cell.model_name].provider
+            by_provider.setdefault(provider, []).append(cell)
+        return by_provider
+    
+    def setup(self):
+        """Generate stimuli for every (condition, seed) before dispatching."""
+        for condition_name in self.conditions:
+            condition = CONDITIONS[condition_name]
+            seeds = [seed for seed in self.seeds if (condition_name, seed) not in self._experiments]
+            if not seeds:
+                continue
+            experiments = setup_seeds(
+                condition.experiment_class, seeds, condition.setup_kwargs, self.workers
+            )
+            for seed, exp in experiments.items():
+                self._experiments[(condition_name, seed)] = exp
+    
+    def experiment(self, cell: GridCell) -> SequentialTransformationExperiment:
+        """Set-up experiment serving a cell (setup() must have been called)."""
+        return self._experiments[(cell.condition, cell.seed)]
+    
+    def run_cell(self, cell: GridCell) -> Optional[ExperimentResult]:
+        """
+        Run and save one cell.
+        
+        Args:
+            cell: Cell to run (setup() must have been called)
+        
+        Returns:
+            ExperimentResult of the cell, or None if the grid was stopped
+            while it ran (its answered requests are in the run journal)
+        """
+        condition = CONDITIONS[cell.condition]
+        exp = self.experiment(cell)
+        
+        result = exp.run_model(
+            model=self.models[cell.model_name],
+            training_examples=exp.training_examples,
+            test_examples=exp.test_examples,
+            experiment_type=condition.experiment_type,
+            should_stop=self._stop.is_set,
+            **self.run_kwargs
+        )
+        if self._stop.is_set():
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        result.save(self.results_dir / cell.result_filename(timestamp))
+        return result
+    
+    def pool_cell(self, cell: GridCell) -> Optional[ExperimentResult]:
+        """
+        Save the pooled result of a cell's (condition, model) once all its seeds are done.
+        
+        Args:
+            cell: A cell that just completed
+        
+        Returns:
+            The pooled result, or None with a single seed or while seeds
+            of the (condition, model) are still missing
+        """
+        if len(self.seeds) < 2:
+            return None
+        with self._lock:
+            seed_results = {
+                seed: self.results.get(GridCell(cell.condition, cell.model_name, seed))
+                for seed in self.seeds
+            }
+        if any(result is None for result in seed_results.values()):
+            return None
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        pooled = save_pooled(seed_results, self.results_dir / pooled_filename(
+            CONDITIONS[cell.condition].result_prefix, cell.model_name, timestamp
+        ))
+        with self._lock:
+            self.pooled[(cell.condition, cell.model_name)] = pooled
+        return pooled
+    
+    def _worker(
+        self,
+        provider: str,
+        cells: "queue.Queue[GridCell]",
+        n_total: int,
+        done: threading.Event
+    ):
+        """
+        Run a provider's cells in turn until the queue empties or the grid stops.
+        
+        Sets `done` on exit. run() waits on these events rather than on
+        Thread.join(), which forgets a still-running thread once a join
+        has been interrupted by Ctrl+C.
+        """
+        try:
+            while not self._stop.is_set():
+                try:
+                    cell = cells.get_nowait()
+                except queue.Empty:
+                    return
+                
+                model = self.models[cell.model_name]
+                if model.budget is not None and model.budget.exhausted:
+                    print(f"⚠ Budget exhausted; skipping {cell}")
+                    with self._lock:
+                        self.skipped.append(cell)
+                    continue
+                
+                try:
+                    result = self.run_cell(cell)
+                except Exception as e:
+                    # One broken cell should not stop the provider's other cells
+                    logger.error(f"✗ [{provider}] {cell} failed: {e}")
+                    with self._lock:
+                        self.failures[cell] = str(e)
+                    continue
+                
+                if result is None:
+                    with self._lock:
+                        self.interrupted.append(cell)
+                    continue
+                
+                with self._lock:
+                    self.results[cell] = result
+                    n_done = len(self.results) + len(self.failures) + len(self.skipped)
+                print(f"✓ [{provider}] {cell}: {result.accuracy:.1%} "
+                      f"({n_done}/{n_total} cells done)")
+                
+                # A (condition, model)'s seeds share this provider's queue
+                try:
+                    self.pool_cell(cell)
+                except Exception as e:
+                    logger.error(f"✗ [{provider}] pooling exp{cell.condition} / "
+                                 f"{cell.model_name} failed: {e}")
+        finally:
+            done.set()
+    
+    def run(self) -> List[ExperimentResult]:
+        """
+        Run the whole grid.
+        
+        Returns:
+            Results of completed cells, in cells() order
+        """
+        self.setup()
+        
+        by_provider = self.queues()
+        n_total = sum(len(cells) for cells in by_provider.values())
+        print(f"\nScheduling {n_total} cell(s) across {len(by_provider)} provider(s): "
+              + ", ".join(f"{p} ({len(c)})" for p, c in by_provider.items()))
+        
+        start = time.monotonic()
+        self._stop.clear()
+        done: List[threading.Event] = []
+        for provider, provider_cells in by_provider.items():
+            cells: "queue.Queue[GridCell]" = queue.Queue()
+            for cell in provider_cells:
+                cells.put(cell)
+            event = threading.Event()
+            worker = threading.Thread(
+                target=self._worker,
+                args=(provider, cells, n_total, event),
+                name=f"grid-{provider}",
+                daemon=True,
+            )
+            worker.start()
+            done.append(event)
+        
+        # Wait with a timeout so Ctrl+C still reaches the main thread
+        try:
+            for event in done:
+                while not event.wait(timeout=0.5):
+                    pass
+        except KeyboardInterrupt:
+            print("\n⚠ Interrupted: waiting for requests in flight, then closing "
+                  "journals (resume later with --resume)")
+            raise
+        finally:
+            # Workers send nothing more once stopped; waiting for them lets
+            # each cell close its journal instead of dying with the process
+            self._stop.set()
+            for event in done:
+                while not event.wait(timeout=0.5):
+                    pass
+        
+        elapsed = time.monotonic() - start
+        print(f"\n✓ Grid finished in {elapsed:.1f}s: {len(self.results)} completed, "
+              f"{len(self.failures)} failed, {len(self.skipped)} skipped")
+        if len(self.seeds) > 1:
+            n_pairs = len(self.conditions) * len(self.models)
+            print(f"  Pooled over {len(self.seeds)} seeds: {len(self.pooled)}/{n_pairs} "
+                  f"(condition, model) pairs")
+        
+        return [self.results[cell] for cell in self.cells() if cell in self.results]
+
+
+def run_grid(
+    models: List[BaseModel],
+    conditions: Sequence[str] = ("1",),
+    seeds: Optional[Sequence[int]] = None,
+    **run_kwargs
+) -> List[ExperimentResult]:
+    """
+    Run conditions x models x seeds with providers in parallel.
+    
+    Args:
+        models: List of model instances to test
+        conditions: Condition names (see CONDITIONS)
+        seeds: Random seeds (default: [RANDOM_SEED])
+        **run_kwargs: Extra arguments for run_model()
+    
+    Returns:
+        List of ExperimentResult objects
+    """
+    scheduler = GridScheduler(
+        models,
+        conditions=conditions,
+        seeds=seeds or [RANDOM_SEED],
+        **run_kwargs
+    )
+    return scheduler.run()
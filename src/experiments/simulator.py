@@ -0,0 +1,436 @@
+"""
+Dry-run forecast of an experiment grid.
+
+Before a grid is sent, forecast_grid() renders every cell's prompts
+exactly as run_model() would and counts requests and tokens per model.
+It then replays each provider's queue in a discrete-event simulation
+that applies the provider's rate limiter rules. Cells run one after
+another, each with up to max_concurrency requests in flight. Every
+request reserves estimate_tokens() against TPM, and its actual tokens
+are charged when it completes. Service times are drawn from the
+latency_seconds of saved results. The simulation is repeated
+n_simulations times and gives a wall-clock distribution per provider.
+Providers run in parallel, so the whole grid takes as long as the
+slowest provider.
+
+The forecast is an upper bound for runs that send fewer requests than
+planned (cache hits, --resume, --sprt). Retries are not simulated.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import random
+
+from src.config import RANDOM_SEED, RESULTS_DIR
+from src.experiments.scheduler import GridCell, GridScheduler
+from src.models.budget import Budget, TokenEstimator
+from src.models.rate_limiter import TokenBucket
+from src.models.stats import percentile
+from src.result_io import iter_responses, read_header, result_files
+
+# Service time assumed for models without saved latencies
+DEFAULT_LATENCY_SECONDS = 5.0
+
+# Simulated runs per forecast
+N_SIMULATIONS = 200
+
+# Bucket waits below this are float round-off (a drained bucket reports
+# ~1e-16 s left, which no longer advances the simulated clock)
+_MIN_WAIT_SECONDS = 1e-9
+
+
+@dataclass
+class RunHistory:
+    """
+    Per-request (latency_seconds, completion_tokens) samples of saved runs.
+    
+    Attributes:
+        samples: Samples per model name. completion_tokens is per item
+            (packed replies are divided by their pack size) and None when
+            the provider reported no usage.
+    """
+    samples: Dict[str, List[Tuple[float, Optional[float]]]] = field(default_factory=dict)
+    
+    @classmethod
+    def from_results(cls, results_dir: Path = RESULTS_DIR / "raw") -> 'RunHistory':
+        """
+        Collect samples from saved results.
+        
+        Args:
+            results_dir: Directory containing ExperimentResult files
+        
+        Returns:
+            RunHistory (empty if there are no saved results)
+        """
+        samples: Dict[str, List[Tuple[float, Optional[float]]]] = {}
+        for filepath in result_files(results_dir):
+            try:
+                header = read_header(filepath)
+            except (OSError, ValueError):
+                continue
+            model_name = header.get('model_name')
+            pack_size = (header.get('metadata') or {}).get('pack_size') or 1
+            
+            for response in iter_responses(filepath):
+                # Items of a packed request share one reply; count it once
+                if response.get('pack_position', 1) != 1:
+                    continue
+                metadata = response.get('model_metadata') or {}
+                latency = metadata.get('latency_seconds')
+                if latency is None or metadata.get('cache_hit'):
+                    continue
+                completion_tokens = metadata.get('completion_tokens')
+                if completion_tokens is not None:
+                    completion_tokens = completion_tokens / pack_size
+                samples.setdefault(model_name, []).append((latency, completion_tokens))
+        return cls(samples)
+    
+    def n_samples(self, model_name: str) -> int:
+        return len(self.samples.get(model_name, []))
+    
+    def latencies(self, model_name: str) -> List[float]:
+        """Saved latencies of a model ([DEFAULT_LATENCY_SECONDS] if none)."""
+        latencies = [latency for latency, _ in self.samples.get(model_name, [])]
+        return latencies or [DEFAULT_LATENCY_SECONDS]
+    
+    def mean_completion_tokens(self, model_name: str, default: float) -> float:
+        """Mean completion tokens per item of a model (default if unknown)."""
+        tokens = [t for _, t in self.samples.get(model_name, []) if t is not None]
+        return sum(tokens) / len(tokens) if tokens else default
+
+
+@dataclass
+class CellForecast:
+    """
+    Planned requests of one grid cell.
+    
+    Attributes:
+        cell: Grid cell
+        provider: Provider serving the cell
+        n_requests: Requests run_model() will send
+        prompt_tokens: Estimated prompt tokens (calibrated estimator)
+        completion_tokens: Expected completion tokens (from history)
+        max_completion_tokens: Completion tokens if every reply hits max_tokens
+        cost_usd: Expected cost
+        max_cost_usd: Worst-case cost (as reserved by the budget)
+        reserved_tokens: estimate_tokens() of each request, reserved
+            against the provider's TPM budget
+        actual_prompt_tokens: Estimated prompt tokens of each request
+        completion_per_request: Expected completion tokens per request
+    """
+    cell: GridCell
+    provider: str
+    n_requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    max_completion_tokens: int
+    cost_usd: float
+    max_cost_usd: float
+    reserved_tokens: List[int] = field(default_factory=list, repr=False)
+    actual_prompt_tokens: List[int] = field(default_factory=list, repr=False)
+    completion_per_request: float = 0.0
+
+
+@dataclass
+class RunForecast:
+    """
+    Forecast of a grid run.
+    
+    Attributes:
+        cells: Planned requests per cell, in cells() order
+        provider_seconds: Simulated wall-clock samples per provider
+        total_seconds: Simulated wall-clock samples of the whole grid
+        history_samples: Latency samples available per model
+        notes: Caveats (e.g. batch mode) to print with the forecast
+    """
+    cells: List[CellForecast]
+    provider_seconds: Dict[str, List[float]]
+    total_seconds: List[float]
+    history_samples: Dict[str, int]
+    notes: List[str] = field(default_factory=list)
+    
+    def per_model(self) -> Dict[str, Dict[str, Any]]:
+        """Requests, tokens and cost summed over each model's cells."""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for forecast in self.cells:
+            entry = totals.setdefault(forecast.cell.model_name, {
+                'provider': forecast.provider,
+                'n_cells': 0,
+                'n_requests': 0,
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'max_completion_tokens': 0,
+                'cost_usd': 0.0,
+                'max_cost_usd': 0.0,
+            })
+            entry['n_cells'] += 1
+            for key in ('n_requests', 'prompt_tokens', 'completion_tokens',
+                        'max_completion_tokens', 'cost_usd', 'max_cost_usd'):
+                entry[key] += getattr(forecast, key)
+        return totals
+    
+    def wall_clock(self, q: float, provider: Optional[str] = None) -> float:
+        """q-th percentile of simulated wall-clock seconds (grid or one provider)."""
+        samples = self.total_seconds if provider is None else self.provider_seconds[provider]
+        return percentile(sorted(samples), q)
+    
+    @property
+    def cost_usd(self) -> float:
+        return sum(forecast.cost_usd for forecast in self.cells)
+    
+    @property
+    def max_cost_usd(self) -> float:
+        return sum(forecast.max_cost_usd for forecast in self.cells)
+
+
+def plan_cell(
+    scheduler: GridScheduler,
+    cell: GridCell,
+    history: RunHistory,
+    pricing: Budget
+) -> CellForecast:
+    """
+    Render a cell's prompts and count its requests and tokens.
+    
+    Args:
+        scheduler: Scheduler whose setup() has been called
+        cell: Cell to plan
+        history: Saved run history (for expected completion length)
+        pricing: Budget used for its cost() and token estimator
+    
+    Returns:
+        CellForecast of the cell
+    """
+    model = scheduler.models[cell.model_name]
+    exp = scheduler.experiment(cell)
+    pack_size = scheduler.run_kwargs.get('pack_size', 1)
+    prompts = exp.build_prompts(exp.training_examples, exp.test_examples, pack_size)
+    
+    max_tokens = model.max_tokens * pack_size
+    completion_per_request = min(
+        max_tokens,
+        history.mean_completion_tokens(model.model_name, model.max_tokens) * pack_size
+    )
+    prompt_tokens = [pricing.estimator.estimate(model.model_name, p) for p in prompts]
+    
+    n_prompt = sum(prompt_tokens)
+    n_completion = int(round(completion_per_request * len(prompts)))
+    n_max_completion = max_tokens * len(prompts)
+    batch = bool(scheduler.run_kwargs.get('batch')) and model.supports_batch
+    return CellForecast(
+        cell=cell,
+        provider=model.provider,
+        n_requests=len(prompts),
+        prompt_tokens=n_prompt,
+        completion_tokens=n_completion,
+        max_completion_tokens=n_max_completion,
+        cost_usd=pricing.cost(model.model_name, n_prompt, n_completion, batch=batch),
+        max_cost_usd=pricing.cost(model.model_name, n_prompt, n_max_completion, batch=batch),
+        reserved_tokens=[model.estimate_tokens(p) for p in prompts],
+        actual_prompt_tokens=prompt_tokens,
+        completion_per_request=completion_per_request,
+    )
+
+
+def _new_bucket(bucket: Optional[TokenBucket]) -> Optional[TokenBucket]:
+    """Full copy of a limiter bucket on the simulated clock (starts at 0)."""
+    if bucket is None:
+        return None
+    simulated = TokenBucket(bucket.capacity)
+    simulated.updated_at = 0.0
+    return simulated
+
+
+def simulate_provider(
+    scheduler: GridScheduler,
+    forecasts: List[CellForecast],
+    history: RunHistory,
+    rng: random.Random
+) -> float:
+    """
+    Simulate one provider's queue once.
+    
+    Mirrors the provider worker of GridScheduler: cells run in order, each
+    with up to its model's max_concurrency requests in flight; a request
+    starts once a slot is free and the RPM and TPM buckets allow it.
+    
+    Args:
+        scheduler: Scheduler of the grid
+        forecasts: The provider's cells, in queue order
+        history: Latency samples to draw service times from
+        rng: Random source for the service times
+    
+    Returns:
+        Simulated seconds until the provider's last request completes
+    """
+    limiter = scheduler.models[forecasts[0].cell.model_name].rate_limiter
+    requests = _new_bucket(limiter.requests)
+    tokens = _new_bucket(limiter.tokens)
+    
+    # Token corrections (actual - reserved) charged at completion time
+    corrections: List[Tuple[float, int]] = []
+    
+    def settle(now: float):
+        while corrections and corrections[0][0] <= now:
+            at, delta = heapq.heappop(corrections)
+            if tokens is not None:
+                tokens.consume(delta, at)
+    
+    clock = 0.0
+    for forecast in forecasts:
+        model = scheduler.models[forecast.cell.model_name]
+        latencies = history.latencies(model.model_name)
+        slots = [clock] * model.max_concurrency
+        started = clock
+        finished = clock
+        
+        for reserved, prompt_tokens in zip(forecast.reserved_tokens, forecast.actual_prompt_tokens):
+            now = max(heapq.heappop(slots), started)
+            while True:
+                settle(now)
+                wait = 0.0
+                if requests is not None:
+                    wait = max(wait, requests.time_until(1, now))
+                if tokens is not None:
+                    wait = max(wait, tokens.time_until(reserved, now))
+                if wait < _MIN_WAIT_SECONDS:
+                    break
+                now += wait
+            
+            if requests is not None:
+                requests.consume(1, now)
+            if tokens is not None:
+                tokens.consume(reserved, now)
+            
+            done = now + rng.choice(latencies)
+            actual = prompt_tokens + int(round(forecast.completion_per_request))
+            heapq.heappush(corrections, (done, actual - reserved))
+            heapq.heappush(slots, done)
+            started = now
+            finished = max(finished, done)
+        
+        clock = finished
+    return clock
+
+
+def forecast_grid(
+    scheduler: GridScheduler,
+    history: Optional[RunHistory] = None,
+    estimator: Optional[TokenEstimator] = None,
+    n_simulations: int = N_SIMULATIONS,
+    seed: int = RANDOM_SEED
+) -> RunForecast:
+    """
+    Plan a grid and simulate its wall-clock time and cost.
+    
+    Generates the stimuli (scheduler.setup()) but sends nothing.
+    
+    Args:
+        scheduler: Scheduler of the grid to forecast
+        history: Saved run history (default: from data/results/raw)
+        estimator: Prompt token estimator (default: calibrated on saved results)
+        n_simulations: Simulated runs
+        seed: Seed of the simulated service times
+    
+    Returns:
+        RunForecast
+    """
+    scheduler.setup()
+    history = history if history is not None else RunHistory.from_results()
+    pricing = Budget(
+        max_cost_usd=None,
+        max_tokens=None,
+        estimator=estimator or TokenEstimator.from_results(),
+    )
+    
+    cells = [plan_cell(scheduler, cell, history, pricing) for cell in scheduler.cells()]
+    by_cell = {forecast.cell: forecast for forecast in cells}
+    queues = {
+        provider: [by_cell[cell] for cell in provider_cells]
+        for provider, provider_cells in scheduler.queues().items()
+    }
+    
+    rng = random.Random(seed)
+    provider_seconds: Dict[str, List[float]] = {provider: [] for provider in queues}
+    total_seconds = []
+    for _ in range(n_simulations):
+        run_seconds = 0.0
+        for provider, forecasts in queues.items():
+            seconds = simulate_provider(scheduler, forecasts, history, rng)
+            provider_seconds[provider].append(seconds)
+            run_seconds = max(run_seconds, seconds)
+        total_seconds.append(run_seconds)
+    
+    notes = []
+    if scheduler.run_kwargs.get('batch'):
+        batch_models = [m.model_name for m in scheduler.models.values() if m.supports_batch]
+        if batch_models:
+            notes.append(
+                f"Batch jobs ({', '.join(batch_models)}) are simulated as concurrent "
+                f"requests; provider batch turnaround can take hours"
+            )
+    if scheduler.run_kwargs.get('sprt') or scheduler.run_kwargs.get('resume'):
+        notes.append("Early stopping/resume send fewer requests; figures are upper bounds")
+    
+    return RunForecast(
+        cells=cells,
+        provider_seconds=provider_seconds,
+        total_seconds=total_seconds,
+        history_samples={name: history.n_samples(name) for name in scheduler.models},
+        notes=notes,
+    )
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
+
+def format_forecast(forecast: RunForecast) -> str:
+    """Multi-line table of a RunForecast, for printing before a run."""
+    lines = [
+        f"{'Model':28s} {'Requests':>8s} {'Prompt tok':>11s} "
+        f"{'Compl. tok':>11s} {'Cost (exp / max)':>18s}",
+        "-" * 80,
+    ]
+    for model_name, entry in forecast.per_model().items():
+        lines.append(
+            f"{model_name:28s} {entry['n_requests']:>8,} {entry['prompt_tokens']:>11,} "
+            f"{entry['completion_tokens']:>11,} "
+            f"{'$%.2f / $%.2f' % (entry['cost_usd'], entry['max_cost_usd']):>18s}"
+        )
+    n_requests = sum(cell.n_requests for cell in forecast.cells)
+    lines.append("-" * 80)
+    lines.append(
+        f"{'Total':28s} {n_requests:>8,} {'':>11s} {'':>11s} "
+        f"{'$%.2f / $%.2f' % (forecast.cost_usd, forecast.max_cost_usd):>18s}"
+    )
+    
+    lines.append("")
+    lines.append("Predicted wall-clock (p50 / p90):")
+    for provider in forecast.provider_seconds:
+        lines.append(
+            f"  {provider:12s} {_format_duration(forecast.wall_clock(50, provider)):>8s} / "
+            f"{_format_duration(forecast.wall_clock(90, provider))}"
+        )
+    lines.append(
+        f"  {'grid':12s} {_format_duration(forecast.wall_clock(50)):>8s} / "
+        f"{_format_duration(forecast.wall_clock(90))}  (providers in parallel)"
+    )
+    
+    missing = [name for name, n in forecast.history_samples.items() if n == 0]
+    if missing:
+        lines.append(
+            f"\nNo latency history for {', '.join(missing)}: assuming "
+            f"{DEFAULT_LATENCY_SECONDS:.0f}s per request and max_tokens per reply"
+        )
+    for note in forecast.notes:
+        lines.append(f"⚠ {note}")
+    return "\n".join(lines)
@@ -6,17 +6,33 @@ different LLM providers (OpenAI, Anthropic, Google).
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from dataclasses import dataclass, asdict
+import asyncio
+import threading
 import time
 import logging
 
+from src.models.rate_limiter import RateLimiter, get_rate_limiter
+from src.models.response_cache import ResponseCache, get_response_cache
+from src.models.retry import RetryPolicy, CircuitBreaker, get_circuit_breaker
+from src.models.stats import RequestStats
+from src.models.budget import Budget, BudgetExceeded
 from src.config import (
     MAX_RETRIES,
     RATE_LIMIT_DELAY,
     REQUEST_TIMEOUT,
     MODEL_TEMPERATURE,
     MAX_TOKENS,
+    MAX_CONCURRENT_REQUESTS,
+    RESPONSE_CACHE_ENABLED,
+    BATCH_POLL_INTERVAL,
+    BATCH_TIMEOUT,
+    PROMPT_CACHING,
+    HEDGE_REQUESTS,
+    HEDGE_MAX_RATE,
+    HEDGE_MIN_SAMPLES,
 )
 
 # Configure logging
@@ -24,6 +40,29 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def run_coroutine(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Uses asyncio.run() normally. If an event loop is already running in
+    this thread (e.g. Jupyter), runs it on a helper thread instead, since
+    asyncio.run() cannot be nested.
+    
+    Args:
+        coro: Coroutine to run
+    
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
 @dataclass
 class ModelResponse:
     """
@@ -55,6 +94,17 @@ class BaseModel(ABC):
     to ensure consistent behavior across experiments.
     """
     
+    # Provider key for shared rate limits (see RATE_LIMITS in src/config.py)
+    provider: str = "generic"
+    
+    # Whether the wrapper implements the provider's batch API
+    supports_batch: bool = False
+    
+    # SDK exception types that are always / never worth retrying
+    # (see RetryPolicy; errors in neither are classified by HTTP status)
+    retryable_errors: Tuple[type, ...] = ()
+    fatal_errors: Tuple[type, ...] = ()
+    
     def __init__(
         self,
         model_name: str,
@@ -63,6 +113,16 @@ class BaseModel(ABC):
         max_tokens: int = MAX_TOKENS,
         max_retries: int = MAX_RETRIES,
         rate_limit_delay: float = RATE_LIMIT_DELAY,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        rate_limiter: Optional[RateLimiter] = None,
+        use_cache: bool = RESPONSE_CACHE_ENABLED,
+        response_cache: Optional[ResponseCache] = None,
+        prompt_caching: bool = PROMPT_CACHING,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedging: bool = HEDGE_REQUESTS,
+        hedge_max_rate: float = HEDGE_MAX_RATE,
+        budget: Optional[Budget] = None,
     ):
         """
         Initialize base model.
@@ -73,7 +133,20 @@ class BaseModel(ABC):
             temperature: Sampling temperature (0.0 for deterministic)
             max_tokens: Maximum tokens in response
             max_retries: Maximum retry attempts for failed requests
-            rate_limit_delay: Delay between requests (seconds)
+            rate_limit_delay: Base delay for retry backoff (seconds)
+            max_concurrency: Maximum requests in flight in generate_many()
+            rate_limiter: Limiter to use (default: shared limiter for provider)
+            use_cache: Serve temperature-0 requests from the response cache
+            response_cache: Cache to use (default: shared on-disk cache)
+            prompt_caching: Ask the provider to cache the shared prompt prefix
+            retry_policy: Error classification and backoff (default: jittered
+                backoff from rate_limit_delay with this wrapper's SDK errors)
+            circuit_breaker: Breaker to use (default: shared breaker for provider)
+            hedging: In agenerate(), send a duplicate request when a call
+                outlives this model's observed p95 latency
+            hedge_max_rate: Maximum fraction of calls that may be hedged
+            budget: Run budget to reserve/charge each request against
+                (shared across models; None for no budget)
         """
         self.model_name = model_name
         self.api_key = api_key
@@ -81,11 +154,38 @@ class BaseModel(ABC):
         self.max_tokens = max_tokens
         self.max_retries = max_retries
         self.rate_limit_delay = rate_limit_delay
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = rate_limiter or get_rate_limiter(self.provider)
+        self.use_cache = use_cache
+        if response_cache is None and use_cache:
+            response_cache = get_response_cache()
+        self.response_cache = response_cache
+        self.prompt_caching = prompt_caching
+        self.retry_policy = retry_policy or RetryPolicy(
+            base_delay=rate_limit_delay,
+            retryable=self.retryable_errors,
+            fatal=self.fatal_errors,
+        )
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(self.provider)
+        self.hedging = hedging
+        self.hedge_max_rate = hedge_max_rate
+        self.budget = budget
+        
+        # Async clients are bound to the event loop that created them
+        self._async_client = None
+        self._async_client_loop = None
         
-        # Request tracking
+        # Request tracking (counters are updated from concurrent requests)
         self.request_count = 0
         self.total_tokens = 0
         self.failed_requests = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.hedge_candidates = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self.stats = RequestStats()
+        self._counters_lock = threading.Lock()
         
         logger.info(f"Initialized {self.__class__.__name__} with model: {model_name}")
     
@@ -122,10 +222,139 @@ class BaseModel(ABC):
         """
         pass
     
+    @staticmethod
+    def split_prompt(prompt: str) -> Tuple[str, str]:
+        """
+        Split a prompt into a shared prefix and a per-item suffix.
+        
+        Experiment prompts are "<training block>\n\n<test input> →". The
+        training block is identical for every test item in a condition,
+        so it is the part worth caching on the provider side.
+        
+        Args:
+            prompt: Full prompt string
+            
+        Returns:
+            (prefix, suffix) with prefix + suffix == prompt; prefix is ""
+            if the prompt has no blank-line separator
+        """
+        split_at = prompt.rfind("\n\n")
+        if split_at < 0:
+            return "", prompt
+        return prompt[:split_at + 2], prompt[split_at + 2:]
+    
+    def _create_async_client(self) -> Any:
+        """
+        Create the provider's async client.
+        
+        Wrappers backed by an SDK with an async client override this.
+        The default (None) makes _make_api_call_async fall back to
+        running _make_api_call in a worker thread.
+        
+        Returns:
+            Async client instance, or None
+        """
+        return None
+    
+    def _get_async_client(self) -> Any:
+        """
+        Get the async client for the running event loop.
+        
+        Async HTTP clients hold connections tied to the loop they were
+        created on, so a fresh client is built for each new loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client_loop is not loop:
+            self._async_client = self._create_async_client()
+            self._async_client_loop = loop
+        return self._async_client
+    
+    async def _make_api_call_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Async counterpart of _make_api_call.
+        
+        Must return the same raw dictionary as _make_api_call so that
+        _parse_response can be shared. The default runs the synchronous
+        call in a worker thread.
+        
+        Args:
+            prompt: Input prompt string
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            Dict containing raw API response
+        """
+        return await asyncio.to_thread(self._make_api_call, prompt, **kwargs)
+    
+    def _make_streaming_call(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Make a streaming API call that stops once the answer is complete.
+        
+        Wrappers override this to stream deltas, pass them through
+        _stream_should_stop(), and close the stream early when it returns
+        True. The result has the same shape as _make_api_call()'s, plus
+        'stopped_early' (and 'usage_estimated' when the provider reported
+        no usage for the cut-off stream). The default makes a normal call.
+        
+        Args:
+            prompt: Input prompt string
+            stop_when: Returns True for an output line that completes the answer
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            Dict containing raw API response
+        """
+        return self._make_api_call(prompt, **kwargs)
+    
+    async def _make_streaming_call_async(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async version of _make_streaming_call()."""
+        return await self._make_api_call_async(prompt, **kwargs)
+    
+    @staticmethod
+    def _stream_should_stop(text: str, delta: str, stop_when: Callable[[str], bool]) -> bool:
+        """
+        Check the output lines completed by the latest stream delta.
+        
+        Only the lines ending inside `delta` are examined, so the total
+        work over a stream is linear in its length.
+        
+        Args:
+            text: Output so far (ending with delta)
+            delta: Newly received text
+            stop_when: Returns True for a line that completes the answer
+            
+        Returns:
+            True if the stream can be closed
+        """
+        if '\n' not in delta:
+            return False
+        start = text.rfind('\n', 0, len(text) - len(delta)) + 1
+        end = text.rfind('\n')
+        return any(stop_when(line) for line in text[start:end].split('\n'))
+    
+    def _estimate_usage(self, prompt: str, text: str) -> Tuple[int, int]:
+        """
+        Estimate (prompt, completion) tokens for a stream closed before
+        the provider reported usage (same ~2 chars/token as estimate_tokens).
+        """
+        return len(prompt) // 2, max(1, len(text) // 2)
+    
     def generate(
         self,
         prompt: str,
         log_request: bool = True,
+        use_cache: Optional[bool] = None,
+        stop_when: Optional[Callable[[str], bool]] = None,
         **kwargs
     ) -> ModelResponse:
         """
@@ -137,64 +366,764 @@ class BaseModel(ABC):
         Args:
             prompt: Input prompt string
             log_request: Whether to log this request
+            use_cache: Read from the response cache (default: self.use_cache);
+                False forces a fresh sample, which still refreshes the cache
+            stop_when: Stream the response and stop as soon as this returns
+                True for a completed output line (see _make_streaming_call)
             **kwargs: Additional parameters for API call
             
         Returns:
             ModelResponse object
         """
+        # Deterministic requests may be served from the response cache
+        # (early-stopped outputs are truncated, so they are cached separately)
+        cache_key = self._cache_key(
+            prompt, kwargs if stop_when is None else dict(kwargs, early_stop=True)
+        )
+        if cache_key is not None:
+            cached = self._cache_lookup(cache_key, use_cache, log_request)
+            if cached is not None:
+                return cached
+        
         if log_request:
             logger.info(f"Making request to {self.model_name}")
             logger.debug(f"Prompt: {prompt[:100]}...")
         
-        # Rate limiting
-        if self.request_count > 0:
-            time.sleep(self.rate_limit_delay)
+        estimated_tokens = self.estimate_tokens(prompt)
+        
+        # Reserve worst-case usage; refuse the request once the budget is spent
+        reservation, refusal = self._reserve_budget(prompt, kwargs)
+        if refusal is not None:
+            return refusal
         
         # Retry loop
         last_exception = None
+        attempts = 0
         for attempt in range(self.max_retries):
+            # Wait out an open circuit, then rate limiting (both shared
+            # across all instances for this provider)
+            waited = self.circuit_breaker.wait()
+            waited += self.rate_limiter.acquire(estimated_tokens)
+            attempts += 1
             try:
                 # Make API call
                 start_time = time.time()
-                raw_response = self._make_api_call(prompt, **kwargs)
+                if stop_when is None:
+                    raw_response = self._make_api_call(prompt, **kwargs)
+                else:
+                    raw_response = self._make_streaming_call(prompt, stop_when, **kwargs)
                 latency = time.time() - start_time
                 
-                # Parse response
-                response = self._parse_response(raw_response)
-                
-                # Add latency to metadata
-                response.metadata['latency_seconds'] = latency
-                response.metadata['attempt'] = attempt + 1
-                
-                # Update tracking
-                self.request_count += 1
-                if 'tokens_used' in response.metadata:
-                    self.total_tokens += response.metadata['tokens_used']
+                response = self._record_success(
+                    raw_response, latency, attempt, log_request,
+                    estimated_tokens=estimated_tokens, rate_limit_wait=waited
+                )
+                self._settle_budget(reservation, response)
+                self._cache_store(cache_key, response)
+                return response
                 
-                if log_request:
-                    logger.info(
-                        f"✓ Success (attempt {attempt + 1}, "
-                        f"{latency:.2f}s, "
-                        f"{response.metadata.get('tokens_used', '?')} tokens)"
-                    )
+            except Exception as e:
+                last_exception = e
+                # Failed requests are not billed for tokens
+                self.rate_limiter.refund(estimated_tokens)
+                wait_time = self._backoff_after_failure(e, attempt)
+                if wait_time is None:
+                    break
+                time.sleep(wait_time)
+        
+        self._settle_budget(reservation)
+        return self._record_failure(last_exception, attempts)
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        log_request: bool = True,
+        use_cache: Optional[bool] = None,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        **kwargs
+    ) -> ModelResponse:
+        """
+        Async version of generate().
+        
+        Same retry, rate limiting and tracking behaviour, but awaits the
+        provider's async client so many requests can share one event loop.
+        
+        Args:
+            prompt: Input prompt string
+            log_request: Whether to log this request
+            use_cache: Read from the response cache (default: self.use_cache);
+                False forces a fresh sample, which still refreshes the cache
+            stop_when: Stream the response and stop as soon as this returns
+                True for a completed output line (see _make_streaming_call)
+            **kwargs: Additional parameters for API call
+            
+        Returns:
+            ModelResponse object
+        """
+        # Deterministic requests may be served from the response cache
+        # (early-stopped outputs are truncated, so they are cached separately)
+        cache_key = self._cache_key(
+            prompt, kwargs if stop_when is None else dict(kwargs, early_stop=True)
+        )
+        if cache_key is not None:
+            cached = self._cache_lookup(cache_key, use_cache, log_request)
+            if cached is not None:
+                return cached
+        
+        if log_request:
+            logger.info(f"Making request to {self.model_name}")
+            logger.debug(f"Prompt: {prompt[:100]}...")
+        
+        estimated_tokens = self.estimate_tokens(prompt)
+        
+        # Reserve worst-case usage; refuse the request once the budget is spent
+        reservation, refusal = self._reserve_budget(prompt, kwargs)
+        if refusal is not None:
+            return refusal
+        
+        # Retry loop
+        last_exception = None
+        attempts = 0
+        for attempt in range(self.max_retries):
+            # Wait out an open circuit, then rate limiting (both shared
+            # across all instances for this provider)
+            waited = await self.circuit_breaker.wait_async()
+            waited += await self.rate_limiter.acquire_async(estimated_tokens)
+            attempts += 1
+            try:
+                start_time = time.time()
+                raw_response = await self._hedged_call_async(
+                    prompt, stop_when, estimated_tokens, **kwargs
+                )
+                latency = time.time() - start_time
                 
+                response = self._record_success(
+                    raw_response, latency, attempt, log_request,
+                    estimated_tokens=estimated_tokens, rate_limit_wait=waited
+                )
+                self._settle_budget(reservation, response)
+                self._cache_store(cache_key, response)
                 return response
                 
             except Exception as e:
                 last_exception = e
-                logger.warning(
-                    f"⚠ Attempt {attempt + 1}/{self.max_retries} failed: {e}"
+                # Failed requests are not billed for tokens
+                self.rate_limiter.refund(estimated_tokens)
+                wait_time = self._backoff_after_failure(e, attempt)
+                if wait_time is None:
+                    break
+                await asyncio.sleep(wait_time)
+        
+        self._settle_budget(reservation)
+        return self._record_failure(last_exception, attempts)
+    
+    async def _hedged_call_async(
+        self,
+        prompt: str,
+        stop_when: Optional[Callable[[str], bool]],
+        estimated_tokens: int,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Make one async API call, hedging it if it runs unusually long.
+        
+        With hedging on, a call still running after this model's p95
+        latency gets a duplicate request (subject to the rate limiter and
+        to hedge_max_rate and to the run budget). Whichever finishes first
+        successfully wins and the other is cancelled; its rate limiter
+        tokens are kept and its prompt is charged to the budget, since the
+        provider may already bill for it. A loser that failed is not
+        charged.
+        
+        Args:
+            prompt: Input prompt string
+            stop_when: Early-stop callback (streamed call) or None
+            estimated_tokens: Tokens to reserve for the duplicate request
+            **kwargs: Additional parameters for API call
+            
+        Returns:
+            Dict containing raw API response
+        """
+        def _call():
+            if stop_when is None:
+                return self._make_api_call_async(prompt, **kwargs)
+            return self._make_streaming_call_async(prompt, stop_when, **kwargs)
+        
+        hedge_after = self._hedge_delay()
+        if hedge_after is None:
+            return await _call()
+        
+        primary = asyncio.ensure_future(_call())
+        tasks = [primary]
+        hedge_reservation = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done:
+                return await primary
+            allowed, hedge_reservation = self._reserve_hedge(prompt, kwargs)
+            if not allowed:
+                return await primary
+            
+            logger.info(
+                f"Hedging request to {self.model_name} after {hedge_after:.1f}s"
+            )
+            await self.rate_limiter.acquire_async(estimated_tokens)
+            if primary.done() and primary.exception() is None:
+                # Answered while the hedge waited for the rate limiter
+                self.rate_limiter.refund(estimated_tokens)
+                return primary.result()
+            hedge = asyncio.ensure_future(_call())
+            tasks.append(hedge)
+            
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff
-                    wait_time = self.rate_limit_delay * (2 ** attempt)
-                    logger.info(f"Waiting {wait_time:.1f}s before retry...")
-                    time.sleep(wait_time)
-        
-        # All retries failed
-        self.failed_requests += 1
-        error_msg = f"All {self.max_retries} attempts failed. Last error: {last_exception}"
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count_hedge(wins=1)
+                        return task.result()
+        finally:
+            cancelled = False
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    cancelled = True
+            if hedge_reservation is not None:
+                self._settle_hedge_budget(hedge_reservation, cancelled)
+        
+        # Both failed: the retry loop refunds the primary's reservation
+        self.rate_limiter.refund(estimated_tokens)
+        raise primary.exception()
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """
+        Seconds after which to hedge a call (None if hedging does not apply).
+        
+        Needs HEDGE_MIN_SAMPLES latency samples before p95 is trusted.
+        """
+        if not self.hedging:
+            return None
+        with self._counters_lock:
+            self.hedge_candidates += 1
+        if len(self.stats) < HEDGE_MIN_SAMPLES:
+            return None
+        return self.stats.percentile('latency_seconds', 95)
+    
+    def _reserve_hedge(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any]
+    ) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Count a hedge and reserve its worst-case usage against the budget.
+        
+        Returns:
+            (allowed, reservation) - whether the hedge keeps within
+            hedge_max_rate and the budget, and its budget reservation
+            (None without a budget)
+        """
+        with self._counters_lock:
+            if self.hedged_requests + 1 > self.hedge_max_rate * self.hedge_candidates:
+                return False, None
+            self.hedged_requests += 1
+        
+        if self.budget is None:
+            return True, None
+        max_tokens = kwargs.get('max_tokens', kwargs.get('max_output_tokens', self.max_tokens))
+        try:
+            # A refused hedge does not mark the budget exhausted
+            return True, self.budget.reserve(
+                self.model_name, prompt, max_tokens, optional=True
+            )
+        except BudgetExceeded:
+            with self._counters_lock:
+                self.hedged_requests -= 1
+            return False, None
+    
+    def _settle_hedge_budget(self, reservation: Dict[str, Any], cancelled: bool):
+        """
+        Settle the extra budget reservation of a hedged call.
+        
+        The winner's usage is charged against the request's own
+        reservation. The loser, if it was cancelled in flight, is charged
+        its prompt tokens; if it failed, the reservation is released.
+        """
+        if cancelled:
+            self.budget.charge(reservation, {
+                'prompt_tokens': reservation['prompt_tokens'],
+                'completion_tokens': 0,
+            })
+        else:
+            self.budget.release(reservation)
+    
+    def _count_hedge(self, wins: int = 0):
+        with self._counters_lock:
+            self.hedge_wins += wins
+    
+    async def agenerate_many(
+        self,
+        prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        log_request: bool = True,
+        stop_conditions: Optional[List[Optional[Callable[[str], bool]]]] = None,
+        on_result: Optional[Callable[[int, ModelResponse], None]] = None,
+        should_stop: Optional[Callable[[int], bool]] = None,
+        **kwargs
+    ) -> List[ModelResponse]:
+        """
+        Generate responses for many prompts with bounded concurrency.
+        
+        Args:
+            prompts: Input prompt strings
+            max_concurrency: Requests kept in flight (default: self.max_concurrency)
+            log_request: Whether to log each request
+            stop_conditions: Per-prompt stop_when callbacks for early
+                stopping (see agenerate())
+            on_result: Called as on_result(index, response) as soon as each
+                response arrives (e.g. to journal it)
+            should_stop: Called as should_stop(index) before each request
+                is sent; requests it returns True for are not sent (their
+                responses are failures with metadata['not_sent'])
+            **kwargs: Additional parameters for agenerate() (e.g. use_cache)
+            
+        Returns:
+            List of ModelResponse objects, in the same order as prompts
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.max_concurrency))
+        
+        if stop_conditions is None:
+            stop_conditions = [None] * len(prompts)
+        
+        async def _bounded(index: int, prompt: str, stop_when) -> ModelResponse:
+            async with semaphore:
+                if should_stop is not None and should_stop(index):
+                    return ModelResponse(
+                        text="",
+                        model_name=self.model_name,
+                        success=False,
+                        error="Not sent: run stopped early",
+                        metadata={'not_sent': True}
+                    )
+                response = await self.agenerate(
+                    prompt, log_request=log_request, stop_when=stop_when, **kwargs
+                )
+            if on_result is not None:
+                on_result(index, response)
+            return response
+        
+        return list(await asyncio.gather(*(
+            _bounded(i, prompt, stop)
+            for i, (prompt, stop) in enumerate(zip(prompts, stop_conditions))
+        )))
+    
+    def generate_many(
+        self,
+        prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        log_request: bool = True,
+        stop_conditions: Optional[List[Optional[Callable[[str], bool]]]] = None,
+        on_result: Optional[Callable[[int, ModelResponse], None]] = None,
+        should_stop: Optional[Callable[[int], bool]] = None,
+        **kwargs
+    ) -> List[ModelResponse]:
+        """
+        Synchronous entry point for agenerate_many().
+        
+        Runs its own event loop, so it can be called from plain scripts.
+        When a loop is already running (e.g. inside Jupyter), the work is
+        moved to a helper thread with its own loop.
+        
+        Args:
+            prompts: Input prompt strings
+            max_concurrency: Requests kept in flight (default: self.max_concurrency)
+            log_request: Whether to log each request
+            stop_conditions: Per-prompt stop_when callbacks for early
+                stopping (see agenerate())
+            on_result: Called as on_result(index, response) as each
+                response arrives
+            should_stop: Called as should_stop(index) before each request
+                is sent; requests it returns True for are not sent
+            **kwargs: Additional parameters for agenerate() (e.g. use_cache)
+            
+        Returns:
+            List of ModelResponse objects, in the same order as prompts
+        """
+        return run_coroutine(
+            self.agenerate_many(
+                prompts,
+                max_concurrency=max_concurrency,
+                log_request=log_request,
+                stop_conditions=stop_conditions,
+                on_result=on_result,
+                should_stop=should_stop,
+                **kwargs
+            )
+        )
+    
+    def _submit_batch(self, requests: List[Tuple[str, str]], **kwargs) -> str:
+        """
+        Submit prompts to the provider's asynchronous batch endpoint.
+        
+        Implemented by wrappers whose provider offers a batch API
+        (see supports_batch).
+        
+        Args:
+            requests: (custom_id, prompt) pairs
+            **kwargs: Additional provider-specific parameters
+            
+        Returns:
+            Provider batch ID
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support batch submission"
+        )
+    
+    def _poll_batch(self, batch_id: str) -> str:
+        """
+        Check a submitted batch.
+        
+        Returns:
+            'in_progress', 'completed' or 'failed'
+        """
+        raise NotImplementedError
+    
+    def _fetch_batch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Download results of a completed batch.
+        
+        Returns:
+            Mapping of custom_id to raw response dictionary (same shape as
+            _make_api_call returns). Requests that failed are omitted.
+        """
+        raise NotImplementedError
+    
+    def generate_batch(
+        self,
+        prompts: List[str],
+        poll_interval: float = BATCH_POLL_INTERVAL,
+        timeout: float = BATCH_TIMEOUT,
+        use_cache: Optional[bool] = None,
+        **kwargs
+    ) -> List[ModelResponse]:
+        """
+        Generate responses for many prompts as one provider batch job.
+        
+        Cached prompts are answered locally; the rest are submitted as a
+        single batch, polled until it finishes, and mapped back by
+        custom_id. Batch endpoints trade latency (minutes to hours) for
+        lower cost and separate, higher throughput limits.
+        
+        Args:
+            prompts: Input prompt strings
+            poll_interval: Seconds between status checks
+            timeout: Give up waiting after this many seconds
+            use_cache: Read from the response cache (default: self.use_cache)
+            **kwargs: Additional parameters for the API call
+            
+        Returns:
+            List of ModelResponse objects, in the same order as prompts
+            
+        Raises:
+            NotImplementedError: If the provider has no batch API
+        """
+        if not self.supports_batch:
+            raise NotImplementedError(
+                f"{self.__class__.__name__} does not support batch submission"
+            )
+        
+        responses: List[Optional[ModelResponse]] = [None] * len(prompts)
+        cache_keys = [self._cache_key(prompt, kwargs) for prompt in prompts]
+        
+        # Answer what we can from the cache; batch the rest (within budget)
+        pending: Dict[str, int] = {}
+        reservations: Dict[int, Optional[Dict[str, Any]]] = {}
+        for i, cache_key in enumerate(cache_keys):
+            cached = None
+            if cache_key is not None:
+                cached = self._cache_lookup(cache_key, use_cache, log_request=False)
+            if cached is not None:
+                responses[i] = cached
+                continue
+            
+            reservation, refusal = self._reserve_budget(prompts[i], kwargs, batch=True)
+            if refusal is not None:
+                responses[i] = refusal
+            else:
+                pending[f"item-{i}"] = i
+                reservations[i] = reservation
+        
+        if not pending:
+            return responses
+        
+        start_time = time.time()
+        batch_id = self._submit_batch(
+            [(custom_id, prompts[i]) for custom_id, i in pending.items()],
+            **kwargs
+        )
+        logger.info(
+            f"Submitted batch {batch_id} to {self.model_name} "
+            f"({len(pending)} requests)"
+        )
+        
+        # Poll until the batch finishes or we run out of patience
+        while True:
+            status = self._poll_batch(batch_id)
+            if status != 'in_progress':
+                break
+            if time.time() - start_time > timeout:
+                status = 'timed_out'
+                break
+            time.sleep(poll_interval)
+        
+        results = self._fetch_batch_results(batch_id) if status == 'completed' else {}
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Batch {batch_id} {status} after {elapsed:.1f}s "
+            f"({len(results)}/{len(pending)} results)"
+        )
+        
+        for custom_id, i in pending.items():
+            raw_response = results.get(custom_id)
+            if raw_response is None:
+                self._settle_budget(reservations[i])
+                self._count(failed=1)
+                responses[i] = ModelResponse(
+                    text="",
+                    model_name=self.model_name,
+                    success=False,
+                    error=f"Batch {batch_id} {status}: no result for {custom_id}",
+                    metadata={'batch_id': batch_id}
+                )
+                continue
+            
+            response = self._parse_response(raw_response)
+            response.metadata['batch_id'] = batch_id
+            response.metadata['latency_seconds'] = elapsed
+            response.metadata['attempt'] = 1
+            self._settle_budget(reservations[i], response)
+            
+            self._count(requests=1, tokens=response.metadata.get('tokens_used') or 0)
+            self.stats.record(
+                latency_seconds=elapsed,
+                attempts=1,
+                prompt_tokens=response.metadata.get('prompt_tokens'),
+                completion_tokens=response.metadata.get('completion_tokens'),
+            )
+            
+            self._cache_store(cache_keys[i], response)
+            responses[i] = response
+        
+        return responses
+    
+    def _record_success(
+        self,
+        raw_response: Dict[str, Any],
+        latency: float,
+        attempt: int,
+        log_request: bool,
+        estimated_tokens: int = 0,
+        rate_limit_wait: float = 0.0
+    ) -> ModelResponse:
+        """Parse a raw response, update request tracking and charge tokens."""
+        # Parse response
+        response = self._parse_response(raw_response)
+        
+        # Add latency to metadata
+        response.metadata['latency_seconds'] = latency
+        response.metadata['attempt'] = attempt + 1
+        response.metadata['rate_limit_wait_seconds'] = rate_limit_wait
+        for flag in ('stopped_early', 'usage_estimated'):
+            if isinstance(raw_response, dict) and raw_response.get(flag):
+                response.metadata[flag] = True
+        
+        # Update tracking
+        tokens_used = response.metadata.get('tokens_used')
+        self._count(requests=1, tokens=tokens_used or 0)
+        self.stats.record(
+            latency_seconds=latency,
+            attempts=attempt + 1,
+            prompt_tokens=response.metadata.get('prompt_tokens'),
+            completion_tokens=response.metadata.get('completion_tokens'),
+            rate_limit_wait_seconds=rate_limit_wait,
+        )
+        
+        # Charge actual usage against the provider's TPM budget
+        self.rate_limiter.charge(
+            tokens_used if tokens_used is not None else estimated_tokens,
+            estimated_tokens
+        )
+        self.circuit_breaker.record_success()
+        
+        if log_request:
+            logger.info(
+                f"✓ Success (attempt {attempt + 1}, "
+                f"{latency:.2f}s, "
+                f"{response.metadata.get('tokens_used', '?')} tokens)"
+            )
+        
+        return response
+    
+    def _cache_key(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[str]:
+        """
+        Content address of a request, or None if it must not be cached.
+        
+        Only temperature-0 requests are cached, since only those are
+        expected to be reproducible.
+        """
+        if self.response_cache is None:
+            return None
+        
+        temperature = kwargs.get('temperature', self.temperature)
+        if temperature != 0:
+            return None
+        
+        max_tokens = kwargs.get('max_tokens', kwargs.get('max_output_tokens', self.max_tokens))
+        extra_params = {
+            k: v for k, v in kwargs.items()
+            if k not in ['temperature', 'max_tokens', 'max_output_tokens']
+        }
+        return ResponseCache.make_key(
+            self.provider, self.model_name, prompt, temperature, max_tokens, extra_params
+        )
+    
+    def _cache_lookup(
+        self,
+        cache_key: str,
+        use_cache: Optional[bool],
+        log_request: bool
+    ) -> Optional[ModelResponse]:
+        """Return the cached response for a key, updating hit/miss counters."""
+        if use_cache is None:
+            use_cache = self.use_cache
+        if not use_cache:
+            return None
+        
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            self._count(cache_misses=1)
+            return None
+        
+        self._count(cache_hits=1)
+        response = ModelResponse(**cached)
+        response.metadata['cache_hit'] = True
+        if log_request:
+            logger.info(f"✓ Cache hit for {self.model_name}")
+        return response
+    
+    def _cache_store(self, cache_key: Optional[str], response: ModelResponse):
+        """Store a successful response under its cache key."""
+        if cache_key is None or not response.success:
+            return
+        self.response_cache.put(cache_key, asdict(response))
+    
+    def estimate_tokens(self, prompt: str) -> int:
+        """
+        Rough upper estimate of tokens a request will use.
+        
+        Reserved against the TPM budget before sending and corrected with
+        the provider-reported tokens_used afterwards. Our Unicode symbols
+        usually encode to more than one token each, hence ~2 chars/token.
+        
+        Args:
+            prompt: Input prompt string
+        
+        Returns:
+            Estimated prompt + completion tokens
+        """
+        return len(prompt) // 2 + self.max_tokens
+    
+    def _backoff_after_failure(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Log a failed attempt and compute the wait before the next one.
+        
+        Fatal errors (per retry_policy) end the retry loop immediately;
+        retryable ones count towards the provider's circuit breaker.
+        
+        Returns:
+            Seconds to wait, or None if the request should not be retried
+        """
+        logger.warning(
+            f"⚠ Attempt {attempt + 1}/{self.max_retries} failed: {error}"
+        )
+        
+        if not self.retry_policy.is_retryable(error):
+            logger.error(f"✗ {type(error).__name__} is not retryable; giving up")
+            return None
+        
+        self.circuit_breaker.record_failure(self.retry_policy.retry_after(error))
+        
+        if attempt >= self.max_retries - 1:
+            return None
+        
+        # Jittered exponential backoff (at least the server's Retry-After)
+        wait_time = self.retry_policy.backoff(attempt, error)
+        logger.info(f"Waiting {wait_time:.1f}s before retry...")
+        return wait_time
+    
+    def _reserve_budget(
+        self,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        batch: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[ModelResponse]]:
+        """
+        Reserve a request's worst-case usage against the run budget.
+        
+        Args:
+            prompt: Input prompt string
+            kwargs: Request parameters (for max_tokens)
+            batch: The request is sent through the batch API
+        
+        Returns:
+            (reservation, None) if the request may be sent (reservation is
+            None without a budget), or (None, refusal response) if not
+        """
+        if self.budget is None:
+            return None, None
+        
+        max_tokens = kwargs.get('max_tokens', kwargs.get('max_output_tokens', self.max_tokens))
+        try:
+            return self.budget.reserve(self.model_name, prompt, max_tokens, batch=batch), None
+        except BudgetExceeded as e:
+            logger.warning(f"⚠ Not sending request to {self.model_name}: {e}")
+            return None, ModelResponse(
+                text="",
+                model_name=self.model_name,
+                success=False,
+                error=str(e),
+                metadata={'budget_exceeded': True}
+            )
+    
+    def _settle_budget(
+        self,
+        reservation: Optional[Dict[str, Any]],
+        response: Optional[ModelResponse] = None
+    ):
+        """Charge an answered request's usage, or release a failed request's reservation."""
+        if reservation is None:
+            return
+        if response is not None:
+            self.budget.charge(reservation, response.metadata)
+        else:
+            self.budget.release(reservation)
+    
+    def _record_failure(
+        self,
+        last_exception: Optional[Exception],
+        attempts: Optional[int] = None
+    ) -> ModelResponse:
+        """Build the failure response once retrying has stopped."""
+        if attempts is None:
+            attempts = self.max_retries
+        self._count(failed=1)
+        self.stats.record(attempts=attempts)
+        if attempts < self.max_retries:
+            error_msg = f"Gave up after {attempts} attempt(s). Last error: {last_exception}"
+        else:
+            error_msg = f"All {attempts} attempts failed. Last error: {last_exception}"
         logger.error(error_msg)
         
         return ModelResponse(
@@ -202,15 +1131,38 @@ class BaseModel(ABC):
             model_name=self.model_name,
             success=False,
             error=error_msg,
-            metadata={'attempts': self.max_retries}
+            metadata={
+                'attempts': attempts,
+                'error_type': type(last_exception).__name__,
+                'retryable': self.retry_policy.is_retryable(last_exception),
+            }
         )
     
+    def _count(
+        self,
+        requests: int = 0,
+        tokens: int = 0,
+        failed: int = 0,
+        cache_hits: int = 0,
+        cache_misses: int = 0
+    ):
+        """Atomically increment request tracking counters."""
+        with self._counters_lock:
+            self.request_count += requests
+            self.total_tokens += tokens
+            self.failed_requests += failed
+            self.cache_hits += cache_hits
+            self.cache_misses += cache_misses
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get usage statistics for this model instance.
         
         Returns:
-            Dictionary with request counts, token usage, etc.
+            Dictionary with request counts, token usage, etc., plus
+            count/mean/p50/p95/p99/max per request metric (latency,
+            attempts, prompt/completion tokens, tokens per second,
+            rate-limit wait)
         """
         return {
             'model_name': self.model_name,
@@ -221,6 +1173,11 @@ class BaseModel(ABC):
                 if self.request_count > 0 else 0.0
             ),
             'total_tokens': self.total_tokens,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'hedged_requests': self.hedged_requests,
+            'hedge_wins': self.hedge_wins,
+            **self.stats.summary(),
         }
     
     def reset_stats(self):
@@ -228,4 +1185,10 @@ class BaseModel(ABC):
         self.request_count = 0
         self.total_tokens = 0
         self.failed_requests = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.hedge_candidates = 0
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self.stats.reset()
         logger.info(f"Reset statistics for {self.model_name}")
\ No newline at end of file
@@ -0,0 +1,393 @@
+"""
+Local stub of the OpenAI and Anthropic batch APIs for offline testing.
+
+Implements just enough of both providers' batch endpoints for
+GPT4Model.generate_batch() and ClaudeModel.generate_batch() to run
+end-to-end without network access or API keys:
+
+    OpenAI:    POST /v1/files, GET /v1/files/{id}/content,
+               POST /v1/batches, GET /v1/batches/{id}
+    Anthropic: POST /v1/messages/batches, GET /v1/messages/batches/{id},
+               GET /v1/messages/batches/{id}/results
+
+By default every prompt is answered by applying rotate-left to the final
+"... →" line, i.e. the stub behaves like a perfect Experiment 1 subject.
+
+Usage:
+    with BatchStubServer() as server:
+        model = GPT4Model(api_key="stub", base_url=server.openai_base_url)
+        responses = model.generate_batch(prompts, poll_interval=0.1)
+    
+    # or standalone:
+    python3 -m src.models.batch_stub_server --port 8765
+"""
+
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+
+
+def rotate_left_responder(prompt: str) -> str:
+    """Answer the final 'A B C →' line of a prompt with 'C A B'."""
+    last_line = prompt.strip().splitlines()[-1]
+    symbols = last_line.replace("→", " ").split()
+    if not symbols:
+        return ""
+    return " ".join([symbols[-1]] + symbols[:-1])
+
+
+class _StubState:
+    """Files and batches held by a running stub server."""
+    
+    def __init__(self, responder: Callable[[str], str], processing_delay: float):
+        self.responder = responder
+        self.processing_delay = processing_delay
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.lock = threading.Lock()
+    
+    def new_id(self, prefix: str) -> str:
+        return f"{prefix}_{uuid.uuid4().hex[:16]}"
+    
+    def is_done(self, batch: Dict) -> bool:
+        return time.time() - batch['created_at'] >= self.processing_delay
+    
+    def complete(self, prompt: str, max_tokens: int) -> Tuple[str, int, int]:
+        """Run the responder; return (text, prompt_tokens, completion_tokens)."""
+        text = self.responder(prompt)
+        # Crude token counts so metadata looks realistic
+        prompt_tokens = max(1, len(prompt) // 2)
+        completion_tokens = min(max_tokens, max(1, len(text) // 2))
+        return text, prompt_tokens, completion_tokens
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes requests to the OpenAI- or Anthropic-style handlers."""
+    
+    state: _StubState = None
+    
+    def log_message(self, format, *args):
+        # Keep test output quiet
+        pass
+    
+    def _send_json(self, payload: Dict, status: int = 200):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _send_text(self, text: str):
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/binary')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length)
+    
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        if path == '/v1/files':
+            return self._openai_upload_file()
+        if path == '/v1/batches':
+            return self._openai_create_batch()
+        if path == '/v1/messages/batches':
+            return self._anthropic_create_batch()
+        self._send_json({'error': {'message': f"Unknown path {path}"}}, 404)
+    
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        match = re.fullmatch(r'/v1/files/([\w-]+)/content', path)
+        if match:
+            return self._send_text(self.state.files[match.group(1)].decode('utf-8'))
+        match = re.fullmatch(r'/v1/batches/([\w-]+)', path)
+        if match:
+            return self._openai_get_batch(match.group(1))
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)/results', path)
+        if match:
+            return self._anthropic_get_results(match.group(1))
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)', path)
+        if match:
+            return self._anthropic_get_batch(match.group(1))
+        self._send_json({'error': {'message': f"Unknown path {path}"}}, 404)
+    
+    # ------------------------------------------------------------------
+    # OpenAI
+    # ------------------------------------------------------------------
+    
+    def _openai_upload_file(self):
+        # Parse multipart/form-data with the stdlib email parser
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8')
+        message = BytesParser(policy=HTTP).parsebytes(header + self._read_body())
+        content = b""
+        filename = "upload.jsonl"
+        for part in message.iter_parts():
+            if part.get_param('name', header='content-disposition') == 'file':
+                content = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+        
+        file_id = self.state.new_id('file')
+        with self.state.lock:
+            self.state.files[file_id] = content
+        self._send_json(self._openai_file_object(file_id, filename, len(content), 'batch'))
+    
+    @staticmethod
+    def _openai_file_object(file_id: str, filename: str, size: int, purpose: str) -> Dict:
+        return {
+            'id': file_id,
+            'object': 'file',
+            'bytes': size,
+            'created_at': int(time.time()),
+            'filename': filename,
+            'purpose': purpose,
+            'status': 'processed',
+        }
+    
+    def _openai_create_batch(self):
+        request = json.loads(self._read_body())
+        batch_id = self.state.new_id('batch')
+        batch = {
+            'id': batch_id,
+            'object': 'batch',
+            'endpoint': request['endpoint'],
+            'input_file_id': request['input_file_id'],
+            'completion_window': request['completion_window'],
+            'status': 'in_progress',
+            'created_at': time.time(),
+            'output_file_id': None,
+        }
+        with self.state.lock:
+            self.state.batches[batch_id] = batch
+        self._send_json(self._openai_batch_object(batch))
+    
+    def _openai_get_batch(self, batch_id: str):
+        with self.state.lock:
+            batch = self.state.batches[batch_id]
+            if batch['status'] == 'in_progress' and self.state.is_done(batch):
+                self._openai_run_batch(batch)
+        self._send_json(self._openai_batch_object(batch))
+    
+    def _openai_run_batch(self, batch: Dict):
+        """Answer every request in the batch's input file. Caller holds lock."""
+        output_lines = []
+        for line in self.state.files[batch['input_file_id']].decode('utf-8').splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request['body']
+            prompt = body['messages'][-1]['content']
+            text, prompt_tokens, completion_tokens = self.state.complete(
+                prompt, body.get('max_tokens', 150)
+            )
+            output_lines.append(json.dumps({
+                'id': self.state.new_id('batch_req'),
+                'custom_id': request['custom_id'],
+                'response': {
+                    'status_code': 200,
+                    'request_id': self.state.new_id('req'),
+                    'body': {
+                        'id': self.state.new_id('chatcmpl'),
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': body['model'],
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': text},
+                            'finish_reason': 'stop',
+                        }],
+                        'usage': {
+                            'prompt_tokens': prompt_tokens,
+                            'completion_tokens': completion_tokens,
+                            'total_tokens': prompt_tokens + completion_tokens,
+                        },
+                    },
+                },
+                'error': None,
+            }, ensure_ascii=False))
+        
+        output_id = self.state.new_id('file')
+        self.state.files[output_id] = "\n".join(output_lines).encode('utf-8')
+        batch['output_file_id'] = output_id
+        batch['status'] = 'completed'
+    
+    @staticmethod
+    def _openai_batch_object(batch: Dict) -> Dict:
+        payload = dict(batch)
+        payload['created_at'] = int(batch['created_at'])
+        return payload
+    
+    # ------------------------------------------------------------------
+    # Anthropic
+    # ------------------------------------------------------------------
+    
+    def _anthropic_create_batch(self):
+        request = json.loads(self._read_body())
+        batch_id = self.state.new_id('msgbatch')
+        batch = {
+            'id': batch_id,
+            'requests': request['requests'],
+            'created_at': time.time(),
+            'results': None,
+        }
+        with self.state.lock:
+            self.state.batches[batch_id] = batch
+        self._send_json(self._anthropic_batch_object(batch))
+    
+    def _anthropic_get_batch(self, batch_id: str):
+        with self.state.lock:
+            batch = self.state.batches[batch_id]
+            if batch['results'] is None and self.state.is_done(batch):
+                self._anthropic_run_batch(batch)
+        self._send_json(self._anthropic_batch_object(batch))
+    
+    def _anthropic_run_batch(self, batch: Dict):
+        """Answer every request in the batch. Caller holds lock."""
+        results = []
+        for request in batch['requests']:
+            params = request['params']
+            content = params['messages'][-1]['content']
+            if isinstance(content, list):
+                content = "".join(block.get('text', '') for block in content)
+            text, input_tokens, output_tokens = self.state.complete(
+                content, params.get('max_tokens', 150)
+            )
+            results.append(json.dumps({
+                'custom_id': request['custom_id'],
+                'result': {
+                    'type': 'succeeded',
+                    'message': {
+                        'id': self.state.new_id('msg'),
+                        'type': 'message',
+                        'role': 'assistant',
+                        'model': params['model'],
+                        'content': [{'type': 'text', 'text': text}],
+                        'stop_reason': 'end_turn',
+                        'stop_sequence': None,
+                        'usage': {
+                            'input_tokens': input_tokens,
+                            'output_tokens': output_tokens,
+                        },
+                    },
+                },
+            }, ensure_ascii=False))
+        batch['results'] = "\n".join(results)
+    
+    def _anthropic_get_results(self, batch_id: str):
+        with self.state.lock:
+            results = self.state.batches[batch_id]['results']
+        if results is None:
+            return self._send_json({'error': {'message': "Batch still processing"}}, 409)
+        self._send_text(results)
+    
+    def _anthropic_batch_object(self, batch: Dict) -> Dict:
+        ended = batch['results'] is not None
+        host = f"http://{self.headers.get('Host', 'localhost')}"
+        return {
+            'id': batch['id'],
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': {
+                'processing': 0 if ended else len(batch['requests']),
+                'succeeded': len(batch['requests']) if ended else 0,
+                'errored': 0,
+                'canceled': 0,
+                'expired': 0,
+            },
+            'results_url': (
+                f"{host}/v1/messages/batches/{batch['id']}/results" if ended else None
+            ),
+        }
+
+
+class BatchStubServer:
+    """
+    In-process HTTP server speaking the OpenAI and Anthropic batch APIs.
+    
+    Runs on a background thread; use as a context manager or call
+    start()/stop() explicitly.
+    """
+    
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        responder: Optional[Callable[[str], str]] = None,
+        processing_delay: float = 0.0,
+    ):
+        """
+        Initialize stub server.
+        
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            responder: Function mapping prompt to response text
+                (default: rotate_left_responder)
+            processing_delay: Seconds before a batch reports completion
+        """
+        state = _StubState(responder or rotate_left_responder, processing_delay)
+        handler = type('BoundStubHandler', (_StubHandler,), {'state': state})
+        self.state = state
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    @property
+    def openai_base_url(self) -> str:
+        """Base URL for openai.OpenAI(base_url=...)."""
+        return f"{self.url}/v1"
+    
+    @property
+    def anthropic_base_url(self) -> str:
+        """Base URL for anthropic.Anthropic(base_url=...)."""
+        return self.url
+    
+    def start(self) -> 'BatchStubServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self) -> 'BatchStubServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the batch API stub server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Seconds before each batch completes')
+    args = parser.parse_args()
+    
+    server = BatchStubServer(args.host, args.port, processing_delay=args.delay)
+    print(f"Batch stub server listening on {server.url}")
+    print(f"  OPENAI_BASE_URL={server.openai_base_url}")
+    print(f"  ANTHROPIC_BASE_URL={server.anthropic_base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,336 @@
+"""
+Token and cost budgets for experiment runs.
+
+A Budget is shared by the models of a run (pass budget=... to each
+model). Before each request BaseModel reserves the request's worst-case
+cost - estimated prompt tokens plus max_tokens of completion - and once
+a cap would be exceeded it stops sending requests. Actual usage from
+response metadata then replaces the reservation, priced with the
+model's prompt-cache and batch rates where MODEL_PRICING declares them.
+
+Prompt tokens are estimated from the rendered prompt with a
+characters-per-token ratio calibrated on the prompt_tokens recorded in
+saved results, since our symbol prompts tokenize very differently from
+English text.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+import logging
+import threading
+
+from src.config import (
+    RESULTS_DIR,
+    MODEL_PRICING,
+    BUDGET_MAX_COST_USD,
+    BUDGET_MAX_TOKENS,
+)
+from src.result_io import iter_responses, read_header, result_files
+
+logger = logging.getLogger(__name__)
+
+# Fallback when a model has no recorded prompts (matches BaseModel.estimate_tokens)
+DEFAULT_CHARS_PER_TOKEN = 2.0
+
+
+class TokenEstimator:
+    """
+    Estimates prompt tokens from prompt text, per model.
+    
+    The characters-per-token ratio of each model is calibrated from saved
+    ExperimentResult files: total prompt characters over total reported
+    prompt_tokens, for responses that stored their prompt.
+    """
+    
+    def __init__(self, chars_per_token: Optional[Dict[str, float]] = None):
+        """
+        Initialize estimator.
+        
+        Args:
+            chars_per_token: Calibrated ratio per model name
+        """
+        self.chars_per_token = dict(chars_per_token or {})
+    
+    @classmethod
+    def from_results(cls, results_dir: Path = RESULTS_DIR / "raw") -> 'TokenEstimator':
+        """
+        Calibrate on saved results.
+        
+        Args:
+            results_dir: Directory containing ExperimentResult JSON files
+        
+        Returns:
+            Calibrated TokenEstimator
+        """
+        chars: Dict[str, int] = {}
+        tokens: Dict[str, int] = {}
+        for filepath in result_files(results_dir):
+            try:
+                model_name = read_header(filepath).get('model_name')
+            except (OSError, ValueError):
+                continue
+            
+            for response in iter_responses(filepath):
+                prompt_tokens = (response.get('model_metadata') or {}).get('prompt_tokens')
+                if not response.get('prompt') or not prompt_tokens:
+                    continue
+                chars[model_name] = chars.get(model_name, 0) + len(response['prompt'])
+                tokens[model_name] = tokens.get(model_name, 0) + prompt_tokens
+        
+        return cls({name: chars[name] / tokens[name] for name in tokens})
+    
+    def estimate(self, model_name: str, prompt: str) -> int:
+        """Estimated prompt tokens for a prompt sent to a model."""
+        ratio = self.chars_per_token.get(model_name, DEFAULT_CHARS_PER_TOKEN)
+        return int(len(prompt) / ratio) + 1
+
+
+class BudgetExceeded(Exception):
+    """Raised when a request would exceed the run budget."""
+    pass
+
+
+class Budget:
+    """
+    Thread-safe token and cost budget.
+    
+    Usage:
+        reservation = budget.reserve(model_name, prompt, max_tokens)  # or raise
+        budget.charge(reservation, response.metadata)   # on success
+        budget.release(reservation)                     # on failure
+    """
+    
+    def __init__(
+        self,
+        max_cost_usd: Optional[float] = BUDGET_MAX_COST_USD,
+        max_tokens: Optional[int] = BUDGET_MAX_TOKENS,
+        pricing: Dict[str, Dict[str, float]] = MODEL_PRICING,
+        estimator: Optional[TokenEstimator] = None,
+    ):
+        """
+        Initialize budget.
+        
+        Args:
+            max_cost_usd: Cost cap in USD (None for no cap)
+            max_tokens: Token cap, prompt + completion (None for no cap)
+            pricing: USD per 1M input/output tokens, by model name
+            estimator: Prompt token estimator (default: calibrated on
+                saved results on first use)
+        """
+        self.max_cost_usd = max_cost_usd
+        self.max_tokens = max_tokens
+        self.pricing = pricing
+        self._estimator = estimator
+        
+        self.spent_usd = 0.0
+        self.spent_tokens = 0
+        self.reserved_usd = 0.0
+        self.reserved_tokens = 0
+        self.refused_requests = 0
+        self._lock = threading.Lock()
+        self._unpriced_models = set()
+    
+    @property
+    def estimator(self) -> TokenEstimator:
+        if self._estimator is None:
+            self._estimator = TokenEstimator.from_results()
+        return self._estimator
+    
+    def cost(
+        self,
+        model_name: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_prompt_tokens: int = 0,
+        cache_creation_tokens: int = 0,
+        batch: bool = False
+    ) -> float:
+        """
+        Cost in USD of a request (0 for models without pricing).
+        
+        Args:
+            model_name: Model identifier
+            prompt_tokens: Input tokens, including cached ones
+            completion_tokens: Output tokens
+            cached_prompt_tokens: Input tokens read from the prompt cache
+            cache_creation_tokens: Input tokens written to the prompt cache
+            batch: Request was sent through the batch API
+        
+        Returns:
+            Cost in USD
+        """
+        prices = self.pricing.get(model_name)
+        if prices is None:
+            if model_name not in self._unpriced_models:
+                self._unpriced_models.add(model_name)
+                logger.warning(f"⚠ No pricing for {model_name}; budgeting tokens only")
+            return 0.0
+        uncached_tokens = prompt_tokens - cached_prompt_tokens - cache_creation_tokens
+        cost = (
+            uncached_tokens * prices['input']
+            + cached_prompt_tokens * prices.get('cache_read', prices['input'])
+            + cache_creation_tokens * prices.get('cache_write', prices['input'])
+            + completion_tokens * prices['output']
+        ) / 1e6
+        return cost * prices.get('batch', 1.0) if batch else cost
+    
+    def estimate(
+        self,
+        model_name: str,
+        prompts: Iterable[str],
+        max_completion_tokens: int,
+        batch: bool = False
+    ) -> Dict[str, float]:
+        """
+        Worst-case usage of sending prompts to a model.
+        
+        Prompt-cache hits are not known in advance, so all prompt tokens
+        are priced at the full input rate; cache reads only lower the
+        actual cost.
+        
+        Args:
+            model_name: Model identifier
+            prompts: Rendered prompts
+            max_completion_tokens: max_tokens per request
+            batch: Prompts are sent through the batch API
+        
+        Returns:
+            Dictionary with n_requests, prompt_tokens, completion_tokens
+            (upper bound) and cost_usd
+        """
+        prompts = list(prompts)
+        prompt_tokens = sum(self.estimator.estimate(model_name, p) for p in prompts)
+        completion_tokens = max_completion_tokens * len(prompts)
+        return {
+            'n_requests': len(prompts),
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cost_usd': self.cost(model_name, prompt_tokens, completion_tokens, batch=batch),
+        }
+    
+    def reserve(
+        self,
+        model_name: str,
+        prompt: str,
+        max_completion_tokens: int,
+        optional: bool = False,
+        batch: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Reserve a request's worst-case usage.
+        
+        Args:
+            model_name: Model identifier
+            prompt: Rendered prompt
+            max_completion_tokens: max_tokens of the request
+            optional: The request can be skipped (e.g. a hedge), so a
+                refusal does not count towards refused_requests
+            batch: The request is sent through the batch API
+        
+        Returns:
+            Reservation to pass to charge() or release()
+        
+        Raises:
+            BudgetExceeded: If the reservation would exceed a cap
+        """
+        prompt_tokens = self.estimator.estimate(model_name, prompt)
+        tokens = prompt_tokens + max_completion_tokens
+        cost = self.cost(model_name, prompt_tokens, max_completion_tokens, batch=batch)
+        
+        with self._lock:
+            if (self.max_tokens is not None and
+                    self.spent_tokens + self.reserved_tokens + tokens > self.max_tokens):
+                self.refused_requests += 0 if optional else 1
+                raise BudgetExceeded(
+                    f"Token budget exhausted ({self.spent_tokens:,} of "
+                    f"{self.max_tokens:,} tokens used)"
+                )
+            if (self.max_cost_usd is not None and
+                    self.spent_usd + self.reserved_usd + cost > self.max_cost_usd):
+                self.refused_requests += 0 if optional else 1
+                raise BudgetExceeded(
+                    f"Cost budget exhausted (${self.spent_usd:.2f} of "
+                    f"${self.max_cost_usd:.2f} spent)"
+                )
+            self.reserved_tokens += tokens
+            self.reserved_usd += cost
+        
+        return {
+            'model_name': model_name,
+            'prompt_tokens': prompt_tokens,
+            'tokens': tokens,
+            'cost_usd': cost,
+            'batch': batch,
+        }
+    
+    def release(self, reservation: Dict[str, Any]):
+        """Drop a reservation for a request that was not billed."""
+        with self._lock:
+            self.reserved_tokens -= reservation['tokens']
+            self.reserved_usd -= reservation['cost_usd']
+    
+    def charge(self, reservation: Dict[str, Any], metadata: Dict[str, Any]):
+        """
+        Replace a reservation with the actual usage of a response.
+        
+        Args:
+            reservation: Result of reserve()
+            metadata: Response metadata (prompt_tokens, completion_tokens,
+                and cached_prompt_tokens / cache_creation_tokens if reported)
+        """
+        prompt_tokens = metadata.get('prompt_tokens')
+        completion_tokens = metadata.get('completion_tokens')
+        if prompt_tokens is None or completion_tokens is None:
+            # No usage reported: assume the worst case we reserved
+            tokens, cost = reservation['tokens'], reservation['cost_usd']
+        else:
+            tokens = prompt_tokens + completion_tokens
+            cost = self.cost(
+                reservation['model_name'], prompt_tokens, completion_tokens,
+                cached_prompt_tokens=metadata.get('cached_prompt_tokens') or 0,
+                cache_creation_tokens=metadata.get('cache_creation_tokens') or 0,
+                batch=reservation.get('batch', False),
+            )
+        
+        with self._lock:
+            self.reserved_tokens -= reservation['tokens']
+            self.reserved_usd -= reservation['cost_usd']
+            self.spent_tokens += tokens
+            self.spent_usd += cost
+    
+    @property
+    def exhausted(self) -> bool:
+        """Whether any request has been refused for lack of budget."""
+        with self._lock:
+            return self.refused_requests > 0
+    
+    def remaining(self) -> Dict[str, Optional[float]]:
+        """Unspent, unreserved budget (None for uncapped dimensions)."""
+        with self._lock:
+            return {
+                'cost_usd': (self.max_cost_usd - self.spent_usd - self.reserved_usd
+                             if self.max_cost_usd is not None else None),
+                'tokens': (self.max_tokens - self.spent_tokens - self.reserved_tokens
+                           if self.max_tokens is not None else None),
+            }
+    
+    def summary(self) -> Dict[str, Any]:
+        """Caps, spend and refusals (for result metadata)."""
+        with self._lock:
+            return {
+                'max_cost_usd': self.max_cost_usd,
+                'max_tokens': self.max_tokens,
+                'spent_usd': self.spent_usd,
+                'spent_tokens': self.spent_tokens,
+                'refused_requests': self.refused_requests,
+            }
+
+
+def format_estimate(estimate: Dict[str, float]) -> str:
+    """One-line description of a Budget.estimate() result."""
+    return (
+        f"{estimate['n_requests']} requests, "
+        f"~{estimate['prompt_tokens']:,} prompt + "
+        f"≤{estimate['completion_tokens']:,} completion tokens, "
+        f"≤${estimate['cost_usd']:.2f}"
+    )
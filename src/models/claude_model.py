@@ -4,8 +4,10 @@ Claude model wrapper using Anthropic API.
 Implements BaseModel interface for Claude interactions.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import json
 import anthropic
+import httpx
 
 from src.models.base_model import BaseModel, ModelResponse
 from src.config import (
@@ -13,6 +15,7 @@ from src.config import (
     CLAUDE_MODEL,
     MODEL_TEMPERATURE,
     MAX_TOKENS,
+    REQUEST_TIMEOUT,
 )
 
 
@@ -24,12 +27,33 @@ class ClaudeModel(BaseModel):
     to Anthropic's API.
     """
     
+    provider = "anthropic"
+    supports_batch = True
+    
+    retryable_errors = (
+        anthropic.APIConnectionError,  # includes APITimeoutError
+        anthropic.RateLimitError,
+        anthropic.InternalServerError,
+    )
+    fatal_errors = (
+        anthropic.AuthenticationError,
+        anthropic.PermissionDeniedError,
+        anthropic.BadRequestError,
+        anthropic.NotFoundError,
+        anthropic.UnprocessableEntityError,
+    )
+    
+    # Message Batches is a beta API not yet wrapped by our pinned SDK
+    BATCH_BETA = "message-batches-2024-09-24"
+    API_VERSION = "2023-06-01"
+    
     def __init__(
         self,
         model_name: str = CLAUDE_MODEL,
         api_key: str = ANTHROPIC_API_KEY,
         temperature: float = MODEL_TEMPERATURE,
         max_tokens: int = MAX_TOKENS,
+        base_url: Optional[str] = None,
         **kwargs
     ):
         """
@@ -40,6 +64,7 @@ class ClaudeModel(BaseModel):
             api_key: Anthropic API key
             temperature: Sampling temperature
             max_tokens: Maximum response tokens
+            base_url: API base URL (default: SDK default / ANTHROPIC_BASE_URL)
             **kwargs: Additional parameters passed to BaseModel
         """
         super().__init__(
@@ -51,7 +76,8 @@ class ClaudeModel(BaseModel):
         )
         
         # Initialize Anthropic client
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.base_url = base_url
+        self.client = anthropic.Anthropic(api_key=self.api_key, base_url=base_url)
     
     def _make_api_call(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
@@ -64,26 +90,188 @@ class ClaudeModel(BaseModel):
         Returns:
             Raw API response as dictionary
         """
-        # Override defaults with kwargs
+        # Make API call
+        response = self._messages_api(self.client).create(
+            **self._build_request(prompt, **kwargs)
+        )
+        
+        return self._response_to_dict(response)
+    
+    def _create_async_client(self) -> anthropic.AsyncAnthropic:
+        """Create Anthropic async client for the running event loop."""
+        return anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+    
+    async def _make_api_call_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Make API call to Anthropic using the async client.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional Anthropic API parameters
+            
+        Returns:
+            Raw API response as dictionary
+        """
+        response = await self._messages_api(self._get_async_client()).create(
+            **self._build_request(prompt, **kwargs)
+        )
+        
+        return self._response_to_dict(response)
+    
+    def _make_streaming_call(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Stream a message, closing the stream once the answer is complete.
+        
+        Args:
+            prompt: Input prompt
+            stop_when: Returns True for an output line that completes the answer
+            **kwargs: Additional Anthropic API parameters
+            
+        Returns:
+            Raw API response as dictionary (same shape as _make_api_call)
+        """
+        stream = self._messages_api(self.client).create(
+            stream=True, **self._build_request(prompt, **kwargs)
+        )
+        
+        text, message, stopped_early = "", {}, False
+        try:
+            for event in stream:
+                delta = self._read_event(event, message)
+                text += delta
+                if self._stream_should_stop(text, delta, stop_when):
+                    stopped_early = True
+                    break
+        finally:
+            stream.close()
+        
+        return self._stream_to_dict(prompt, text, message, stopped_early)
+    
+    async def _make_streaming_call_async(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async version of _make_streaming_call()."""
+        stream = await self._messages_api(self._get_async_client()).create(
+            stream=True, **self._build_request(prompt, **kwargs)
+        )
+        
+        text, message, stopped_early = "", {}, False
+        try:
+            async for event in stream:
+                delta = self._read_event(event, message)
+                text += delta
+                if self._stream_should_stop(text, delta, stop_when):
+                    stopped_early = True
+                    break
+        finally:
+            await stream.close()
+        
+        return self._stream_to_dict(prompt, text, message, stopped_early)
+    
+    @staticmethod
+    def _read_event(event, message: Dict[str, Any]) -> str:
+        """Record a stream event's message fields and usage; return its text delta."""
+        if event.type == 'message_start':
+            message['id'] = event.message.id
+            message['model'] = event.message.model
+            message['usage'] = ClaudeModel._response_to_dict(event.message)['usage']
+        elif event.type == 'message_delta':
+            message['stop_reason'] = event.delta.stop_reason
+            message['output_tokens'] = event.usage.output_tokens
+        elif event.type == 'content_block_delta' and event.delta.type == 'text_delta':
+            return event.delta.text
+        return ""
+    
+    def _stream_to_dict(
+        self,
+        prompt: str,
+        text: str,
+        message: Dict[str, Any],
+        stopped_early: bool
+    ) -> Dict[str, Any]:
+        """Assemble streamed events into the non-streaming response shape."""
+        usage = dict(message.get('usage') or {})
+        usage_estimated = 'output_tokens' not in message
+        if usage_estimated:
+            # Input usage arrives up front; output tokens only at the end
+            prompt_tokens, completion_tokens = self._estimate_usage(prompt, text)
+            usage.setdefault('input_tokens', prompt_tokens)
+            usage['output_tokens'] = completion_tokens
+        else:
+            usage['output_tokens'] = message['output_tokens']
+        
+        return {
+            'id': message.get('id'),
+            'type': 'message',
+            'role': 'assistant',
+            'content': [anthropic.types.TextBlock(type='text', text=text)],
+            'model': message.get('model', self.model_name),
+            'stop_reason': 'early_stop' if stopped_early else message.get('stop_reason'),
+            'usage': usage,
+            'stopped_early': stopped_early,
+            'usage_estimated': usage_estimated,
+        }
+    
+    def _messages_api(self, client):
+        """Messages resource to call (prompt caching is a beta endpoint in our SDK)."""
+        if self.prompt_caching:
+            return client.beta.prompt_caching.messages
+        return client.messages
+    
+    def _build_request(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Build Messages API parameters, overriding defaults with kwargs.
+        
+        With prompt caching on, the shared training block is sent as its
+        own content block marked cache_control=ephemeral, so later items
+        in the same condition read it from Anthropic's prompt cache.
+        Prefixes below the model's minimum cacheable length are simply
+        not cached by the API.
+        """
         temperature = kwargs.get('temperature', self.temperature)
         max_tokens = kwargs.get('max_tokens', self.max_tokens)
         
-        # Make API call
-        response = self.client.messages.create(
-            model=self.model_name,
-            messages=[
+        content = prompt
+        if self.prompt_caching:
+            prefix, suffix = self.split_prompt(prompt)
+            if prefix:
+                content = [
+                    {
+                        "type": "text",
+                        "text": prefix,
+                        "cache_control": {"type": "ephemeral"}
+                    },
+                    {
+                        "type": "text",
+                        "text": suffix
+                    }
+                ]
+        
+        return {
+            'model': self.model_name,
+            'messages': [
                 {
                     "role": "user",
-                    "content": prompt
+                    "content": content
                 }
             ],
-            temperature=temperature,
-            max_tokens=max_tokens,
+            'temperature': temperature,
+            'max_tokens': max_tokens,
             **{k: v for k, v in kwargs.items() 
                if k not in ['temperature', 'max_tokens']}
-        )
-        
-        # Convert to dictionary for consistent handling
+        }
+    
+    @staticmethod
+    def _response_to_dict(response) -> Dict[str, Any]:
+        """Convert an Anthropic Message to a dictionary for consistent handling."""
         return {
             'id': response.id,
             'type': response.type,
@@ -94,9 +282,105 @@ class ClaudeModel(BaseModel):
             'usage': {
                 'input_tokens': response.usage.input_tokens,
                 'output_tokens': response.usage.output_tokens,
+                'cache_creation_input_tokens': getattr(
+                    response.usage, 'cache_creation_input_tokens', None) or 0,
+                'cache_read_input_tokens': getattr(
+                    response.usage, 'cache_read_input_tokens', None) or 0,
             }
         }
     
+    def _batch_request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Call the Message Batches API with auth and beta headers."""
+        headers = {
+            'x-api-key': self.api_key,
+            'anthropic-version': self.API_VERSION,
+            'anthropic-beta': self.BATCH_BETA,
+        }
+        if not url.startswith('http'):
+            url = f"{str(self.client.base_url).rstrip('/')}/v1/messages/batches{url}"
+        response = httpx.request(method, url, headers=headers, timeout=REQUEST_TIMEOUT, **kwargs)
+        response.raise_for_status()
+        return response
+    
+    def _submit_batch(self, requests: List[Tuple[str, str]], **kwargs) -> str:
+        """
+        Submit prompts to the Anthropic Message Batches API.
+        
+        Args:
+            requests: (custom_id, prompt) pairs
+            **kwargs: Additional Anthropic API parameters
+            
+        Returns:
+            Anthropic batch ID
+        """
+        temperature = kwargs.get('temperature', self.temperature)
+        max_tokens = kwargs.get('max_tokens', self.max_tokens)
+        extra = {k: v for k, v in kwargs.items() 
+                 if k not in ['temperature', 'max_tokens']}
+        
+        body = {
+            'requests': [
+                {
+                    'custom_id': custom_id,
+                    'params': {
+                        'model': self.model_name,
+                        'messages': [{"role": "user", "content": prompt}],
+                        'temperature': temperature,
+                        'max_tokens': max_tokens,
+                        **extra,
+                    },
+                }
+                for custom_id, prompt in requests
+            ]
+        }
+        return self._batch_request('POST', '', json=body).json()['id']
+    
+    def _poll_batch(self, batch_id: str) -> str:
+        """Map Anthropic processing_status to 'in_progress'/'completed'."""
+        batch = self._batch_request('GET', f"/{batch_id}").json()
+        return 'completed' if batch['processing_status'] == 'ended' else 'in_progress'
+    
+    def _fetch_batch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Download results of an ended Anthropic batch.
+        
+        Returns:
+            Mapping of custom_id to message dictionary (as _make_api_call)
+        """
+        batch = self._batch_request('GET', f"/{batch_id}").json()
+        results_url = batch.get('results_url') or f"/{batch_id}/results"
+        
+        results = {}
+        for line in self._batch_request('GET', results_url).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            result = record.get('result') or {}
+            if result.get('type') != 'succeeded':
+                continue
+            message = result['message']
+            results[record['custom_id']] = {
+                'id': message['id'],
+                'type': message['type'],
+                'role': message['role'],
+                'content': [
+                    anthropic.types.TextBlock(**block)
+                    for block in message['content'] if block.get('type') == 'text'
+                ],
+                'model': message['model'],
+                'stop_reason': message['stop_reason'],
+                'usage': {
+                    'input_tokens': message['usage']['input_tokens'],
+                    'output_tokens': message['usage']['output_tokens'],
+                    'cache_creation_input_tokens': (
+                        message['usage'].get('cache_creation_input_tokens') or 0),
+                    'cache_read_input_tokens': (
+                        message['usage'].get('cache_read_input_tokens') or 0),
+                }
+            }
+        
+        return results
+    
     def _parse_response(self, raw_response: Dict[str, Any]) -> ModelResponse:
         """
         Parse Anthropic API response.
@@ -113,14 +397,19 @@ class ClaudeModel(BaseModel):
             text = raw_response['content'][0].text if raw_response['content'] else ""
             
             # Extract metadata
+            # (input_tokens excludes tokens written to or read from the
+            # prompt cache, so add them back for the full prompt size)
+            usage = raw_response['usage']
+            cache_write = usage.get('cache_creation_input_tokens', 0)
+            cache_read = usage.get('cache_read_input_tokens', 0)
+            prompt_tokens = usage['input_tokens'] + cache_write + cache_read
             metadata = {
                 'stop_reason': raw_response['stop_reason'],
-                'tokens_used': (
-                    raw_response['usage']['input_tokens'] + 
-                    raw_response['usage']['output_tokens']
-                ),
-                'prompt_tokens': raw_response['usage']['input_tokens'],
-                'completion_tokens': raw_response['usage']['output_tokens'],
+                'tokens_used': prompt_tokens + usage['output_tokens'],
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': usage['output_tokens'],
+                'cached_prompt_tokens': cache_read,
+                'cache_creation_tokens': cache_write,
                 'model': raw_response['model'],
             }
             
@@ -4,8 +4,13 @@ Gemini model wrapper using Google Generative AI API.
 Implements BaseModel interface for Gemini interactions.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, Tuple
+import asyncio
+import datetime
+import threading
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from google.auth import exceptions as google_auth_exceptions
 
 from src.models.base_model import BaseModel, ModelResponse
 from src.config import (
@@ -13,6 +18,8 @@ from src.config import (
     GEMINI_MODEL,
     MODEL_TEMPERATURE,
     MAX_TOKENS,
+    GEMINI_CONTEXT_CACHE_MIN_TOKENS,
+    GEMINI_CONTEXT_CACHE_TTL,
 )
 
 
@@ -24,6 +31,27 @@ class GeminiModel(BaseModel):
     to Google's Generative AI API.
     """
     
+    provider = "google"
+    
+    # Event loop the SDK's shared async client is bound to (see
+    # _sdk_async_available)
+    _sdk_async_loop: Optional[asyncio.AbstractEventLoop] = None
+    _sdk_async_loop_lock = threading.Lock()
+    
+    retryable_errors = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.ServerError,
+        google_exceptions.DeadlineExceeded,
+    )
+    fatal_errors = (
+        google_exceptions.Unauthenticated,
+        google_exceptions.PermissionDenied,
+        google_exceptions.InvalidArgument,
+        google_exceptions.NotFound,
+        google_auth_exceptions.DefaultCredentialsError,
+    )
+    
     def __init__(
         self,
         model_name: str = GEMINI_MODEL,
@@ -55,6 +83,10 @@ class GeminiModel(BaseModel):
         
         # Initialize model
         self.model = genai.GenerativeModel(self.model_name)
+        
+        # Context caches for long shared prompt prefixes, keyed by prefix
+        self._context_caches: Dict[str, genai.caching.CachedContent] = {}
+        self._context_caches_lock = threading.Lock()
     
     def _make_api_call(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
@@ -67,25 +99,226 @@ class GeminiModel(BaseModel):
         Returns:
             Raw API response as dictionary
         """
-        # Override defaults with kwargs
+        # Use a context-cached model for long shared prefixes
+        model, contents = self._with_context_cache(self.model, prompt)
+        
+        # Make API call
+        response = model.generate_content(
+            contents,
+            generation_config=self._generation_config(**kwargs)
+        )
+        
+        return self._response_to_dict(response)
+    
+    @classmethod
+    def _sdk_async_available(cls) -> bool:
+        """
+        Check whether generate_content_async() can run on the current loop.
+        
+        The SDK creates one gRPC async client per process, on the event
+        loop of the first async call, and gRPC channels cannot be reused
+        across event loops. Only that loop uses the SDK's async API;
+        calls on later loops (e.g. a second generate_many()) run the
+        synchronous call in a worker thread instead.
+        """
+        loop = asyncio.get_running_loop()
+        with cls._sdk_async_loop_lock:
+            if cls._sdk_async_loop is None:
+                cls._sdk_async_loop = loop
+            return cls._sdk_async_loop is loop
+    
+    async def _make_api_call_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Make API call to Google Generative AI using the async client.
+        
+        Falls back to the synchronous call in a worker thread when the
+        SDK's async client is bound to another event loop.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional Google API parameters
+            
+        Returns:
+            Raw API response as dictionary
+        """
+        if not self._sdk_async_available():
+            return await asyncio.to_thread(self._make_api_call, prompt, **kwargs)
+        
+        model, contents = await asyncio.to_thread(
+            self._with_context_cache, self.model, prompt
+        )
+        
+        response = await model.generate_content_async(
+            contents,
+            generation_config=self._generation_config(**kwargs)
+        )
+        
+        return self._response_to_dict(response)
+    
+    def _make_streaming_call(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Stream a response, abandoning the stream once the answer is complete.
+        
+        Args:
+            prompt: Input prompt
+            stop_when: Returns True for an output line that completes the answer
+            **kwargs: Additional Google API parameters
+            
+        Returns:
+            Raw API response as dictionary (same shape as _make_api_call)
+        """
+        model, contents = self._with_context_cache(self.model, prompt)
+        response = model.generate_content(
+            contents,
+            generation_config=self._generation_config(**kwargs),
+            stream=True
+        )
+        
+        text = ""
+        for chunk in response:
+            delta = self._chunk_text(chunk)
+            text += delta
+            if self._stream_should_stop(text, delta, stop_when):
+                return self._early_stop_to_dict(prompt, text)
+        
+        return self._response_to_dict(response)
+    
+    async def _make_streaming_call_async(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async version of _make_streaming_call()."""
+        if not self._sdk_async_available():
+            return await asyncio.to_thread(
+                self._make_streaming_call, prompt, stop_when, **kwargs
+            )
+        
+        model, contents = await asyncio.to_thread(
+            self._with_context_cache, self.model, prompt
+        )
+        response = await model.generate_content_async(
+            contents,
+            generation_config=self._generation_config(**kwargs),
+            stream=True
+        )
+        
+        text = ""
+        async for chunk in response:
+            delta = self._chunk_text(chunk)
+            text += delta
+            if self._stream_should_stop(text, delta, stop_when):
+                return self._early_stop_to_dict(prompt, text)
+        
+        return self._response_to_dict(response)
+    
+    @staticmethod
+    def _chunk_text(chunk) -> str:
+        """Text of a stream chunk (empty for chunks without parts)."""
+        try:
+            return chunk.text
+        except ValueError:
+            return ""
+    
+    def _early_stop_to_dict(self, prompt: str, text: str) -> Dict[str, Any]:
+        """Response dictionary for a stream cut off before usage was reported."""
+        prompt_tokens, completion_tokens = self._estimate_usage(prompt, text)
+        return {
+            'text': text,
+            'candidates': [
+                {
+                    'content': {'parts': [{'text': text}], 'role': 'model'},
+                    'finish_reason': 'EARLY_STOP',
+                    'safety_ratings': [],
+                }
+            ],
+            'usage_metadata': {
+                'prompt_token_count': prompt_tokens,
+                'cached_content_token_count': 0,
+                'candidates_token_count': completion_tokens,
+                'total_token_count': prompt_tokens + completion_tokens,
+            },
+            'stopped_early': True,
+            'usage_estimated': True,
+        }
+    
+    def _with_context_cache(
+        self,
+        model: genai.GenerativeModel,
+        prompt: str
+    ) -> Tuple[genai.GenerativeModel, str]:
+        """
+        Model and contents to send, using a context cache for long prefixes.
+        
+        Args:
+            model: Model to use when the prefix is not cached
+            prompt: Full prompt string
+            
+        Returns:
+            (model, contents) - a cached-content model and the prompt's
+            suffix, or the given model and the full prompt
+        """
+        cached_content = self._context_cache_for(prompt)
+        if cached_content is None:
+            return model, prompt
+        
+        cached_model = genai.GenerativeModel.from_cached_content(cached_content)
+        return cached_model, self.split_prompt(prompt)[1]
+    
+    def _context_cache_for(self, prompt: str) -> Optional[genai.caching.CachedContent]:
+        """
+        Get (creating on first use) a context cache for the prompt's prefix.
+        
+        Gemini only caches contents of at least
+        GEMINI_CONTEXT_CACHE_MIN_TOKENS tokens, so shorter training blocks
+        (all current conditions) are sent uncached.
+        
+        Args:
+            prompt: Full prompt string
+            
+        Returns:
+            CachedContent for the prefix, or None if caching does not apply
+        """
+        if not self.prompt_caching:
+            return None
+        
+        prefix, _ = self.split_prompt(prompt)
+        # ~2 chars per token for our symbol prompts (see estimate_tokens)
+        if not prefix or len(prefix) // 2 < GEMINI_CONTEXT_CACHE_MIN_TOKENS:
+            return None
+        
+        with self._context_caches_lock:
+            cached_content = self._context_caches.get(prefix)
+            if cached_content is None:
+                cached_content = genai.caching.CachedContent.create(
+                    model=self.model_name,
+                    contents=[prefix],
+                    ttl=datetime.timedelta(seconds=GEMINI_CONTEXT_CACHE_TTL),
+                )
+                self._context_caches[prefix] = cached_content
+        return cached_content
+    
+    def _generation_config(self, **kwargs) -> genai.types.GenerationConfig:
+        """Build generation config, overriding defaults with kwargs."""
         temperature = kwargs.get('temperature', self.temperature)
-        max_tokens = kwargs.get('max_output_tokens', self.max_tokens)
+        max_tokens = kwargs.get('max_output_tokens', kwargs.get('max_tokens', self.max_tokens))
         
-        # Create generation config
-        generation_config = genai.types.GenerationConfig(
+        return genai.types.GenerationConfig(
             temperature=temperature,
             max_output_tokens=max_tokens,
             **{k: v for k, v in kwargs.items() 
-               if k not in ['temperature', 'max_output_tokens']}
+               if k not in ['temperature', 'max_output_tokens', 'max_tokens']}
         )
-        
-        # Make API call
-        response = self.model.generate_content(
-            prompt,
-            generation_config=generation_config
-        )
-        
-        # Convert to dictionary for consistent handling
+    
+    @staticmethod
+    def _response_to_dict(response) -> Dict[str, Any]:
+        """Convert a Gemini response to a dictionary for consistent handling."""
         return {
             'text': response.text,
             'candidates': [
@@ -107,6 +340,7 @@ class GeminiModel(BaseModel):
             ],
             'usage_metadata': {
                 'prompt_token_count': response.usage_metadata.prompt_token_count,
+                'cached_content_token_count': response.usage_metadata.cached_content_token_count,
                 'candidates_token_count': response.usage_metadata.candidates_token_count,
                 'total_token_count': response.usage_metadata.total_token_count,
             } if hasattr(response, 'usage_metadata') else None,
@@ -137,6 +371,9 @@ class GeminiModel(BaseModel):
                 metadata['tokens_used'] = raw_response['usage_metadata']['total_token_count']
                 metadata['prompt_tokens'] = raw_response['usage_metadata']['prompt_token_count']
                 metadata['completion_tokens'] = raw_response['usage_metadata']['candidates_token_count']
+                metadata['cached_prompt_tokens'] = (
+                    raw_response['usage_metadata'].get('cached_content_token_count') or 0
+                )
             
             # Add safety ratings
             if raw_response['candidates'][0].get('safety_ratings'):
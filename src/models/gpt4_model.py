@@ -4,7 +4,8 @@ GPT-4 model wrapper using OpenAI API.
 Implements BaseModel interface for GPT-4 interactions.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import json
 import openai
 
 from src.models.base_model import BaseModel, ModelResponse
@@ -24,12 +25,29 @@ class GPT4Model(BaseModel):
     to OpenAI's API.
     """
     
+    provider = "openai"
+    supports_batch = True
+    
+    retryable_errors = (
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )
+    fatal_errors = (
+        openai.AuthenticationError,
+        openai.PermissionDeniedError,
+        openai.BadRequestError,
+        openai.NotFoundError,
+        openai.UnprocessableEntityError,
+    )
+    
     def __init__(
         self,
         model_name: str = GPT4_MODEL,
         api_key: str = OPENAI_API_KEY,
         temperature: float = MODEL_TEMPERATURE,
         max_tokens: int = MAX_TOKENS,
+        base_url: Optional[str] = None,
         **kwargs
     ):
         """
@@ -40,6 +58,7 @@ class GPT4Model(BaseModel):
             api_key: OpenAI API key
             temperature: Sampling temperature
             max_tokens: Maximum response tokens
+            base_url: API base URL (default: SDK default / OPENAI_BASE_URL)
             **kwargs: Additional parameters passed to BaseModel
         """
         super().__init__(
@@ -51,7 +70,8 @@ class GPT4Model(BaseModel):
         )
         
         # Initialize OpenAI client
-        self.client = openai.OpenAI(api_key=self.api_key)
+        self.base_url = base_url
+        self.client = openai.OpenAI(api_key=self.api_key, base_url=base_url)
     
     def _make_api_call(self, prompt: str, **kwargs) -> Dict[str, Any]:
         """
@@ -86,6 +106,235 @@ class GPT4Model(BaseModel):
         # Convert to dictionary for consistent handling
         return response.model_dump()
     
+    def _create_async_client(self) -> openai.AsyncOpenAI:
+        """Create OpenAI async client for the running event loop."""
+        return openai.AsyncOpenAI(api_key=self.api_key, base_url=self.base_url)
+    
+    async def _make_api_call_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Make API call to OpenAI using the async client.
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Additional OpenAI API parameters
+            
+        Returns:
+            Raw API response as dictionary
+        """
+        temperature = kwargs.get('temperature', self.temperature)
+        max_tokens = kwargs.get('max_tokens', self.max_tokens)
+        
+        response = await self._get_async_client().chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **{k: v for k, v in kwargs.items() 
+               if k not in ['temperature', 'max_tokens']}
+        )
+        
+        return response.model_dump()
+    
+    def _streaming_request(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Chat completion parameters for a streamed request."""
+        temperature = kwargs.get('temperature', self.temperature)
+        max_tokens = kwargs.get('max_tokens', self.max_tokens)
+        
+        return {
+            'model': self.model_name,
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': temperature,
+            'max_tokens': max_tokens,
+            'stream': True,
+            # Final chunk carries usage (only if we read the stream to the end)
+            'stream_options': {'include_usage': True},
+            **{k: v for k, v in kwargs.items() 
+               if k not in ['temperature', 'max_tokens']}
+        }
+    
+    def _stream_to_dict(
+        self,
+        prompt: str,
+        text: str,
+        chunks: Dict[str, Any],
+        stopped_early: bool
+    ) -> Dict[str, Any]:
+        """Assemble streamed chunks into the non-streaming response shape."""
+        usage = chunks.get('usage')
+        if usage is None:
+            prompt_tokens, completion_tokens = self._estimate_usage(prompt, text)
+            usage = {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            }
+        
+        return {
+            'id': chunks.get('id'),
+            'model': chunks.get('model', self.model_name),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'early_stop' if stopped_early else chunks.get('finish_reason'),
+            }],
+            'usage': usage,
+            'stopped_early': stopped_early,
+            'usage_estimated': chunks.get('usage') is None,
+        }
+    
+    @staticmethod
+    def _read_chunk(chunk, chunks: Dict[str, Any]) -> str:
+        """Record a stream chunk's id/model/finish_reason/usage; return its text delta."""
+        chunks['id'] = chunk.id
+        chunks['model'] = chunk.model
+        if chunk.usage is not None:
+            chunks['usage'] = chunk.usage.model_dump()
+        if not chunk.choices:
+            return ""
+        if chunk.choices[0].finish_reason is not None:
+            chunks['finish_reason'] = chunk.choices[0].finish_reason
+        return chunk.choices[0].delta.content or ""
+    
+    def _make_streaming_call(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Stream a chat completion, closing it once the answer is complete.
+        
+        Args:
+            prompt: Input prompt
+            stop_when: Returns True for an output line that completes the answer
+            **kwargs: Additional OpenAI API parameters
+            
+        Returns:
+            Raw API response as dictionary (same shape as _make_api_call)
+        """
+        stream = self.client.chat.completions.create(
+            **self._streaming_request(prompt, **kwargs)
+        )
+        
+        text, chunks, stopped_early = "", {}, False
+        try:
+            for chunk in stream:
+                delta = self._read_chunk(chunk, chunks)
+                text += delta
+                if self._stream_should_stop(text, delta, stop_when):
+                    stopped_early = True
+                    break
+        finally:
+            stream.close()
+        
+        return self._stream_to_dict(prompt, text, chunks, stopped_early)
+    
+    async def _make_streaming_call_async(
+        self,
+        prompt: str,
+        stop_when: Callable[[str], bool],
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Async version of _make_streaming_call()."""
+        stream = await self._get_async_client().chat.completions.create(
+            **self._streaming_request(prompt, **kwargs)
+        )
+        
+        text, chunks, stopped_early = "", {}, False
+        try:
+            async for chunk in stream:
+                delta = self._read_chunk(chunk, chunks)
+                text += delta
+                if self._stream_should_stop(text, delta, stop_when):
+                    stopped_early = True
+                    break
+        finally:
+            await stream.close()
+        
+        return self._stream_to_dict(prompt, text, chunks, stopped_early)
+    
+    def _submit_batch(self, requests: List[Tuple[str, str]], **kwargs) -> str:
+        """
+        Submit prompts to the OpenAI Batch API.
+        
+        Args:
+            requests: (custom_id, prompt) pairs
+            **kwargs: Additional OpenAI API parameters
+            
+        Returns:
+            OpenAI batch ID
+        """
+        temperature = kwargs.get('temperature', self.temperature)
+        max_tokens = kwargs.get('max_tokens', self.max_tokens)
+        extra = {k: v for k, v in kwargs.items() 
+                 if k not in ['temperature', 'max_tokens']}
+        
+        # One JSONL line per chat completion request
+        lines = [
+            json.dumps({
+                'custom_id': custom_id,
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': {
+                    'model': self.model_name,
+                    'messages': [{"role": "user", "content": prompt}],
+                    'temperature': temperature,
+                    'max_tokens': max_tokens,
+                    **extra,
+                },
+            }, ensure_ascii=False)
+            for custom_id, prompt in requests
+        ]
+        
+        input_file = self.client.files.create(
+            file=("batch_input.jsonl", "\n".join(lines).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        return batch.id
+    
+    def _poll_batch(self, batch_id: str) -> str:
+        """Map OpenAI batch status to 'in_progress'/'completed'/'failed'."""
+        status = self.client.batches.retrieve(batch_id).status
+        if status == 'completed':
+            return 'completed'
+        if status in ('failed', 'expired', 'cancelled', 'cancelling'):
+            return 'failed'
+        return 'in_progress'
+    
+    def _fetch_batch_results(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Download the output file of a completed OpenAI batch.
+        
+        Returns:
+            Mapping of custom_id to chat completion dictionary
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            return {}
+        
+        results = {}
+        content = self.client.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get('response') or {}
+            if record.get('error') or response.get('status_code') != 200:
+                continue
+            results[record['custom_id']] = response['body']
+        
+        return results
+    
     def _parse_response(self, raw_response: Dict[str, Any]) -> ModelResponse:
         """
         Parse OpenAI API response.
@@ -106,6 +355,11 @@ class GPT4Model(BaseModel):
                 'tokens_used': raw_response['usage']['total_tokens'],
                 'prompt_tokens': raw_response['usage']['prompt_tokens'],
                 'completion_tokens': raw_response['usage']['completion_tokens'],
+                # Prompt prefixes >=1024 tokens are cached automatically
+                'cached_prompt_tokens': (
+                    (raw_response['usage'].get('prompt_tokens_details') or {})
+                    .get('cached_tokens') or 0
+                ),
                 'model': raw_response['model'],
             }
             
@@ -0,0 +1,207 @@
+"""
+Shared token-bucket rate limiting for LLM API calls.
+
+Each provider (OpenAI, Anthropic, Google) enforces its own
+requests-per-minute (RPM) and tokens-per-minute (TPM) quotas per API key,
+independently of how many model objects we create. One RateLimiter per
+provider is therefore shared by every model instance in the process
+(see get_rate_limiter).
+"""
+
+from typing import Dict, Optional
+import asyncio
+import threading
+import time
+
+from src.config import RATE_LIMITS
+
+
+class TokenBucket:
+    """
+    Continuously refilling token bucket.
+    
+    The bucket holds at most `capacity` units and refills at
+    `capacity / 60` units per second (i.e. a per-minute budget). The level
+    may go negative when actual usage is charged after the fact; callers
+    then wait until it has refilled.
+    """
+    
+    def __init__(self, per_minute: float):
+        """
+        Initialize bucket.
+        
+        Args:
+            per_minute: Budget per minute (also the burst capacity)
+        """
+        self.capacity = float(per_minute)
+        self.refill_per_second = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.level = min(self.capacity, self.level + elapsed * self.refill_per_second)
+            self.updated_at = now
+    
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill(now)
+        # Never ask for more than a full bucket, or we would wait forever
+        amount = min(amount, self.capacity)
+        deficit = amount - self.level
+        return deficit / self.refill_per_second if deficit > 0 else 0.0
+    
+    def consume(self, amount: float, now: float):
+        """Remove `amount` units (level may go negative)."""
+        self._refill(now)
+        self.level -= amount
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter for one provider.
+    
+    Usage:
+        waited = limiter.acquire(estimated_tokens)   # before the request
+        limiter.charge(actual_tokens, estimated_tokens)  # after the response
+    
+    The estimate is reserved up front so that concurrent requests cannot
+    all pass before any usage is charged; charge() then corrects the
+    bucket by the difference between actual and estimated tokens.
+    
+    Thread-safe; acquire_async() is the non-blocking variant for
+    coroutines.
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        """
+        Initialize limiter.
+        
+        Args:
+            provider: Provider key (e.g., "openai")
+            requests_per_minute: RPM budget (None for unlimited)
+            tokens_per_minute: TPM budget (None for unlimited)
+        """
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+    
+    def _try_reserve(self, estimated_tokens: int) -> float:
+        """
+        Reserve one request and `estimated_tokens` if both are available.
+        
+        Returns:
+            0.0 if reserved, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.time_until(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.time_until(estimated_tokens, now))
+            
+            if wait > 0:
+                return wait
+            
+            if self.requests is not None:
+                self.requests.consume(1, now)
+            if self.tokens is not None:
+                self.tokens.consume(estimated_tokens, now)
+            return 0.0
+    
+    def acquire(self, estimated_tokens: int = 0) -> float:
+        """
+        Block until a request may be sent.
+        
+        Args:
+            estimated_tokens: Tokens to reserve for this request
+        
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_reserve(estimated_tokens)
+            if wait == 0.0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+    
+    async def acquire_async(self, estimated_tokens: int = 0) -> float:
+        """Async version of acquire(); yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            wait = self._try_reserve(estimated_tokens)
+            if wait == 0.0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def charge(self, actual_tokens: int, estimated_tokens: int = 0):
+        """
+        Charge actual token usage for a completed request.
+        
+        Args:
+            actual_tokens: Tokens reported by the provider (tokens_used)
+            estimated_tokens: Tokens reserved by acquire() for this request
+        """
+        if self.tokens is None:
+            return
+        with self._lock:
+            self.tokens.consume(actual_tokens - estimated_tokens, time.monotonic())
+    
+    def refund(self, estimated_tokens: int):
+        """Return a reservation for a request that consumed no tokens."""
+        self.charge(0, estimated_tokens)
+    
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Current bucket levels (for logging/debugging)."""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket._refill(now)
+            return {
+                'provider': self.provider,
+                'requests_available': self.requests.level if self.requests else None,
+                'tokens_available': self.tokens.level if self.tokens else None,
+            }
+
+
+# One limiter per provider, shared by all model instances in the process
+_LIMITERS: Dict[str, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Get the process-wide rate limiter for a provider.
+    
+    Budgets come from RATE_LIMITS in src/config.py. Providers without an
+    entry get an unlimited limiter.
+    
+    Args:
+        provider: Provider key (e.g., "openai", "anthropic", "google")
+    
+    Returns:
+        Shared RateLimiter instance
+    """
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(provider)
+        if limiter is None:
+            limits = RATE_LIMITS.get(provider, {})
+            limiter = RateLimiter(
+                provider,
+                requests_per_minute=limits.get('requests_per_minute'),
+                tokens_per_minute=limits.get('tokens_per_minute'),
+            )
+            _LIMITERS[provider] = limiter
+        return limiter
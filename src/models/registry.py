@@ -0,0 +1,127 @@
+"""
+Registry of model wrappers by short name.
+
+Resolves CLI-style names ("gpt4", "claude", "gemini", "replay") to
+wrapper classes, importing each wrapper module - and with it the
+provider SDK - only when that model is first requested. Selecting
+`--models claude` therefore never loads openai or google.generativeai.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Type
+import importlib
+
+from src.models.base_model import BaseModel
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """
+    Where to find a model wrapper and which provider it talks to.
+    
+    Attributes:
+        name: Short name used on the command line
+        module: Module defining the wrapper
+        class_name: Wrapper class name
+        provider: Provider key (see RATE_LIMITS / validate_config)
+        display_name: Human-readable name for progress output
+    """
+    name: str
+    module: str
+    class_name: str
+    provider: str
+    display_name: str
+
+
+MODEL_REGISTRY: Dict[str, ModelSpec] = {
+    spec.name: spec for spec in [
+        ModelSpec("gpt4", "src.models.gpt4_model", "GPT4Model", "openai", "GPT-4"),
+        ModelSpec("claude", "src.models.claude_model", "ClaudeModel", "anthropic", "Claude"),
+        ModelSpec("gemini", "src.models.gemini_model", "GeminiModel", "google", "Gemini"),
+        ModelSpec("replay", "src.models.replay_model", "ReplayModel", "replay", "Replay"),
+    ]
+}
+
+# Models run by default ("--models all")
+DEFAULT_MODELS = ("gpt4", "claude", "gemini")
+
+
+def get_spec(name: str) -> ModelSpec:
+    """
+    Look up a registered model.
+    
+    Raises:
+        ValueError: If the name is not registered
+    """
+    try:
+        return MODEL_REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown model '{name}'. Available: {', '.join(MODEL_REGISTRY)}"
+        ) from None
+
+
+def get_model_class(name: str) -> Type[BaseModel]:
+    """
+    Import (on first use) and return a model wrapper class.
+    
+    Args:
+        name: Registered model name (e.g., "claude")
+    
+    Returns:
+        Wrapper class
+    """
+    spec = get_spec(name)
+    module = importlib.import_module(spec.module)
+    return getattr(module, spec.class_name)
+
+
+def create_model(name: str, **kwargs) -> BaseModel:
+    """
+    Instantiate a model wrapper by name.
+    
+    Args:
+        name: Registered model name (e.g., "gpt4")
+        **kwargs: Constructor arguments for the wrapper
+    
+    Returns:
+        Model instance
+    """
+    return get_model_class(name)(**kwargs)
+
+
+def resolve_models(names: Iterable[str]) -> List[str]:
+    """
+    Expand "all" and drop duplicates, keeping order.
+    
+    Args:
+        names: Model names, possibly including "all"
+    
+    Returns:
+        List of registered model names
+    """
+    resolved = []
+    for name in names:
+        for expanded in (DEFAULT_MODELS if name == "all" else [name]):
+            get_spec(expanded)
+            if expanded not in resolved:
+                resolved.append(expanded)
+    return resolved
+
+
+def providers_for(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Provider keys needed by the given models (default: DEFAULT_MODELS).
+    
+    Args:
+        names: Model names, possibly including "all"
+    
+    Returns:
+        Provider keys (e.g., ["anthropic"]), for validate_config()
+    """
+    providers = []
+    for name in resolve_models(names if names is not None else DEFAULT_MODELS):
+        provider = MODEL_REGISTRY[name].provider
+        if provider not in providers:
+            providers.append(provider)
+    return providers
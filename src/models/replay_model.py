@@ -0,0 +1,214 @@
+"""
+Replay model that serves recorded responses from saved experiment results.
+
+Implements BaseModel interface on top of saved ExperimentResult files
+(NDJSON or legacy JSON) in data/results/raw, so the full pipeline (prompting, concurrency, parsing,
+scoring) can be benchmarked and regression-tested without API keys or
+network access.
+"""
+
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import asyncio
+import time
+
+from src.models.base_model import BaseModel, ModelResponse
+from src.config import RESULTS_DIR
+from src.result_io import iter_responses, read_header, result_files
+
+
+class ReplayModel(BaseModel):
+    """
+    Model that answers prompts with previously recorded outputs.
+    
+    Each recorded response is indexed twice: by its exact prompt (when the
+    result file stored one) and by its input sequence. Lookups try the
+    exact prompt first, then fall back to the input sequence parsed from
+    the prompt's final "A B C →" line.
+    
+    If several files contain the same key, the file that sorts last
+    (i.e. the latest timestamp) wins.
+    """
+    
+    provider = "replay"
+    
+    # A prompt missing from the recordings will stay missing
+    fatal_errors = (KeyError,)
+    
+    def __init__(
+        self,
+        source_model: Optional[str] = None,
+        experiment_type: Optional[str] = None,
+        results_dir: Path = RESULTS_DIR / "raw",
+        simulate_latency: bool = False,
+        latency_scale: float = 1.0,
+        **kwargs
+    ):
+        """
+        Initialize replay model and index recorded responses.
+        
+        Args:
+            source_model: Only replay results of this model (e.g., "gpt-4-0125-preview")
+            experiment_type: Only replay results of this condition (e.g., "1b_minimal")
+            results_dir: Directory containing ExperimentResult files
+            simulate_latency: Sleep for each response's recorded latency_seconds
+            latency_scale: Multiplier applied to recorded latencies
+            **kwargs: Additional parameters passed to BaseModel
+        """
+        # Replays are free and deterministic: no retries, no caching
+        kwargs.setdefault('max_retries', 1)
+        kwargs.setdefault('use_cache', False)
+        super().__init__(
+            model_name=f"replay-{source_model or 'any'}",
+            api_key="",
+            **kwargs
+        )
+        
+        self.source_model = source_model
+        self.experiment_type = experiment_type
+        self.results_dir = Path(results_dir)
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        
+        self.by_prompt: Dict[str, Dict[str, Any]] = {}
+        self.by_input: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self.n_files = self._load_index()
+    
+    def _load_index(self) -> int:
+        """
+        Index recorded responses from all matching result files.
+        
+        Returns:
+            Number of result files indexed
+        """
+        n_files = 0
+        for filepath in result_files(self.results_dir):
+            # Filter on the header before streaming any responses
+            try:
+                data = read_header(filepath)
+            except (OSError, ValueError):
+                continue
+            
+            if not isinstance(data, dict) or 'model_name' not in data:
+                continue
+            if self.source_model and data.get('model_name') != self.source_model:
+                continue
+            if self.experiment_type and data.get('experiment_type') != self.experiment_type:
+                continue
+            
+            for response in iter_responses(filepath):
+                record = {
+                    'text': response.get('model_output_raw', ""),
+                    'metadata': dict(response.get('model_metadata') or {}),
+                    'source_file': filepath.name,
+                    'source_model': data.get('model_name'),
+                }
+                if 'packed_output_raw' in response:
+                    # Packed runs: the whole reply answers the packed prompt,
+                    # and the per-item text is not a reply to any prompt
+                    record['text'] = response['packed_output_raw']
+                    self.by_prompt[response['prompt']] = record
+                    continue
+                if response.get('prompt'):
+                    self.by_prompt[response['prompt']] = record
+                self.by_input[tuple(response.get('input', []))] = record
+            n_files += 1
+        
+        return n_files
+    
+    @staticmethod
+    def input_from_prompt(prompt: str) -> Tuple[str, ...]:
+        """Extract the test input sequence from a prompt's final line."""
+        lines = prompt.strip().splitlines()
+        if not lines:
+            return ()
+        return tuple(lines[-1].replace("→", " ").split())
+    
+    def lookup(self, prompt: str) -> Dict[str, Any]:
+        """
+        Find the recorded response for a prompt.
+        
+        Raises:
+            KeyError: If no recorded response matches
+        """
+        record = self.by_prompt.get(prompt)
+        if record is None:
+            record = self.by_input.get(self.input_from_prompt(prompt))
+        if record is None:
+            raise KeyError(
+                f"No recorded response for input {self.input_from_prompt(prompt)}"
+            )
+        return record
+    
+    def _recorded_delay(self, record: Dict[str, Any]) -> float:
+        if not self.simulate_latency:
+            return 0.0
+        return record['metadata'].get('latency_seconds', 0.0) * self.latency_scale
+    
+    def _make_api_call(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """
+        Look up the recorded response (optionally sleeping for its latency).
+        
+        Args:
+            prompt: Input prompt
+            **kwargs: Ignored
+        
+        Returns:
+            Recorded response record
+        """
+        record = self.lookup(prompt)
+        delay = self._recorded_delay(record)
+        if delay > 0:
+            time.sleep(delay)
+        return record
+    
+    async def _make_api_call_async(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Async lookup; recorded latency is awaited so requests overlap."""
+        record = self.lookup(prompt)
+        delay = self._recorded_delay(record)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return record
+    
+    def _parse_response(self, raw_response: Dict[str, Any]) -> ModelResponse:
+        """
+        Turn a recorded response back into a ModelResponse.
+        
+        Args:
+            raw_response: Record from the replay index
+        
+        Returns:
+            Standardized ModelResponse object
+        """
+        metadata = {
+            k: v for k, v in raw_response['metadata'].items()
+            if k not in ['latency_seconds', 'attempt', 'rate_limit_wait_seconds']
+        }
+        metadata['recorded_latency_seconds'] = raw_response['metadata'].get('latency_seconds')
+        metadata['replayed_from'] = raw_response['source_file']
+        metadata['source_model'] = raw_response['source_model']
+        
+        return ModelResponse(
+            text=raw_response['text'],
+            model_name=self.model_name,
+            success=True,
+            metadata=metadata
+        )
+
+
+if __name__ == "__main__":
+    # Replay the latest recorded responses through Experiment 1b
+    from src.experiments.experiment_1b_minimal import MinimalTrainingExperiment
+    
+    print("Testing Replay Model...")
+    
+    model = ReplayModel(experiment_type="1b_minimal")
+    print(f"Indexed {len(model.by_input)} responses from {model.n_files} files")
+    
+    exp = MinimalTrainingExperiment()
+    exp.setup_experiment()
+    
+    start = time.time()
+    result = exp.run_model(model, exp.training_examples, exp.test_examples, "1b_minimal")
+    print(f"\nReplayed {result.n_total} items in {time.time() - start:.2f}s")
+    print(f"Model Stats: {model.get_stats()}")
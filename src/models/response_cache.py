@@ -0,0 +1,195 @@
+"""
+Persistent content-addressed cache for deterministic model responses.
+
+All experiments run at temperature 0, so re-sending an identical prompt to
+the same model should give the same answer. This cache stores parsed
+responses in SQLite keyed by a hash of everything that determines the
+output (provider, model, prompt, temperature, max_tokens, extra params),
+so reruns only pay for prompts that have not been seen before.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from src.config import (
+    RESPONSE_CACHE_PATH,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_AGE_DAYS,
+)
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with size- and age-based eviction.
+    
+    Entries older than `max_age_seconds` are treated as misses and
+    deleted; when the cache grows beyond `max_entries`, the least recently
+    used entries are evicted. Safe to share across threads.
+    """
+    
+    def __init__(
+        self,
+        path: Path = RESPONSE_CACHE_PATH,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_age_seconds: Optional[float] = RESPONSE_CACHE_MAX_AGE_DAYS * 86400,
+    ):
+        """
+        Initialize cache (creates the database file if needed).
+        
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of cached responses
+            max_age_seconds: Maximum entry age (None for no expiry)
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed "
+                "ON responses (accessed_at)"
+            )
+    
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_name: str,
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        extra_params: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Compute the content address of a request.
+        
+        Args:
+            provider: Provider key (e.g., "anthropic")
+            model_name: Model identifier
+            prompt: Full prompt string
+            temperature: Sampling temperature
+            max_tokens: Maximum response tokens
+            extra_params: Any other API parameters that affect the output
+        
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = json.dumps(
+            [provider, model_name, prompt, float(temperature), int(max_tokens),
+             extra_params or {}],
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Key from make_key()
+        
+        Returns:
+            Stored response dictionary, or None on miss/expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            response, created_at = row
+            if self.max_age_seconds is not None and now - created_at > self.max_age_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+        return json.loads(response)
+    
+    def put(self, key: str, response: Dict[str, Any]):
+        """
+        Store a response, then evict expired and excess entries.
+        
+        Args:
+            key: Key from make_key()
+            response: JSON-serializable response dictionary
+        """
+        now = time.time()
+        payload = json.dumps(response, ensure_ascii=False, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, payload, now, now)
+            )
+            self._evict(now)
+    
+    def _evict(self, now: float):
+        """Delete expired entries and trim to max_entries (LRU). Caller holds lock."""
+        if self.max_age_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.max_age_seconds,)
+            )
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+    
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+# One cache per database file, shared by all model instances in the process
+_CACHES: Dict[Path, ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_response_cache(path: Path = RESPONSE_CACHE_PATH) -> ResponseCache:
+    """
+    Get the process-wide response cache for a database file.
+    
+    Args:
+        path: SQLite database file
+    
+    Returns:
+        Shared ResponseCache instance
+    """
+    path = Path(path)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = ResponseCache(path)
+            _CACHES[path] = cache
+        return cache
@@ -0,0 +1,291 @@
+"""
+Retry policy and circuit breaking for LLM API calls.
+
+RetryPolicy decides whether a failed request is worth retrying (rate
+limits, timeouts, server errors) or not (authentication, invalid
+requests), and how long to wait: full-jitter exponential backoff, or the
+server's Retry-After hint when one is given. Each model wrapper declares
+its SDK's retryable and fatal exception types.
+
+CircuitBreaker pauses every request to a provider after repeated
+retryable failures, so concurrent workers stop hammering a provider that
+is down or throttling us. Like the rate limiters, one breaker per
+provider is shared by all model instances in the process (see
+get_circuit_breaker).
+"""
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple, Type
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from src.config import (
+    RATE_LIMIT_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_BREAKER_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN,
+)
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that may succeed on retry; other 4xx statuses never will
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class RetryPolicy:
+    """
+    Classifies API errors and computes backoff between attempts.
+    
+    Classification order:
+    1. Instances of `fatal` types are never retried.
+    2. Instances of `retryable` types are always retried.
+    3. Errors carrying an HTTP status (`status_code`, or an integer
+       `code` for Google API errors) are retried for 408/409/429/5xx.
+    4. Anything else (network errors, parsing hiccups) is retried.
+    """
+    
+    def __init__(
+        self,
+        base_delay: float = RATE_LIMIT_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        retryable: Tuple[Type[BaseException], ...] = (),
+        fatal: Tuple[Type[BaseException], ...] = (),
+    ):
+        """
+        Initialize policy.
+        
+        Args:
+            base_delay: Backoff ceiling for the first retry (seconds)
+            max_delay: Maximum backoff ceiling (seconds)
+            retryable: Exception types that are always retried
+            fatal: Exception types that are never retried
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = tuple(retryable)
+        self.fatal = tuple(fatal)
+    
+    @staticmethod
+    def status_code(error: BaseException) -> Optional[int]:
+        """HTTP status carried by an SDK error, if any."""
+        for attr in ('status_code', 'code'):
+            value = getattr(error, attr, None)
+            if isinstance(value, int) and 100 <= value <= 599:
+                return value
+        return None
+    
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Whether a request that failed with `error` may succeed if retried.
+        
+        Args:
+            error: Exception raised by the API call
+        
+        Returns:
+            True if the request should be retried
+        """
+        if self.fatal and isinstance(error, self.fatal):
+            return False
+        if self.retryable and isinstance(error, self.retryable):
+            return True
+        
+        status = self.status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES or status >= 500
+        return True
+    
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """
+        Server-requested wait from the error's response headers.
+        
+        Understands `retry-after-ms` (OpenAI/Anthropic) and `retry-after`
+        as either seconds or an HTTP date.
+        
+        Args:
+            error: Exception raised by the API call
+        
+        Returns:
+            Seconds to wait, or None if the server gave no hint
+        """
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if not headers:
+            return None
+        
+        try:
+            value = headers.get('retry-after-ms')
+            if value is not None:
+                return max(0.0, float(value) / 1000.0)
+            
+            value = headers.get('retry-after')
+            if value is None:
+                return None
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                retry_at = parsedate_to_datetime(value)
+                return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Seconds to wait before retrying after a failed attempt.
+        
+        Uses full jitter (uniform in [0, min(max_delay, base * 2**attempt)])
+        so concurrent workers do not retry in lockstep, but never waits
+        less than the server's Retry-After hint.
+        
+        Args:
+            attempt: Zero-based index of the attempt that failed
+            error: Exception raised by that attempt
+        
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        wait = random.uniform(0, ceiling)
+        
+        hint = self.retry_after(error) if error is not None else None
+        if hint is not None:
+            wait = max(wait, hint)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    
+    After `failure_threshold` consecutive retryable failures the circuit
+    opens and every caller of wait()/wait_async() blocks for `cooldown`
+    seconds. Afterwards requests flow again (half-open): one more failure
+    re-opens the circuit immediately, a success closes it.
+    
+    A Retry-After hint also pauses the whole provider for that long,
+    since the limit it signals applies to our API key, not one request.
+    
+    Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = CIRCUIT_BREAKER_THRESHOLD,
+        cooldown: float = CIRCUIT_BREAKER_COOLDOWN,
+    ):
+        """
+        Initialize breaker (closed).
+        
+        Args:
+            provider: Provider key (e.g., "openai")
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open
+        """
+        self.provider = provider
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+    
+    def time_until_closed(self) -> float:
+        """Seconds until requests may be sent (0 if the circuit is not open)."""
+        with self._lock:
+            return max(0.0, self.open_until - time.monotonic())
+    
+    @property
+    def is_open(self) -> bool:
+        return self.time_until_closed() > 0
+    
+    def wait(self) -> float:
+        """
+        Block while the circuit is open.
+        
+        Returns:
+            Total seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self.time_until_closed()
+            if wait == 0.0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+    
+    async def wait_async(self) -> float:
+        """Async version of wait(); yields to the event loop while waiting."""
+        waited = 0.0
+        while True:
+            wait = self.time_until_closed()
+            if wait == 0.0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+    
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self.consecutive_failures = 0
+    
+    def record_failure(self, retry_after: Optional[float] = None):
+        """
+        Count a retryable failure, opening the circuit if needed.
+        
+        Args:
+            retry_after: Server-requested pause for the provider (seconds)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.consecutive_failures += 1
+            
+            pause = 0.0
+            if self.consecutive_failures >= self.failure_threshold:
+                pause = self.cooldown
+                # Half-open afterwards: the next failure re-opens
+                self.consecutive_failures = self.failure_threshold - 1
+            if retry_after is not None:
+                pause = max(pause, retry_after)
+            
+            if pause > 0 and now + pause > self.open_until:
+                if self.open_until <= now:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"⚠ Circuit open for {self.provider}: pausing requests "
+                        f"for {pause:.1f}s"
+                    )
+                self.open_until = now + pause
+    
+    def reset(self):
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+
+
+# One breaker per provider, shared by all model instances in the process
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a provider.
+    
+    Args:
+        provider: Provider key (e.g., "openai", "anthropic", "google")
+    
+    Returns:
+        Shared CircuitBreaker instance
+    """
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(provider)
+            _BREAKERS[provider] = breaker
+        return breaker
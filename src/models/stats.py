@@ -0,0 +1,198 @@
+"""
+Per-request statistics for model wrappers.
+
+BaseModel records one sample per request (latency, attempts, token
+counts, time spent waiting on rate limits), so runs can report tail
+latency and throughput rather than just totals. These distributions are
+what concurrency and rate-limit settings are sized from.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import threading
+
+# Metrics recorded per request (missing values are simply not sampled)
+METRICS = (
+    'latency_seconds',
+    'attempts',
+    'prompt_tokens',
+    'completion_tokens',
+    'tokens_per_second',
+    'rate_limit_wait_seconds',
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Linearly interpolated percentile of pre-sorted values.
+    
+    Args:
+        sorted_values: Non-empty list sorted ascending
+        q: Percentile in [0, 100]
+    
+    Returns:
+        The q-th percentile
+    """
+    position = (len(sorted_values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+class RequestStats:
+    """
+    Thread-safe store of per-request samples.
+    
+    Samples are kept in full (runs are hundreds of requests, not
+    millions), so percentiles are exact and any window of requests can be
+    summarized with since().
+    """
+    
+    def __init__(self):
+        self._samples: List[Dict[str, float]] = []
+        self._lock = threading.Lock()
+    
+    def record(self, **values: Optional[float]):
+        """
+        Record one request.
+        
+        Args:
+            **values: Metric values (see METRICS); None values are skipped
+        """
+        sample = {k: float(v) for k, v in values.items() if v is not None}
+        latency = sample.get('latency_seconds')
+        completion_tokens = sample.get('completion_tokens')
+        if latency and completion_tokens is not None:
+            sample['tokens_per_second'] = completion_tokens / latency
+        
+        with self._lock:
+            self._samples.append(sample)
+    
+    @classmethod
+    def from_metadata(cls, metadata: Iterable[Dict[str, Any]]) -> 'RequestStats':
+        """
+        Rebuild samples from the metadata BaseModel attaches to responses.
+        
+        For requests sent interleaved with others (e.g. the seeds of a
+        replication share one generate_many() call), where a since()
+        window would mix them. Responses that made no request (cache
+        hits, journaled, not sent, refused by the budget) are skipped.
+        
+        Args:
+            metadata: ModelResponse.metadata of each response
+        
+        Returns:
+            New RequestStats with one sample per request made
+        """
+        stats = cls()
+        for values in metadata:
+            if any(values.get(flag) for flag in
+                   ('cache_hit', 'from_journal', 'not_sent', 'budget_exceeded')):
+                continue
+            stats.record(
+                latency_seconds=values.get('latency_seconds'),
+                attempts=values.get('attempt', values.get('attempts')),
+                prompt_tokens=values.get('prompt_tokens'),
+                completion_tokens=values.get('completion_tokens'),
+                rate_limit_wait_seconds=values.get('rate_limit_wait_seconds'),
+            )
+        return stats
+    
+    @classmethod
+    def combine(cls, stats: Iterable['RequestStats']) -> 'RequestStats':
+        """
+        Merge several stats into one (e.g. the seeds of a pooled result).
+        
+        Args:
+            stats: RequestStats to merge, in order
+        
+        Returns:
+            New RequestStats holding all their samples
+        """
+        combined = cls()
+        for part in stats:
+            with part._lock:
+                combined._samples.extend(dict(s) for s in part._samples)
+        return combined
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+    
+    def since(self, mark: int) -> 'RequestStats':
+        """
+        Stats for requests recorded after a mark.
+        
+        Args:
+            mark: Value of len(stats) taken before the requests of interest
+        
+        Returns:
+            New RequestStats holding only the later samples
+        """
+        window = RequestStats()
+        with self._lock:
+            window._samples = [dict(s) for s in self._samples[mark:]]
+        return window
+    
+    def percentile(self, metric: str, q: float) -> Optional[float]:
+        """
+        Percentile of one metric over all samples.
+        
+        Args:
+            metric: Metric name (see METRICS)
+            q: Percentile in [0, 100]
+        
+        Returns:
+            The q-th percentile, or None if the metric has no samples
+        """
+        with self._lock:
+            values = sorted(s[metric] for s in self._samples if metric in s)
+        return percentile(values, q) if values else None
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Distribution summary per metric.
+        
+        Returns:
+            {metric: {'count', 'mean', 'p50', 'p95', 'p99', 'max'}} for
+            every metric with at least one sample
+        """
+        with self._lock:
+            samples = list(self._samples)
+        
+        summary = {}
+        for metric in METRICS:
+            values = sorted(s[metric] for s in samples if metric in s)
+            if not values:
+                continue
+            summary[metric] = {
+                'count': len(values),
+                'mean': sum(values) / len(values),
+                **{f'p{q}': percentile(values, q) for q in PERCENTILES},
+                'max': values[-1],
+            }
+        return summary
+    
+    def to_dict(self) -> Dict:
+        """Summary plus raw samples, for JSON export."""
+        with self._lock:
+            samples = [dict(s) for s in self._samples]
+        return {
+            'summary': self.summary(),
+            'samples': samples,
+        }
+    
+    def save(self, filepath: Path):
+        """Save summary and samples to a JSON file."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"✓ Saved request stats to {filepath}")
+    
+    def reset(self):
+        """Drop all samples."""
+        with self._lock:
+            self._samples = []
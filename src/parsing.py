@@ -0,0 +1,120 @@
+"""
+Fast parsing of model responses into symbol sequences.
+
+Scoring re-parses every stored response whenever the scoring rules
+change, so parsing is done here with a precomputed lookup table instead
+of a unicodedata.category() call per token. SYMBOL_TABLE has one entry
+per Basic Multilingual Plane codepoint, set for our designated symbol
+ranges and for every Unicode symbol (category S*). SYMBOL_CHARS holds the
+same characters, plus the symbols of plane 1 (emoji, mathematical
+alphanumerics), as strings, so a token is tested with one set lookup.
+Unicode assigns no symbols beyond plane 1.
+
+parse_answer() implements the same strategy as
+SequentialTransformationExperiment.parse_response() (which now calls
+it); parse_many() applies it to many responses at once.
+"""
+
+from typing import Iterable, List, Sequence, Union
+import unicodedata
+
+BMP_SIZE = 0x10000
+
+# Designated symbol ranges (see MATHEMATICAL_OPERATORS etc. in src/config.py)
+SYMBOL_RANGES = (
+    (0x2A00, 0x2AFF),  # Mathematical operators
+    (0x2B00, 0x2BFF),  # Miscellaneous symbols and arrows
+    (0x25A0, 0x25FF),  # Geometric shapes
+)
+
+
+def _build_symbol_table() -> bytes:
+    table = bytearray(BMP_SIZE)
+    for codepoint in range(BMP_SIZE):
+        if unicodedata.category(chr(codepoint)).startswith('S'):
+            table[codepoint] = 1
+    for start, end in SYMBOL_RANGES:
+        table[start:end + 1] = b'\x01' * (end - start + 1)
+    return bytes(table)
+
+
+# 1 for codepoints that count as symbols, 0 otherwise (64 KB, built at import)
+SYMBOL_TABLE = _build_symbol_table()
+
+# Symbol characters of the BMP and plane 1 as one-character strings
+SYMBOL_CHARS = frozenset(
+    [chr(codepoint) for codepoint in range(BMP_SIZE) if SYMBOL_TABLE[codepoint]] +
+    [chr(codepoint) for codepoint in range(BMP_SIZE, 2 * BMP_SIZE)
+     if unicodedata.category(chr(codepoint)).startswith('S')]
+)
+
+
+def is_special_symbol(token: str) -> bool:
+    """Check if token is a Unicode symbol (not regular letter/word)"""
+    return token in SYMBOL_CHARS
+
+
+def parse_answer(response_text: str, expected_length: int = 3) -> List[str]:
+    """
+    Parse one model response into a sequence of symbols.
+    
+    Takes the last expected_length symbols in the response (answers
+    usually follow any explanation); if there are fewer, whatever symbols
+    were found; if there are none, the first expected_length tokens.
+    
+    Args:
+        response_text: Raw text from model
+        expected_length: Expected number of symbols
+    
+    Returns:
+        List of parsed symbols (may be empty if parsing fails)
+    """
+    return parse_many([response_text], [expected_length])[0]
+
+
+def parse_many(
+    texts: Iterable[str],
+    expected_lengths: Union[int, Sequence[int]] = 3,
+    take: str = "last"
+) -> List[List[str]]:
+    """
+    Parse many responses (same result as parse_answer() on each).
+    
+    Args:
+        texts: Raw response texts
+        expected_lengths: Expected number of symbols, per text or one
+            value for all texts
+        take: Which symbols to keep when a response has more than
+            expected: "last" (default, as parse_answer()) or "first"
+    
+    Returns:
+        Parsed symbol lists, in the order of texts
+    """
+    if take not in ("last", "first"):
+        raise ValueError(f"take must be 'last' or 'first', got '{take}'")
+    take_last = take == "last"
+    
+    texts = list(texts)
+    if isinstance(expected_lengths, int):
+        expected_lengths = [expected_lengths] * len(texts)
+    elif len(expected_lengths) != len(texts):
+        raise ValueError(
+            f"Got {len(expected_lengths)} expected lengths for {len(texts)} texts"
+        )
+    
+    symbols = SYMBOL_CHARS
+    parsed = []
+    append = parsed.append
+    for text, expected_length in zip(texts, expected_lengths):
+        # Arrows and commas separate tokens like whitespace
+        tokens = text.replace("→", " ").replace("->", " ").replace(",", " ").split()
+        special_symbols = [t for t in tokens if t in symbols]
+        
+        if len(special_symbols) >= expected_length and take_last:
+            append(special_symbols[-expected_length:])
+        elif special_symbols:
+            append(special_symbols[:expected_length])
+        else:
+            # Fallback: the first tokens, whatever they are
+            append(tokens[:expected_length])
+    return parsed
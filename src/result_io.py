@@ -0,0 +1,218 @@
+"""
+Compact result files: NDJSON with one header line and one line per response.
+
+Indented whole-file JSON has to be parsed in full before the first
+response can be looked at, which gets slow and memory-hungry once runs
+reach thousands of items. A result file is instead written as:
+
+    {"format": "riv-result", "version": 1, "model_name": ..., "accuracy": ..., ...}
+    {"item_number": 1, "input": [...], "correct": true, ...}
+    {"item_number": 2, ...}
+
+optionally gzip (.ndjson.gz) or zstd (.ndjson.zst, needs the zstandard
+package) compressed. Readers can take the summary from the header alone
+(read_header) or stream responses one at a time (iter_responses).
+Legacy indented .json results are read transparently, and load_result()
+rebuilds the ExperimentResult.to_dict() layout from either format.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+import gzip
+import io
+import json
+
+from src.config import RESULTS_DIR
+
+FORMAT_NAME = "riv-result"
+FORMAT_VERSION = 1
+
+# File suffix per compression setting
+COMPRESSION_SUFFIXES = {
+    None: ".ndjson",
+    "gzip": ".ndjson.gz",
+    "zstd": ".ndjson.zst",
+}
+
+# Every suffix a result file may have, longest first
+RESULT_SUFFIXES = (".ndjson.gz", ".ndjson.zst", ".ndjson", ".json")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd-compressed results need the zstandard package "
+            "(pip install zstandard)"
+        ) from None
+    return zstandard
+
+
+def open_text(path: Path, mode: str = 'r') -> IO[str]:
+    """
+    Open a result file as text, compressed according to its suffix.
+    
+    Args:
+        path: File path (.gz and .zst are compressed)
+        mode: 'r' or 'w'
+    
+    Returns:
+        Text file object
+    """
+    path = Path(path)
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    if path.suffix == '.zst':
+        zstandard = _zstandard()
+        raw = open(path, mode + 'b')
+        if mode == 'w':
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def result_stem(path: Path) -> Path:
+    """Path without its result suffix (e.g. 'x.ndjson.gz' -> 'x')."""
+    path = Path(path)
+    for suffix in RESULT_SUFFIXES:
+        if path.name.endswith(suffix):
+            return path.with_name(path.name[:-len(suffix)])
+    return path
+
+
+def result_path(path: Path, compression: Optional[str] = None) -> Path:
+    """
+    Path of the NDJSON result file for a (possibly .json) target path.
+    
+    Args:
+        path: Requested path, e.g. 'exp1_main_gpt-4_20251006_100608.json'
+        compression: None, 'gzip' or 'zstd'
+    
+    Returns:
+        Same path with the matching .ndjson suffix
+    """
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(
+            f"Unknown compression '{compression}'. "
+            f"Available: {', '.join(str(c) for c in COMPRESSION_SUFFIXES)}"
+        )
+    stem = result_stem(path)
+    return stem.with_name(stem.name + COMPRESSION_SUFFIXES[compression])
+
+
+def write_result(header: Dict[str, Any], responses: Iterable[Dict], path: Path):
+    """
+    Write a result file: the header line, then one line per response.
+    
+    Args:
+        header: Result fields other than responses (model_name, accuracy, ...)
+        responses: Per-item response dictionaries
+        path: Output path (.ndjson, .ndjson.gz or .ndjson.zst)
+    """
+    responses = list(responses)
+    header_line = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        **header,
+        'n_responses': len(responses),
+    }
+    with open_text(path, 'w') as f:
+        f.write(json.dumps(header_line, ensure_ascii=False) + '\n')
+        for response in responses:
+            f.write(json.dumps(response, ensure_ascii=False) + '\n')
+
+
+def is_ndjson(path: Path) -> bool:
+    return not Path(path).name.endswith('.json')
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """
+    Result summary (everything but the responses).
+    
+    For NDJSON files only the first line is read.
+    
+    Args:
+        path: Result file (.json, .ndjson, .ndjson.gz or .ndjson.zst)
+    
+    Returns:
+        Header dictionary (model_name, experiment_type, accuracy, ...)
+    """
+    if not is_ndjson(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or 'responses' not in data:
+            raise ValueError(f"{path} is not a result file")
+        data.pop('responses')
+        return data
+    
+    with open_text(path) as f:
+        header = json.loads(f.readline())
+    if header.get('format') != FORMAT_NAME:
+        raise ValueError(f"{path} is not a result file")
+    return header
+
+
+def iter_responses(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yield a result file's responses one at a time.
+    
+    NDJSON files are streamed line by line; legacy .json files have to be
+    loaded in full first.
+    
+    Args:
+        path: Result file
+    
+    Yields:
+        Per-item response dictionaries, in item order
+    """
+    if not is_ndjson(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data.get('responses', [])
+        return
+    
+    with open_text(path) as f:
+        f.readline()  # header
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_result(path: Path) -> Dict[str, Any]:
+    """
+    Load a whole result in the ExperimentResult.to_dict() layout.
+    
+    Args:
+        path: Result file (any supported format)
+    
+    Returns:
+        Result dictionary including the responses list
+    """
+    data = read_header(path)
+    for key in ('format', 'version', 'n_responses'):
+        data.pop(key, None)
+    data['responses'] = list(iter_responses(path))
+    return data
+
+
+def result_files(results_dir: Path = RESULTS_DIR / "raw", pattern: str = "*") -> List[Path]:
+    """
+    Result files in a directory, in any supported format.
+    
+    Args:
+        results_dir: Directory to search
+        pattern: Glob for the file stem (e.g. "exp1e_transfer_*")
+    
+    Returns:
+        Sorted paths (request stats files are excluded)
+    """
+    files = set()
+    for suffix in RESULT_SUFFIXES:
+        for path in Path(results_dir).glob(pattern + suffix):
+            if not path.name.endswith('.stats.json'):
+                files.add(path)
+    return sorted(files)
@@ -7,22 +7,27 @@ testing abstract reasoning vs. pattern matching).
 
 Key principle: Training and test sets must use completely different symbols
 to prevent any distributional pattern matching.
+
+Symbols are handed out by a SymbolAllocator, a free list over symbol IDs
+(positions in the generator's shuffled pool), so a draw costs
+O(k log N) instead of a scan of the whole pool.
 """
 
 import random
 import json
 from pathlib import Path
-from typing import List, Set, Tuple, Dict
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Dict
 from dataclasses import dataclass, asdict
 
 from src.config import (
-    ALL_SYMBOLS,
     MATHEMATICAL_OPERATORS,
     MISCELLANEOUS_SYMBOLS,
     GEOMETRIC_SHAPES,
     RANDOM_SEED,
+    SYMBOL_POOL,
     SYMBOLS_DIR,
 )
+from src.symbol_pools import get_symbol_pool
 
 
 @dataclass
@@ -65,6 +70,166 @@ class SymbolSet:
         return cls(**data)
 
 
+class SymbolAllocator:
+    """
+    Free list over a fixed, ordered pool of symbols.
+    
+    A bitset marks which symbol IDs are free, and a Fenwick tree over it
+    counts free symbols by prefix, so the r-th free symbol (in pool order)
+    is found in O(log N). Draws, reservations and releases of k symbols
+    cost O(k log N).
+    
+    draw() samples ranks with rng.sample(range(capacity), k), which picks
+    exactly the symbols rng.sample(free_symbols(), k) would: draws stay
+    deterministic per seed and match sampling from a rebuilt list.
+    """
+    
+    def __init__(self, symbols: Sequence[str]):
+        """
+        Initialize allocator with every symbol free.
+        
+        Args:
+            symbols: Symbol pool; its order defines the symbol IDs
+        
+        Raises:
+            ValueError: If the pool contains duplicates
+        """
+        self.symbols = list(symbols)
+        self._ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        if len(self._ids) != len(self.symbols):
+            raise ValueError("Symbol pool contains duplicates")
+        
+        n = len(self.symbols)
+        self._free = bytearray(b'\x01') * n
+        self._n_free = n
+        
+        # Fenwick tree (1-based) of free counts, built in O(N)
+        self._tree = [0] * (n + 1)
+        for i in range(1, n + 1):
+            self._tree[i] += 1
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+        self._top_step = 1 << (n.bit_length() - 1) if n else 0
+    
+    def __len__(self) -> int:
+        return len(self.symbols)
+    
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._ids
+    
+    @property
+    def capacity(self) -> int:
+        """Number of free symbols."""
+        return self._n_free
+    
+    def is_free(self, symbol: str) -> bool:
+        """Whether a symbol is in the pool and not allocated."""
+        symbol_id = self._ids.get(symbol)
+        return symbol_id is not None and bool(self._free[symbol_id])
+    
+    def _update(self, symbol_id: int, delta: int):
+        n = len(self.symbols)
+        i = symbol_id + 1
+        while i <= n:
+            self._tree[i] += delta
+            i += i & -i
+        self._free[symbol_id] = 1 if delta > 0 else 0
+        self._n_free += delta
+    
+    def _select(self, rank: int) -> int:
+        """ID of the free symbol with 0-based rank `rank` in pool order."""
+        n = len(self.symbols)
+        position = 0
+        remaining = rank + 1
+        step = self._top_step
+        while step:
+            candidate = position + step
+            if candidate <= n and self._tree[candidate] < remaining:
+                position = candidate
+                remaining -= self._tree[candidate]
+            step >>= 1
+        return position
+    
+    def _ids_of(self, symbols: Iterable[str], free: bool) -> List[int]:
+        ids = []
+        for symbol in symbols:
+            symbol_id = self._ids.get(symbol)
+            if symbol_id is None:
+                raise ValueError(f"Symbol {symbol!r} is not in the pool")
+            if bool(self._free[symbol_id]) != free:
+                state = "allocated" if free else "free"
+                raise ValueError(f"Symbol {symbol!r} is already {state}")
+            ids.append(symbol_id)
+        if len(set(ids)) != len(ids):
+            raise ValueError("Symbols given more than once")
+        return ids
+    
+    def reserve(self, symbols: Iterable[str]):
+        """
+        Mark free symbols as allocated.
+        
+        Raises:
+            ValueError: If a symbol is not in the pool or already allocated
+        """
+        for symbol_id in self._ids_of(symbols, free=True):
+            self._update(symbol_id, -1)
+    
+    def release(self, symbols: Iterable[str]):
+        """
+        Return allocated symbols to the free list.
+        
+        Raises:
+            ValueError: If a symbol is not in the pool or already free
+        """
+        for symbol_id in self._ids_of(symbols, free=False):
+            self._update(symbol_id, 1)
+    
+    def draw(self, k: int, rng: random.Random) -> List[str]:
+        """
+        Allocate k free symbols at random.
+        
+        Args:
+            k: Number of symbols
+            rng: Random source (consumed as by rng.sample(free_symbols(), k))
+        
+        Returns:
+            The symbols, in sampling order
+        
+        Raises:
+            ValueError: If fewer than k symbols are free
+        """
+        if k > self._n_free:
+            raise ValueError(f"Insufficient symbols: need {k}, have {self._n_free} available")
+        # Ranks refer to the free list before this draw, so select all first
+        ids = [self._select(rank) for rank in rng.sample(range(self._n_free), k)]
+        for symbol_id in ids:
+            self._update(symbol_id, -1)
+        return [self.symbols[symbol_id] for symbol_id in ids]
+    
+    def take(self, k: int) -> List[str]:
+        """
+        Allocate the first k free symbols, in pool order.
+        
+        Raises:
+            ValueError: If fewer than k symbols are free
+        """
+        if k > self._n_free:
+            raise ValueError(f"Insufficient symbols: need {k}, have {self._n_free} available")
+        ids = [self._select(rank) for rank in range(k)]
+        for symbol_id in ids:
+            self._update(symbol_id, -1)
+        return [self.symbols[symbol_id] for symbol_id in ids]
+    
+    def free_symbols(self) -> List[str]:
+        """Free symbols, in pool order."""
+        return [symbol for symbol, free in zip(self.symbols, self._free) if free]
+    
+    def allocated_symbols(self) -> List[str]:
+        """Allocated symbols, in pool order."""
+        return [symbol for symbol, free in zip(self.symbols, self._free) if not free]
+
+
 class SymbolGenerator:
     """
     Generator for creating disjoint symbol sets.
@@ -73,21 +238,21 @@ class SymbolGenerator:
     symbols, preventing any possibility of pattern matching on symbol identity.
     """
     
-    def __init__(self, seed: int = RANDOM_SEED):
+    def __init__(self, seed: int = RANDOM_SEED, pool: Optional[str] = None):
         """
         Initialize symbol generator.
         
         Args:
             seed: Random seed for reproducibility
+            pool: Symbol pool to draw from (see src/symbol_pools.py;
+                default: SYMBOL_POOL, normally ALL_SYMBOLS)
         """
         self.seed = seed
         self.rng = random.Random(seed)
         
-        # Track used symbols across all experiments
-        self.used_symbols: Set[str] = set()
-        
         # Available symbol pools
-        self.available_symbols = ALL_SYMBOLS.copy()
+        self.pool_name = pool or SYMBOL_POOL
+        self.available_symbols = get_symbol_pool(self.pool_name)
         self.math_symbols = MATHEMATICAL_OPERATORS.copy()
         self.misc_symbols = MISCELLANEOUS_SYMBOLS.copy()
         self.geom_symbols = GEOMETRIC_SHAPES.copy()
@@ -95,11 +260,26 @@ class SymbolGenerator:
         # Shuffle for randomization
         self.rng.shuffle(self.available_symbols)
         
+        # Track used symbols across all experiments
+        self.allocator = SymbolAllocator(self.available_symbols)
+        self._used_outside_pool: Set[str] = set()
+    
+    @property
+    def used_symbols(self) -> Set[str]:
+        """Symbols handed out so far (including ones from explicit pools)."""
+        return set(self.allocator.allocated_symbols()) | self._used_outside_pool
+    
+    @property
+    def remaining_capacity(self) -> int:
+        """Symbols of the pool not handed out yet."""
+        return self.allocator.capacity
+    
     def get_disjoint_sets(
         self, 
         n_sets: int, 
         symbols_per_set: int,
-        pool: List[str] = None
+        pool: List[str] = None,
+        exclude: Optional[Iterable[str]] = None
     ) -> List[List[str]]:
         """
         Generate n completely disjoint sets of symbols.
@@ -110,6 +290,8 @@ class SymbolGenerator:
             n_sets: Number of disjoint sets to create
             symbols_per_set: Number of symbols per set
             pool: Symbol pool to draw from (uses all available if None)
+            exclude: Symbols to keep out of this draw (they stay available
+                for later draws; ignored with an explicit pool)
             
         Returns:
             List of n lists, each containing symbols_per_set unique symbols
@@ -117,32 +299,51 @@ class SymbolGenerator:
         Raises:
             ValueError: If insufficient symbols available
         """
-        if pool is None:
-            pool = [s for s in self.available_symbols if s not in self.used_symbols]
-        
         total_needed = n_sets * symbols_per_set
         
-        if len(pool) < total_needed:
-            raise ValueError(
-                f"Insufficient symbols: need {total_needed}, "
-                f"have {len(pool)} available"
-            )
-        
-        # Sample without replacement
-        sampled = self.rng.sample(pool, total_needed)
+        if pool is None:
+            # Hold excluded symbols for the duration of the draw
+            held = [s for s in set(exclude or ()) if self.allocator.is_free(s)]
+            self.allocator.reserve(held)
+            try:
+                sampled = self.allocator.draw(total_needed, self.rng)
+            finally:
+                self.allocator.release(held)
+        else:
+            if len(pool) < total_needed:
+                raise ValueError(
+                    f"Insufficient symbols: need {total_needed}, "
+                    f"have {len(pool)} available"
+                )
+            sampled = self.rng.sample(pool, total_needed)
+            self.mark_used(sampled)
         
         # Split into n disjoint sets
-        sets = []
-        for i in range(n_sets):
-            start_idx = i * symbols_per_set
-            end_idx = start_idx + symbols_per_set
-            symbol_set = sampled[start_idx:end_idx]
-            sets.append(symbol_set)
-            
-            # Mark as used
-            self.used_symbols.update(symbol_set)
+        return [
+            sampled[i * symbols_per_set:(i + 1) * symbols_per_set]
+            for i in range(n_sets)
+        ]
+    
+    def mark_used(self, symbols: Iterable[str]):
+        """Record symbols as used (symbols already used are ignored)."""
+        for symbol in symbols:
+            if self.allocator.is_free(symbol):
+                self.allocator.reserve([symbol])
+            elif symbol not in self.allocator:
+                self._used_outside_pool.add(symbol)
+    
+    def release_symbols(self, symbols: Iterable[str]):
+        """Return drawn but unused symbols of the pool for later draws."""
+        self.allocator.release(symbols)
+    
+    def take_symbols(self, k: int) -> List[str]:
+        """
+        Hand out the first k unused symbols of the (shuffled) pool.
         
-        return sets
+        Raises:
+            ValueError: If fewer than k symbols are left
+        """
+        return self.allocator.take(k)
     
     def generate_experiment1_symbols(
         self,
@@ -180,6 +381,9 @@ class SymbolGenerator:
         training_pool = sets[0][:training_symbols_needed]
         test_pool = sets[1][:test_symbols_needed]
         
+        # The shorter set's surplus was never used
+        self.release_symbols(sets[0][training_symbols_needed:] + sets[1][test_symbols_needed:])
+        
         # Create SymbolSet objects with metadata
         training_set = SymbolSet(
             symbols=training_pool,
@@ -190,6 +394,7 @@ class SymbolGenerator:
                 'sequence_length': sequence_length,
                 'transformation_rule': 'rotate_left',
                 'seed': self.seed,
+                'symbol_pool': self.pool_name,
             }
         )
         
@@ -202,6 +407,7 @@ class SymbolGenerator:
                 'sequence_length': sequence_length,
                 'transformation_rule': 'rotate_left',
                 'seed': self.seed,
+                'symbol_pool': self.pool_name,
             }
         )
         
@@ -0,0 +1,191 @@
+"""
+Symbol pools generated from Unicode codepoint ranges.
+
+ALL_SYMBOLS in src/config.py is a short hand-picked list, too small for
+many seeds, long 1d sequences or disjoint sets across conditions.
+SYMBOL_POOLS declares larger pools as codepoint ranges, which are
+filtered by Unicode category (SYMBOL_POOL_CATEGORIES unless the pool
+sets "categories") and by exclusion lists (SYMBOL_POOL_EXCLUDE plus the
+pool's own "exclude").
+
+A pool is built the first time it is asked for and then kept in memory.
+It is also written to data/cache/symbol_pools/ under a fingerprint of its
+declaration and of the Unicode version of unicodedata, so a changed
+declaration or Python upgrade rebuilds it. Symbols are in codepoint
+order; SymbolGenerator shuffles them per seed.
+
+Usage:
+    from src.symbol_pools import get_symbol_pool
+    symbols = get_symbol_pool("large")
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+
+from src.config import (
+    ALL_SYMBOLS,
+    CACHE_DIR,
+    SYMBOL_POOL,
+    SYMBOL_POOL_CATEGORIES,
+    SYMBOL_POOL_EXCLUDE,
+    SYMBOL_POOLS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Name of the hand-picked pool (ALL_SYMBOLS)
+DEFAULT_POOL = "default"
+
+POOL_CACHE_DIR = CACHE_DIR / "symbol_pools"
+
+# Pools built or loaded in this process
+_POOLS: Dict[str, List[str]] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class PoolDeclaration:
+    """
+    A generated pool as declared in SYMBOL_POOLS.
+    
+    Attributes:
+        name: Pool name
+        ranges: Inclusive (first, last) codepoint ranges, in pool order
+        categories: Unicode categories to keep (e.g. "Sm", "So")
+        exclude: Symbols never to include
+    """
+    name: str
+    ranges: Tuple[Tuple[int, int], ...]
+    categories: Tuple[str, ...] = SYMBOL_POOL_CATEGORIES
+    exclude: Tuple[str, ...] = ()
+    
+    @classmethod
+    def from_config(cls, name: str) -> 'PoolDeclaration':
+        """
+        Declaration of a pool in SYMBOL_POOLS.
+        
+        Raises:
+            ValueError: If the pool is not declared or a range is invalid
+        """
+        if name not in SYMBOL_POOLS:
+            raise ValueError(
+                f"Unknown symbol pool '{name}'. Available: {', '.join(symbol_pool_names())}"
+            )
+        declared = SYMBOL_POOLS[name]
+        ranges = tuple((int(first), int(last)) for first, last in declared['ranges'])
+        for first, last in ranges:
+            if not 0 <= first <= last <= 0x10FFFF:
+                raise ValueError(f"Symbol pool '{name}': invalid range {first:#x}-{last:#x}")
+        return cls(
+            name=name,
+            ranges=ranges,
+            categories=tuple(declared.get('categories', SYMBOL_POOL_CATEGORIES)),
+            exclude=tuple(sorted(set(SYMBOL_POOL_EXCLUDE) | set(declared.get('exclude', ())))),
+        )
+    
+    def fingerprint(self) -> str:
+        """Hash of the declaration and the Unicode database version."""
+        key = json.dumps({
+            'ranges': self.ranges,
+            'categories': self.categories,
+            'exclude': self.exclude,
+            'unicode_version': unicodedata.unidata_version,
+        }, sort_keys=True)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    
+    @property
+    def cache_path(self) -> Path:
+        return POOL_CACHE_DIR / f"{self.name}_{self.fingerprint()}.json"
+    
+    def build(self) -> List[str]:
+        """All symbols of the declared ranges that pass the filters."""
+        categories = set(self.categories)
+        excluded = set(self.exclude)
+        symbols = []
+        seen = set()
+        for first, last in self.ranges:
+            for codepoint in range(first, last + 1):
+                symbol = chr(codepoint)
+                if (symbol in seen or symbol in excluded
+                        or unicodedata.category(symbol) not in categories):
+                    continue
+                seen.add(symbol)
+                symbols.append(symbol)
+        return symbols
+
+
+def _load_cached(declaration: PoolDeclaration) -> Optional[List[str]]:
+    try:
+        with open(declaration.cache_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    symbols = data.get('symbols')
+    return symbols if isinstance(symbols, list) else None
+
+
+def _save_cached(declaration: PoolDeclaration, symbols: List[str]):
+    data: Dict[str, Any] = {
+        'name': declaration.name,
+        'unicode_version': unicodedata.unidata_version,
+        'ranges': [f"U+{first:04X}-U+{last:04X}" for first, last in declaration.ranges],
+        'categories': list(declaration.categories),
+        'exclude': list(declaration.exclude),
+        'n_symbols': len(symbols),
+        'symbols': symbols,
+    }
+    path = declaration.cache_path
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # The pool is still usable; it is just rebuilt next time
+        logger.warning(f"⚠ Could not cache symbol pool '{declaration.name}': {e}")
+
+
+def get_symbol_pool(name: Optional[str] = None, use_cache: bool = True) -> List[str]:
+    """
+    Symbols of a pool, in pool order.
+    
+    Args:
+        name: Pool name ("default" for ALL_SYMBOLS, or a key of
+            SYMBOL_POOLS; default: SYMBOL_POOL)
+        use_cache: Read and write the on-disk cache
+    
+    Returns:
+        A new list of the pool's symbols
+    
+    Raises:
+        ValueError: If the pool is not declared
+    """
+    name = name or SYMBOL_POOL
+    if name == DEFAULT_POOL:
+        return ALL_SYMBOLS.copy()
+    
+    with _POOLS_LOCK:
+        symbols = _POOLS.get(name)
+        if symbols is None:
+            declaration = PoolDeclaration.from_config(name)
+            symbols = _load_cached(declaration) if use_cache else None
+            if symbols is None:
+                symbols = declaration.build()
+                logger.info(f"Built symbol pool '{name}' ({len(symbols)} symbols)")
+                if use_cache:
+                    _save_cached(declaration, symbols)
+            _POOLS[name] = symbols
+    return list(symbols)
+
+
+def symbol_pool_names() -> List[str]:
+    """Names accepted by get_symbol_pool()."""
+    return [DEFAULT_POOL] + list(SYMBOL_POOLS)